@@ -0,0 +1,94 @@
+"""Бенчмарк холодного старта: время импорта и первого вызова в новом процессе, с проверкой бюджета
+
+Каждый сценарий запускается в отдельном интерпретаторе несколько раз, в отчет идет медиана.
+Первый вызов - создание клиента и rest_api_information к локальному серверу на http.server, сеть не нужна.
+Если медиана какого-то сценария превышает бюджет, скрипт завершается с кодом 1.
+
+    $ python benchmarks/bench_import.py
+"""
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RUNS = 7
+
+# Сценарий: (код, бюджет в миллисекундах). В коде доступен адрес локального сервера - url
+SCENARIOS = {
+    "import package": ("import platonus_api_wrapper", 20),
+    "import PlatonusAPI": ("from platonus_api_wrapper import PlatonusAPI", 150),
+    "import AsyncPlatonusAPI": ("from platonus_api_wrapper import AsyncPlatonusAPI", 250),
+    "first call": (
+        "from platonus_api_wrapper import PlatonusAPI\n"
+        "PlatonusAPI(url, 'ru').rest_api_information()",
+        300,
+    ),
+}
+
+SCENARIO_TEMPLATE = """
+import sys, time
+url = sys.argv[1]
+started = time.perf_counter()
+{code}
+print(time.perf_counter() - started)
+"""
+
+
+class VersionHandler(BaseHTTPRequestHandler):
+    """Минимальный Платонус: отвечает только на rest/api/version"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({"productName": "Platonus", "VERSION": "5.3", "BUILD_NUMBER": "1"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def measure(code: str, url: str) -> float:
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, (ROOT, os.environ.get("PYTHONPATH"))))}
+    output = subprocess.run(
+        [sys.executable, "-c", SCENARIO_TEMPLATE.format(code=code), url],
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main() -> int:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), VersionHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/"
+
+    over_budget = []
+    try:
+        for name, (code, budget) in SCENARIOS.items():
+            timings = [measure(code, url) * 1e3 for _ in range(RUNS)]
+            median = statistics.median(timings)
+            status = "ok" if median <= budget else "OVER BUDGET"
+            print(f"{name:24} median {median:7.1f} ms  min {min(timings):7.1f} ms  budget {budget:4} ms  {status}")
+            if median > budget:
+                over_budget.append(name)
+    finally:
+        server.shutdown()
+
+    if over_budget:
+        print(f"Over budget: {', '.join(over_budget)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,45 @@
+"""Бенчмарк JSON бэкендов на типичных ответах Платонуса (журнал, задания, список гражданств)
+
+    $ python benchmarks/bench_json.py
+"""
+import os
+import sys
+import timeit
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+# Скрипт можно запускать из любого каталога: пакет берется из этого репозитория, payloads - из каталога бенчмарков
+sys.path[:0] = [os.path.dirname(BENCHMARKS), BENCHMARKS]
+
+from payloads import PAYLOADS
+
+from platonus_api_wrapper.utils.json_backend import AUTO_BACKENDS, get_json_loads
+
+
+def available_backends():
+    backends = {}
+    for name in (*AUTO_BACKENDS, "stdlib"):
+        try:
+            backends[name] = get_json_loads(name)
+        except ImportError:
+            print(f"{name} is not installed, skipping")
+    return backends
+
+
+def main():
+    backends = available_backends()
+
+    for payload_name, build in PAYLOADS.items():
+        content = build()
+        timings = {
+            name: min(timeit.repeat(lambda: loads(content), number=200, repeat=5)) / 200
+            for name, loads in backends.items()
+        }
+        baseline = timings["stdlib"]
+        row = "  ".join(
+            f"{name}: {timing * 1e6:8.1f} us (x{baseline / timing:.1f})" for name, timing in timings.items()
+        )
+        print(f"{payload_name:18} {len(content):>7} bytes  {row}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""Нагрузочный бенчмарк: тысячи одновременных сессий AsyncPlatonusClientPool против локального Платонуса
+
+Запускает platonus_stub.py отдельным процессом (или использует уже запущенный, --url), создает sessions
+клиентов в одном пуле и в течение duration секунд гоняет сценарий пользователя: профиль и журнал за все годы
+при первом заходе, затем по кругу задания, системные сообщения, учебные годы и время сервера.
+Каждые expire_every секунд все токены на сервере истекают разом - шторм переавторизаций.
+
+В отчете: пропускная способность, задержки по методам из metrics, переавторизации (success - новый токен,
+joined - токен получен вызовом, ждавшим чужую переавторизацию), статистика пула и сервера.
+Ограничитель запросов к хосту снимается (rate=None), предохранитель только считает неудачи,
+чтобы измерялась обертка, а не настроенные лимиты. Клиент и сервер делят одну машину: потолок пропускной
+способности задает скорее пул соединений httpx, чем обертка - сравните с голым httpx.AsyncClient
+при том же max_connections.
+
+    $ ulimit -n 65536
+    $ python benchmarks/bench_load.py --sessions 2000 --duration 30 --max-connections 200 \\
+          --stub-args "--latency lognormal:0.02:0.5 --error 503=0.005" --expire-every 10
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import shlex
+import subprocess
+import sys
+import time
+import urllib.request
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+# Скрипт можно запускать из любого каталога: пакет берется из этого репозитория, а не из site-packages
+sys.path.insert(0, os.path.dirname(BENCHMARKS))
+
+from platonus_api_wrapper import AsyncPlatonusClientPool, metrics
+from platonus_api_wrapper.utils.rate_limit import get_rate_limiter
+from platonus_api_wrapper.utils.retry import get_circuit_breaker
+from platonus_api_wrapper.validators import URLNormalizer
+
+STUB = os.path.join(BENCHMARKS, "platonus_stub.py")
+
+
+def start_stub(stub_args: str) -> tuple[subprocess.Popen, str]:
+    process = subprocess.Popen(
+        [sys.executable, STUB, "--port", "0", *shlex.split(stub_args)],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    return process, process.stdout.readline().strip()
+
+
+def stub_call(url: str, path: str, method: str = "GET") -> dict:
+    with urllib.request.urlopen(urllib.request.Request(f"{url}_stub/{path}", method=method)) as response:
+        return json.loads(response.read())
+
+
+async def drain(iterator):
+    async for _ in iterator:
+        pass
+
+
+async def user_session(pool: AsyncPlatonusClientPool, account: str, deadline: float, counters: dict):
+    # Клиент живет до конца замера: пул хранит клиентов слабыми ссылками, а stats() считает живых
+    client = await pool.client(account)
+    counters["clients"].append(client)
+    # Первый заход, затем по кругу. После deadline новые шаги не начинаются
+    first_visit = [
+        lambda: client.profile.profile_info(),
+        lambda: client.study_room.student_journal_history(),
+    ]
+    visit = [
+        lambda: drain(client.iter_student_tasks(recipientStatus="2", startDate="01-09-2022", endDate="31-12-2022")),
+        lambda: drain(client.ui.iter_messages(countInPart=20)),
+        lambda: client.study_years_list(),
+        lambda: client.server_time(),
+    ]
+    try:
+        await client.login(login=account, password="password")
+    except Exception as error:
+        counters["failed_sessions"] += 1
+        counters["errors"][type(error).__name__] = counters["errors"].get(type(error).__name__, 0) + 1
+        return
+
+    steps = first_visit
+    while time.monotonic() < deadline:
+        for step in steps:
+            if time.monotonic() >= deadline:
+                return
+            try:
+                await step()
+            except Exception as error:
+                counters["errors"][type(error).__name__] = counters["errors"].get(type(error).__name__, 0) + 1
+        counters["iterations"] += steps is visit
+        steps = visit
+
+
+async def expire_storm(url: str, every: float, deadline: float, storms: list):
+    loop = asyncio.get_running_loop()
+    while time.monotonic() + every < deadline:
+        await asyncio.sleep(every)
+        storms.append(await loop.run_in_executor(None, stub_call, url, "expire", "POST"))
+
+
+async def run(args, url: str) -> dict:
+    platonus_url = URLNormalizer(url, "/")
+    get_rate_limiter(platonus_url, rate=None, max_in_flight=None)
+    get_circuit_breaker(platonus_url, failure_threshold=None)
+
+    pool = AsyncPlatonusClientPool(url, "ru", max_connections=args.max_connections)
+    counters = {"iterations": 0, "failed_sessions": 0, "errors": {}, "clients": []}
+    storms: list = []
+    started = time.monotonic()
+    deadline = started + args.duration
+    try:
+        tasks = [user_session(pool, f"student{i}", deadline, counters) for i in range(args.sessions)]
+        if args.expire_every:
+            tasks.append(expire_storm(url, args.expire_every, deadline, storms))
+        await asyncio.gather(*tasks)
+        pool_stats = pool.stats()
+    finally:
+        counters.pop("clients")
+        await pool.close()
+    return {**counters, "elapsed": time.monotonic() - started, "storms": storms, "pool": pool_stats}
+
+
+def report(result: dict, snapshot: dict, server: dict):
+    requests = sum(
+        sum(stats["statuses"].values()) + sum(stats["errors"].values())
+        for methods in snapshot["endpoints"].values()
+        for stats in methods.values()
+    )
+    elapsed = result["elapsed"]
+    print(f"{requests} requests in {elapsed:.1f} s: {requests / elapsed:.0f} req/s, "
+          f"{result['iterations']} scenario iterations, {result['failed_sessions']} failed sessions")
+    print(f"{'endpoint':40} {'count':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses / errors")
+    for endpoint, methods in snapshot["endpoints"].items():
+        for method, stats in methods.items():
+            latency = stats["latency"]
+            quantiles = " ".join(
+                f"{latency[q] * 1e3:8.0f}" if latency[q] is not None else f"{'>max':>8}" for q in ("p50", "p95", "p99")
+            )
+            print(f"{endpoint + ' ' + method:40} {latency['count']:7} {quantiles}  {stats['statuses']} {stats['errors']}")
+    print(f"relogins: {snapshot['relogins']}, expire storms: {len(result['storms'])}")
+    print(f"errors: {result['errors']}")
+    pool = result["pool"]
+    print(f"pool: {pool['handles']} handles, {pool['memory_per_handle']} bytes per handle, "
+          f"sockets {pool['sockets']}, circuit breaker {pool['circuit_breaker']}")
+    print(f"server: {json.dumps(server, ensure_ascii=False)}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Нагрузочный бенчмарк пула клиентов против локального Платонуса")
+    parser.add_argument("--sessions", type=int, default=500, help="одновременных сессий (аккаунтов)")
+    parser.add_argument("--duration", type=float, default=20.0, help="длительность в секундах")
+    parser.add_argument("--max-connections", type=int, default=100, help="соединений пула к хосту")
+    parser.add_argument("--expire-every", type=float, help="каждые N секунд истекают все токены")
+    parser.add_argument("--url", help="адрес уже запущенного platonus_stub.py")
+    parser.add_argument("--stub-args", default="", help="аргументы platonus_stub.py, если он запускается здесь")
+    args = parser.parse_args()
+
+    # Переавторизации видны в отчете, предупреждение на каждую из тысяч сессий только мешает
+    logging.getLogger("platonus_api_wrapper").setLevel(logging.ERROR)
+
+    process = None
+    url = args.url
+    if url is None:
+        process, url = start_stub(args.stub_args)
+    try:
+        stub_call(url, "reset", "POST")
+        metrics.enable()
+        result = asyncio.run(run(args, url))
+        report(result, metrics.snapshot(), stub_call(url, "stats"))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
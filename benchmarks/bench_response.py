@@ -0,0 +1,89 @@
+"""Микро-бенчмарк накладных расходов обертки Response на один запрос
+
+Сравнивает прежнюю "жадную" обертку (копирование атрибутов, apparent_encoding, json через .text)
+с текущей ленивой Response. Сеть не используется: requests.Response собирается вручную.
+
+    $ python benchmarks/bench_response.py
+"""
+import json
+import os
+import sys
+import timeit
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+# Скрипт можно запускать из любого каталога: пакет берется из этого репозитория, payloads - из каталога бенчмарков
+sys.path[:0] = [os.path.dirname(BENCHMARKS), BENCHMARKS]
+
+import requests
+from payloads import citizenship_list
+from requests.structures import CaseInsensitiveDict
+
+from platonus_api_wrapper.utils.dict2object import dict2object
+from platonus_api_wrapper.utils.request import Response
+
+
+class EagerResponse:
+    """Копия обертки Response до перехода на ленивые атрибуты"""
+
+    def __init__(self, request_obj):
+        self.status_code = request_obj.status_code
+        self.headers = request_obj.headers
+        self.raw = request_obj.raw
+        self.url = request_obj.url
+        self.encoding = request_obj.encoding
+        self.history = request_obj.history
+        self.reason = request_obj.reason
+        self.cookies = request_obj.cookies
+        self.elapsed = request_obj.elapsed
+        self.request = request_obj.request
+        self.content = request_obj.content
+        self.apparent_encoding = request_obj.apparent_encoding
+        self.is_redirect = request_obj.is_redirect
+        self.is_permanent_redirect = request_obj.is_permanent_redirect
+        self.links = request_obj.links
+        self.next = request_obj.next
+        self.ok = request_obj.ok
+
+    @property
+    def text(self, encoding="utf-8"):
+        return self.content.decode(encoding)
+
+    def json(self, **kwargs):
+        return json.loads(self.text, **kwargs)
+
+    def as_object(self):
+        return dict2object(self.json())
+
+
+def make_requests_response(content: bytes) -> requests.Response:
+    response = requests.Response()
+    response.status_code = 200
+    response._content = content
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json;charset=UTF-8"})
+    response.url = "http://test4.platonus.kz/rest/api/citizenship_list?lang=1"
+    response.encoding = "utf-8"
+    return response
+
+
+def bench(wrapper_cls, content, number):
+    def run():
+        wrapper_cls(make_requests_response(content)).as_object()
+
+    return min(timeit.repeat(run, number=number, repeat=5)) / number
+
+
+def main():
+    for name, content, number in (
+        ("server_time (small)", b'{"hour":10,"minute":5,"date":"01.03.2021","dayOfWeek":1}', 2000),
+        ("citizenship_list (~250 items)", citizenship_list(), 50),
+    ):
+        eager = bench(EagerResponse, content, number)
+        lazy = bench(Response, content, number)
+        print(
+            f"{name:32} {len(content):>8} bytes  "
+            f"eager: {eager * 1e6:10.1f} us  lazy: {lazy * 1e6:10.1f} us  x{eager / lazy:.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Синтетические ответы Платонуса для бенчмарков, по форме повторяют реальные ответы"""
+import json
+
+
+def citizenship_list(count=250) -> bytes:
+    return json.dumps(
+        {
+            "defaultCitizenship": 113,
+            "citizenshipList": [
+                {
+                    "type": 0,
+                    "facultyID": 0,
+                    "facultyCafedraID": 0,
+                    "correspondStandardPosition": 0,
+                    "name": f"ГОСУДАРСТВО НОМЕР {i}",
+                    "ID": i,
+                }
+                for i in range(count)
+            ],
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def student_tasks(count=100) -> bytes:
+    return json.dumps(
+        {
+            "tasks": [
+                {
+                    "ID": 1000 + i,
+                    "topic": f"Лабораторная работа №{i}",
+                    "subjectName": "Информатика",
+                    "tutorFIO": "Иванов Иван Иванович",
+                    "startDate": "10-01-2021",
+                    "endDate": "23-02-2021",
+                    "recipientStatus": 2,
+                    "mark": None if i % 3 else 5,
+                    "files": [{"ID": i, "name": "задание.docx", "size": 23456}],
+                }
+                for i in range(count)
+            ],
+            "totalCount": count,
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def student_journal(subjects=15, lessons=60) -> bytes:
+    return json.dumps(
+        [
+            {
+                "subjectID": 500 + s,
+                "subjectName": f"Предмет {s}",
+                "tutorFIO": "Петрова Мария Сергеевна",
+                "avgMark": 4.3,
+                "marks": [
+                    {
+                        "date": f"2021-{1 + l // 28:02d}-{1 + l % 28:02d}",
+                        "mark": 2 + (s + l) % 4,
+                        "markType": "текущая",
+                        "lessonID": s * 1000 + l,
+                    }
+                    for l in range(lessons)
+                ],
+            }
+            for s in range(subjects)
+        ],
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+PAYLOADS = {
+    "student_journal": student_journal,
+    "student_tasks": student_tasks,
+    "citizenship_list": citizenship_list,
+}
@@ -0,0 +1,698 @@
+"""Локальный Платонус для нагрузочного тестирования: REST методы, которые использует обертка, без сети
+
+Отвечает на авторизацию, версию, журнал, задания, системные сообщения, профиль, hasModule и остальные
+методы менеджеров REST API ответами той же формы, что и настоящий Платонус. Поддерживает:
+    - задержки ответа: постоянные или случайные (равномерные, логнормальные, экспоненциальные), общие и по методам
+    - внедрение ошибок с заданной вероятностью: 401 (сессия истекла), 429/5xx, зависание (таймаут клиента)
+      и разрыв соединения
+    - истечение токенов через token_ttl секунд и принудительное истечение всех токенов (шторм переавторизаций)
+    - постраничную выдачу заданий и системных сообщений
+    - ETag и ответ 304 на условные GET запросы
+    - сессию сервлета: запрос без куки JSESSIONID получает новую в Set-Cookie, как от Tomcat
+    - счетчики запросов, ответов, авторизаций и внедренных ошибок: GET /_stub/stats
+
+Служебные адреса (без задержек и ошибок):
+    GET  /_stub/stats   - статистика сервера в JSON
+    POST /_stub/expire  - все выданные токены истекают, следующие запросы получают 401
+    POST /_stub/reset   - обнуляет статистику и токены
+
+Авторизация принимает любой логин, кроме пароля "wrong" - на него Платонус отвечает login_status invalid.
+Данные аккаунта (журнал, профиль) детерминированы логином.
+
+Каждое соединение обслуживает отдельный поток (ThreadingHTTPServer), поэтому тысячи одновременных keep-alive
+соединений требуют поднять лимит открытых файлов (ulimit -n). Чтобы сервер не делил GIL с нагружающим
+клиентом, запускайте его отдельным процессом; первая строка вывода - адрес сервера.
+
+    $ python benchmarks/platonus_stub.py --port 8080 --latency lognormal:0.03:0.6 \\
+          --route-latency journal=lognormal:0.2:0.5 --error 503=0.01 --error 401=0.002 --error timeout=0.001 \\
+          --token-ttl 600
+
+В том же процессе (тесты, короткие замеры):
+
+    stub, url = start(PlatonusStub(latency=parse_latency("0.02"), errors={"503": 0.05}))
+    ...
+    stub.shutdown()
+"""
+import argparse
+import base64
+import hashlib
+import json
+import math
+import os
+import random
+import re
+import socket
+import struct
+import sys
+import threading
+import time
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Iterable, Optional
+from urllib.parse import parse_qs, urlsplit
+
+# Задержка ответа: функция без аргументов, возвращающая секунды
+Latency = Callable[[], float]
+
+# Виды внедряемых ошибок: статус ответа, timeout - ответ не приходит (соединение висит hang секунд и закрывается),
+# reset - соединение разрывается без ответа
+ERROR_KINDS = ("401", "429", "500", "502", "503", "504", "timeout", "reset")
+
+# Логотипы и картинки: минимальный PNG 1x1
+_PNG = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+_SUBJECTS = (
+    "Математика", "Физика", "Информатика", "История Казахстана", "Казахский язык", "Русский язык",
+    "Английский язык", "Философия", "Экономика", "Химия", "Биология", "Физическая культура",
+)
+
+
+def parse_latency(spec: str) -> Latency:
+    """
+    Распределение задержки из строки:
+        0.05                  - постоянная задержка в секундах
+        uniform:0.01:0.2      - равномерная от и до
+        lognormal:0.05:0.5    - логнормальная с медианой 0.05 и sigma 0.5 (длинный хвост, как у живого сервера)
+        exp:0.05              - экспоненциальная со средним 0.05
+    """
+    kind, _, args = spec.partition(":")
+    try:
+        if not args:
+            value = float(kind)
+            return lambda: value
+        params = [float(arg) for arg in args.split(":")]
+        if kind == "uniform":
+            low, high = params
+            return lambda: random.uniform(low, high)
+        if kind == "lognormal":
+            median, sigma = params
+            mu = math.log(median)
+            return lambda: random.lognormvariate(mu, sigma)
+        if kind == "exp":
+            (mean,) = params
+            return lambda: random.expovariate(1 / mean)
+    except ValueError:
+        pass
+    raise ValueError(f"Unknown latency {spec!r}, expected 0.05, uniform:LOW:HIGH, lognormal:MEDIAN:SIGMA or exp:MEAN")
+
+
+def _person_id(login: str) -> int:
+    return int.from_bytes(hashlib.blake2b(login.encode(), digest_size=4).digest(), "big") % 10 ** 7 + 1
+
+
+class Route:
+    """Метод REST API: имя (для статистики и задержек по методам), HTTP метод, шаблон пути и обработчик"""
+
+    __slots__ = ("name", "method", "pattern", "handler", "auth")
+
+    def __init__(self, name: str, method: str, pattern: str, handler: Callable, auth: bool = True):
+        self.name = name
+        self.method = method
+        self.pattern = re.compile(pattern)
+        self.handler = handler
+        self.auth = auth
+
+
+class Session:
+    __slots__ = ("login", "person_id", "expires_at")
+
+    def __init__(self, login: str, expires_at: float):
+        self.login = login
+        self.person_id = _person_id(login)
+        self.expires_at = expires_at
+
+
+class PlatonusStub:
+    """
+    Состояние и ответы локального Платонуса
+    Args:
+        version: версия Платонуса (rest/api/version), от нее зависят адреса некоторых методов обертки
+        licence_type: college или university
+        auth_type: тип авторизации (rest/api/authType), 1 - логин и пароль
+        latency: задержка всех ответов, см. parse_latency. None - без задержки
+        route_latency: задержки отдельных методов по имени маршрута, например {"journal": ...}
+        errors: вероятности внедряемых ошибок по видам, см. ERROR_KINDS, например {"503": 0.01, "timeout": 0.001}.
+                401 внедряется только в методы, требующие авторизации, и заодно завершает сессию
+        token_ttl: сколько секунд живет токен после авторизации, None - пока не истечет принудительно
+        hang: сколько секунд висит соединение при внедренном таймауте, больше таймаута клиента
+        tasks: сколько заданий у каждого ученика
+        messages: сколько системных сообщений у каждого пользователя
+        subjects: сколько предметов в журнале за семестр
+        years: учебные годы (rest/mobile/student/studyYears)
+        terms: количество семестров в году
+        context_path: путь Платонуса на хосте, как context_path клиента
+    """
+
+    def __init__(
+        self,
+        version: str = "5.3",
+        licence_type: str = "university",
+        auth_type: int = 1,
+        latency: Optional[Latency] = None,
+        route_latency: Optional[dict[str, Latency]] = None,
+        errors: Optional[dict[str, float]] = None,
+        token_ttl: Optional[float] = None,
+        hang: float = 30.0,
+        tasks: int = 230,
+        messages: int = 57,
+        subjects: int = 8,
+        years: Iterable[int] = (2020, 2021, 2022),
+        terms: int = 2,
+        context_path: str = "/",
+    ):
+        errors = dict(errors or {})
+        unknown = set(errors) - set(ERROR_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown error kinds {sorted(unknown)}, expected {ERROR_KINDS}")
+
+        self.version = version
+        self.licence_type = licence_type
+        self.auth_type = auth_type
+        self.latency = latency
+        self.route_latency = dict(route_latency or {})
+        self.errors = errors
+        self.token_ttl = token_ttl
+        self.hang = hang
+        self.tasks = tasks
+        self.messages = messages
+        self.subjects = min(subjects, len(_SUBJECTS))
+        self.years = tuple(years)
+        self.terms = terms
+        self.context_path = "/" + context_path.strip("/") + "/" if context_path.strip("/") else "/"
+
+        self.routes = self._routes()
+        self.server: Optional[ThreadingHTTPServer] = None
+
+        self._lock = threading.Lock()
+        self._sessions: dict[str, Session] = {}
+        # Оценки, выставленные во время работы (add_mark), по (год, семестр, subjectID)
+        self._added_marks: dict[tuple[int, int, int], list[dict[str, Any]]] = {}
+        self.reset()
+
+    def reset(self):
+        """Обнуляет статистику и завершает все сессии"""
+        with self._lock:
+            self._sessions = {}
+            self._logins: dict[str, int] = {}
+            self._requests: dict[str, int] = {}
+            self._statuses: dict[int, int] = {}
+            self._injected: dict[str, int] = {}
+            self._expired = 0
+            self._not_modified = 0
+            self._connections = 0
+            self._connections_max = 0
+            self.started_at = time.time()
+
+    def add_mark(self, year: int, term: int, subject_id: int, mark: int, date: str) -> None:
+        """Выставляет оценку всем ученикам: она появится в журнале и в get_marks_by_date"""
+        with self._lock:
+            self._added_marks.setdefault((year, term, subject_id), []).append({"date": date, "mark": mark})
+
+    def expire_all(self) -> int:
+        """Завершает все сессии: клиенты получат 401 и переавторизуются разом. Returns: сколько сессий завершено"""
+        with self._lock:
+            count = len(self._sessions)
+            self._sessions = {}
+        return count
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            uptime: секунд с запуска или reset
+            requests: запросов по маршрутам
+            statuses: ответов по кодам
+            injected: внедренных ошибок по видам
+            logins, accounts, relogins: авторизаций всего, разных аккаунтов и повторных авторизаций
+            sessions: действующих токенов
+            expired: запросов с истекшим или неизвестным токеном
+            not_modified: ответов 304 на условные запросы
+            connections, connections_max: открытых соединений сейчас и максимум одновременно
+        """
+        with self._lock:
+            logins = sum(self._logins.values())
+            return {
+                "uptime": time.time() - self.started_at,
+                "requests": dict(sorted(self._requests.items())),
+                "statuses": dict(sorted(self._statuses.items())),
+                "injected": dict(sorted(self._injected.items())),
+                "logins": logins,
+                "accounts": len(self._logins),
+                "relogins": logins - len(self._logins),
+                "sessions": len(self._sessions),
+                "expired": self._expired,
+                "not_modified": self._not_modified,
+                "connections": self._connections,
+                "connections_max": self._connections_max,
+            }
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+
+    # Учет
+
+    def _count(self, counter: dict, key: Any):
+        with self._lock:
+            counter[key] = counter.get(key, 0) + 1
+
+    def _connection(self, delta: int):
+        with self._lock:
+            self._connections += delta
+            self._connections_max = max(self._connections_max, self._connections)
+
+    # Сессии
+
+    def _login_session(self, login: str) -> str:
+        token = os.urandom(16).hex()
+        expires_at = time.monotonic() + self.token_ttl if self.token_ttl is not None else float("inf")
+        with self._lock:
+            self._sessions[token] = Session(login, expires_at)
+            self._logins[login] = self._logins.get(login, 0) + 1
+        return token
+
+    def session(self, token: Optional[str]) -> Optional[Session]:
+        """Сессия по токену или None, если токен неизвестен или истек"""
+        if not token:
+            return None
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is not None and session.expires_at <= time.monotonic():
+                del self._sessions[token]
+                session = None
+            if session is None:
+                self._expired += 1
+            return session
+
+    def _end_session(self, token: Optional[str]):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    # Ошибки и задержки
+
+    def injected_error(self, route: Route) -> Optional[str]:
+        """Вид ошибки, которую нужно внедрить в ответ, или None"""
+        for kind, probability in self.errors.items():
+            if kind == "401" and not route.auth:
+                continue
+            if random.random() < probability:
+                self._count(self._injected, kind)
+                return kind
+        return None
+
+    def delay(self, route: Route) -> float:
+        latency = self.route_latency.get(route.name, self.latency)
+        return max(0.0, latency()) if latency is not None else 0.0
+
+    def match(self, method: str, path: str) -> Optional[tuple[Route, "re.Match"]]:
+        if not path.startswith(self.context_path):
+            return None
+        path = path[len(self.context_path):]
+        for route in self.routes:
+            if route.method == method:
+                match = route.pattern.fullmatch(path)
+                if match is not None:
+                    return route, match
+        return None
+
+    # Маршруты
+
+    def _routes(self) -> list[Route]:
+        lang = r"(?P<lang>ru|kz|en)"
+        lang_int = r"(?P<lang>[0-9])"
+        return [
+            Route("login", "POST", r"rest/api/login", self.login, auth=False),
+            Route("logout", "POST", r"rest/api/logout", self.logout),
+            Route("version", "GET", r"rest/api/version", self.rest_api_version, auth=False),
+            Route("auth_type", "GET", r"rest/api/authType", lambda **_: {"value": str(self.auth_type)}, auth=False),
+            Route("server_time", "GET", r"menuTimeDate", self.server_time, auth=False),
+            Route("server_time", "GET", rf"rest/api/menu/menu_time_date/{lang}", self.server_time, auth=False),
+            Route("student_tasks", "POST", rf"rest/assignments/studentTasks/-1/{lang_int}", self.student_tasks),
+            Route("recipient_task_info", "GET", r"rest/assignments/tutor/assignment/loadRecipientTaskInfo/[0-9]",
+                  self.recipient_task_info),
+            Route("recipient_statuses", "GET", rf"rest/assignments/recipientStatuses/{lang_int}",
+                  lambda **_: [{"ID": i, "name": name} for i, name in enumerate(("Новое", "Выполнено", "Просрочено"))]),
+            Route("study_years", "GET", rf"rest/mobile/student/studyYears/{lang}",
+                  lambda **_: [{"year": year, "name": f"{year}-{year + 1}"} for year in self.years]),
+            Route("marks_by_date", "GET", rf"assignments/assignedYears/{lang}", self.marks_by_date),
+            Route("terms", "GET", rf"rest/mobile/tutor/terms/{lang}",
+                  lambda **_: [{"number": term, "name": f"{term} семестр"} for term in range(1, self.terms + 1)]),
+            Route("journal", "GET", rf"rest/api/journal/(?P<year>[0-9]+)/(?P<term>[0-9]+)/{lang}", self.journal),
+            Route("journal_records", "GET", r"rest/mobile/journal/records/(?P<year>[0-9]+)/(?P<term>[0-9]+)",
+                  self.journal_records),
+            Route("report_without_appeal", "GET", rf"rest/api/journal/reports/without-appeal/{lang}",
+                  lambda **_: []),
+            Route("has_module", "GET", r"rest/api/person/hasModule/[^/]+", lambda **_: {"hasModule": True}),
+            Route("has_module_license", "GET", r"rest/moduleLicense/by_module/[^/]+", lambda **_: {"hasLicense": True}),
+            Route("person_id", "GET", r"rest/api/person/personID", lambda session, **_: {"personID": session.person_id}),
+            Route("is_admin", "GET", r"rest/api/person/isAdmin", lambda **_: {"isAdmin": False}),
+            Route("person_type", "GET", r"rest/api/person/personType",
+                  lambda **_: {"isPasswordExpired": False, "personType": 1}),
+            Route("student_state_info", "GET", rf"rest/api/person/studentStateInfo/{lang}",
+                  lambda **_: {"studentState": 1, "stateName": "Обучающийся"}),
+            Route("person_type_list", "GET", rf"rest/api/person/personTypeList/{lang}",
+                  lambda **_: [{"personType": 1, "name": "Обучающийся"}]),
+            Route("profile_info", "GET", rf"rest/mobile/personInfo/{lang}", self.profile_info),
+            Route("fio", "GET", rf"rest/fio(/{lang})?", lambda session, **_: self._profile(session.person_id)["fio"]),
+            Route("profile_picture", "GET", r"rest/img/profilePicture",
+                  lambda **_: base64.b64encode(_PNG).decode()),
+            Route("change_password", "POST", r"rest/api/changePassword", lambda **_: {"status": "success"}),
+            Route("system_messages", "GET", rf"rest/systemMessages/(?:false|notification|letters)/{lang}",
+                  lambda **_: {"messages": [], "count": 0}),
+            Route("messages_by_params", "GET", rf"rest/systemMessages/getMessagesByParams/{lang}", self.messages_page),
+            Route("visually_impaired", "GET", r"rest/api/hasForVisuallyImpairedLicense",
+                  lambda **_: {"hasLicense": False}, auth=False),
+            Route("logo", "GET", r"rest/login-page/get-logo", lambda **_: _PNG, auth=False),
+            Route("unshown_release", "GET", r"rest/releases/hasUnshownRelease", lambda **_: {"hasUnshownRelease": False}),
+            Route("platonus_icon", "GET", r"img/platonus-logo-[a-z]+\.png", lambda **_: _PNG, auth=False),
+            Route("emblem", "GET", r"images/emblem\.jpg", lambda **_: _PNG, auth=False),
+            Route("applicant_reg_degrees", "GET", r"rest/api/applicant_reg_degrees",
+                  lambda **_: [{"ID": 1, "name": "Бакалавриат"}, {"ID": 2, "name": "Магистратура"}], auth=False),
+            Route("citizenship_list", "GET", r"rest/api/citizenship_list",
+                  lambda **_: {"citizenships": [{"ID": 113, "name": "КАЗАХСТАН", "type": 0}]}, auth=False),
+            Route("university_application_types", "GET", r"rest/api/university_application_types",
+                  lambda **_: [{"ID": 1, "name": "Очная"}], auth=False),
+        ]
+
+    def rest_api_version(self, **_):
+        return {
+            "productName": "Platonus",
+            "VERSION": self.version,
+            "BUILD_NUMBER": "1",
+            "licenceType": self.licence_type,
+        }
+
+    def login(self, payload: dict, **_):
+        if payload.get("password") == "wrong":
+            return {"login_status": "invalid", "message": "Неверный логин или пароль"}
+        login = str(payload.get("login") or payload.get("IIN") or "anonymous")
+        token = self._login_session(login)
+        return {
+            "login_status": "success",
+            "message": "",
+            "auth_token": token,
+            "sid": token[:16],
+            "uid": str(_person_id(login)),
+            "personID": _person_id(login),
+            "personType": 1,
+        }
+
+    def logout(self, token: Optional[str], **_):
+        self._end_session(token)
+        return 204, b""
+
+    @staticmethod
+    def server_time(**_):
+        now = time.localtime()
+        return {
+            "hour": now.tm_hour,
+            "minute": now.tm_min,
+            "date": time.strftime("%d.%m.%Y", now),
+            "dayOfWeek": now.tm_wday + 1,
+        }
+
+    def student_tasks(self, payload: dict, **_):
+        part, count = int(payload.get("partNumber", 0)), int(payload.get("countInPart", 20))
+        tasks = [
+            {"ID": 100000 + i, "topic": f"Задание {i + 1}", "status": i % 3, "subjectName": _SUBJECTS[i % len(_SUBJECTS)]}
+            for i in range(part * count, min(self.tasks, (part + 1) * count))
+        ]
+        return {"tasks": tasks, "totalCount": self.tasks}
+
+    @staticmethod
+    def recipient_task_info(query: dict, **_):
+        return {"assignmentRecipientID": int(query.get("assignmentRecipientID", ["0"])[0]), "files": []}
+
+    def journal(self, match: "re.Match", session: Session, **_):
+        return self._journal(session.person_id % 64, int(match["year"]), int(match["term"]))
+
+    def _journal(self, variant: int, year: int, term: int) -> list[dict[str, Any]]:
+        journal = _journal(self.subjects, variant, year, term)
+        with self._lock:
+            if not any((year, term) == key[:2] for key in self._added_marks):
+                return journal
+            # Закэшированный журнал не меняем: добавленные оценки дописываются в копии предметов
+            return [
+                {**subject, "marks": subject["marks"] + self._added_marks.get((year, term, subject["subjectID"]), [])}
+                for subject in journal
+            ]
+
+    def marks_by_date(self, session: Session, **_):
+        """Количество оценок по датам за каждый учебный год"""
+        feed = []
+        for year in self.years:
+            dates: dict[str, int] = {}
+            for term in range(1, self.terms + 1):
+                for subject in self._journal(session.person_id % 64, year, term):
+                    for mark in subject["marks"]:
+                        dates[mark["date"]] = dates.get(mark["date"], 0) + 1
+            feed.append({"year": year, "dates": dates})
+        return feed
+
+    @staticmethod
+    def journal_records(match: "re.Match", query: dict, session: Session, **_):
+        subject_id = int(query.get("subjectID", ["0"])[0])
+        rng = random.Random(f"{session.person_id % 64}:{match['year']}:{match['term']}:{subject_id}")
+        return {"records": [{"date": f"{day:02}.10.{match['year']}", "mark": rng.randint(50, 100)} for day in range(1, 21)]}
+
+    def profile_info(self, session: Session, **_):
+        return self._profile(session.person_id)
+
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _profile(person_id: int) -> dict[str, Any]:
+        rng = random.Random(person_id)
+        last_name, first_name = rng.choice(("Ахметов", "Сейткали", "Иванов")), rng.choice(("Айдар", "Дана", "Олег"))
+        return {
+            "personID": person_id,
+            "lastName": last_name,
+            "firstName": first_name,
+            "patronymic": "",
+            "fio": f"{last_name} {first_name}",
+            "birthDate": f"{rng.randint(1, 28):02}.{rng.randint(1, 12):02}.{rng.randint(1998, 2006)}",
+            "courseNumber": rng.randint(1, 4),
+            "groupName": f"ИС-{rng.randint(10, 99)}",
+            "GPA": round(rng.uniform(2.0, 4.0), 2),
+        }
+
+    def messages_page(self, query: dict, **_):
+        status = query.get("status", [""])[0]
+        if status not in ("0", "1", "2", "4"):
+            return 400, {"message": f"Unknown status {status!r}"}
+        part = int(query.get("partNumber", ["0"])[0])
+        count = int(query.get("countInPart", ["5"])[0])
+        messages = [
+            {"ID": 500000 - i, "title": f"Сообщение {i + 1}", "date": "01.10.2022", "isRead": i % 2 == 0}
+            for i in range(part * count, min(self.messages, (part + 1) * count))
+        ]
+        return {"messages": messages, "count": self.messages}
+
+
+@lru_cache(maxsize=4096)
+def _journal(subjects: int, variant: int, year: int, term: int) -> list[dict[str, Any]]:
+    """Журнал зависит от варианта аккаунта, года и семестра; ответы кэшируются, чтобы сервер не тратил на них CPU"""
+    rng = random.Random(f"{variant}:{year}:{term}")
+    return [
+        {
+            "subjectID": 1000 + i,
+            "subjectName": _SUBJECTS[i],
+            "marks": [{"date": f"{day:02}.10.{year}", "mark": rng.randint(50, 100)} for day in range(1, 16)],
+        }
+        for i in range(subjects)
+    ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Заголовки и тело уходят разными пакетами: с алгоритмом Нейгла каждый ответ ждал бы отложенный ACK клиента (~40 мс)
+    disable_nagle_algorithm = True
+    stub: PlatonusStub
+
+    def log_message(self, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.stub._connection(+1)
+
+    def finish(self):
+        try:
+            super().finish()
+        finally:
+            self.stub._connection(-1)
+
+    def do_GET(self):
+        self.handle_request("GET")
+
+    def do_POST(self):
+        self.handle_request("POST")
+
+    def handle_request(self, method: str):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        parts = urlsplit(self.path)
+
+        if parts.path.startswith("/_stub/"):
+            return self.control(method, parts.path)
+
+        stub = self.stub
+        found = stub.match(method, parts.path)
+        if found is None:
+            stub._count(stub._requests, "unknown")
+            return self.send(404, {"message": f"{method} {parts.path} not found"})
+        route, match = found
+        stub._count(stub._requests, route.name)
+
+        delay = stub.delay(route)
+        if delay:
+            time.sleep(delay)
+
+        token = self.headers.get("token")
+        error = stub.injected_error(route)
+        if error == "timeout":
+            time.sleep(stub.hang)
+            self.close_connection = True
+            return
+        if error == "reset":
+            # SO_LINGER с нулевым таймаутом: закрытие сокета отправляет RST
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+            self.close_connection = True
+            return
+        if error == "401":
+            stub._end_session(token)
+            return self.send(401, {"message": "Unauthorized"})
+        if error is not None:
+            return self.send(int(error), {"message": "Service Unavailable"})
+
+        session = None
+        if route.auth:
+            session = stub.session(token)
+            if session is None:
+                return self.send(401, {"message": "Unauthorized"})
+
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            return self.send(400, {"message": "Bad JSON"})
+
+        result = route.handler(
+            match=match, query=parse_qs(parts.query), payload=payload, session=session, token=token
+        )
+        status, result = result if isinstance(result, tuple) else (200, result)
+        self.send(status, result, conditional=method == "GET")
+
+    def control(self, method: str, path: str):
+        if method == "GET" and path == "/_stub/stats":
+            return self.send(200, self.stub.stats())
+        if method == "POST" and path == "/_stub/expire":
+            return self.send(200, {"expired": self.stub.expire_all()})
+        if method == "POST" and path == "/_stub/reset":
+            self.stub.reset()
+            return self.send(200, {})
+        return self.send(404, {"message": f"{method} {path} not found"})
+
+    def send(self, status: int, result: Any, conditional: bool = False):
+        if isinstance(result, bytes):
+            body, content_type = result, "image/png"
+        elif isinstance(result, str):
+            body, content_type = result.encode(), "text/plain;charset=UTF-8"
+        else:
+            body, content_type = json.dumps(result, ensure_ascii=False).encode(), "application/json;charset=UTF-8"
+
+        etag = None
+        if conditional and status == 200:
+            etag = f'"{hashlib.blake2b(body, digest_size=8).hexdigest()}"'
+            if self.headers.get("If-None-Match") == etag:
+                self.stub._count(self.stub._statuses, 304)
+                with self.stub._lock:
+                    self.stub._not_modified += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+
+        self.stub._count(self.stub._statuses, status)
+        self.send_response(status)
+        if body:
+            self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        if etag is not None:
+            self.send_header("ETag", etag)
+        if "JSESSIONID=" not in self.headers.get("Cookie", ""):
+            self.send_header("Set-Cookie", f"JSESSIONID={os.urandom(16).hex()}; Path=/; HttpOnly")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    # Очередь принятых ядром соединений: при старте тысяч сессий разом стандартных 5 не хватает
+    request_queue_size = 4096
+
+
+def start(stub: PlatonusStub, host: str = "127.0.0.1", port: int = 0) -> tuple[PlatonusStub, str]:
+    """Запускает сервер в фоновом потоке. Returns: stub и адрес Платонуса для клиента"""
+    handler = type("BoundStubHandler", (StubHandler,), {"stub": stub})
+    stub.server = StubServer((host, port), handler)
+    # Короткий интервал опроса: shutdown() в тестах не ждет по полсекунды
+    threading.Thread(target=stub.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+    return stub, f"http://{host}:{stub.server.server_port}/"
+
+
+def _key_value(parse: Callable[[str], Any]) -> Callable[[str], tuple[str, Any]]:
+    def parse_pair(text: str) -> tuple[str, Any]:
+        key, sep, value = text.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"expected NAME=VALUE, got {text!r}")
+        try:
+            return key, parse(value)
+        except ValueError as error:
+            raise argparse.ArgumentTypeError(str(error))
+
+    return parse_pair
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Локальный Платонус для нагрузочного тестирования")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 - любой свободный порт")
+    parser.add_argument("--version", default="5.3", help="версия Платонуса")
+    parser.add_argument("--latency", type=parse_latency, help="задержка всех ответов, например lognormal:0.03:0.6")
+    parser.add_argument("--route-latency", type=_key_value(parse_latency), action="append", default=[],
+                        metavar="ROUTE=LATENCY", help="задержка метода, например journal=uniform:0.1:0.3")
+    parser.add_argument("--error", type=_key_value(float), action="append", default=[], metavar="KIND=PROBABILITY",
+                        help=f"вероятность ошибки, виды: {', '.join(ERROR_KINDS)}")
+    parser.add_argument("--token-ttl", type=float, help="время жизни токена в секундах")
+    parser.add_argument("--hang", type=float, default=30.0, help="сколько секунд висит соединение при timeout")
+    parser.add_argument("--tasks", type=int, default=230, help="заданий у ученика")
+    parser.add_argument("--messages", type=int, default=57, help="системных сообщений у пользователя")
+    args = parser.parse_args()
+
+    stub = PlatonusStub(
+        version=args.version,
+        latency=args.latency,
+        route_latency=dict(args.route_latency),
+        errors=dict(args.error),
+        token_ttl=args.token_ttl,
+        hang=args.hang,
+        tasks=args.tasks,
+        messages=args.messages,
+    )
+    _, url = start(stub, args.host, args.port)
+    print(url, flush=True)
+
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stub.shutdown()
+        print(json.dumps(stub.stats(), ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
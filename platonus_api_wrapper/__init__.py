@@ -4,7 +4,58 @@ __license__ = "AGPL-3.0 License"
 __email__ = "robanokssamit@yandex.com"
 
 
-from .base import PlatonusAPI
-from .utils import exceptions
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ['PlatonusAPI', 'exceptions']
+if TYPE_CHECKING:
+    from .base import (
+        AsyncMarkWatcher,
+        AsyncPlatonusAPI,
+        AsyncPlatonusClientPool,
+        MarkWatcher,
+        PlatonusAPI,
+        PlatonusClientPool,
+    )
+    from .utils import exceptions
+    from .utils.cassette import Cassette
+    from .utils.keepalive import AsyncKeepAliveScheduler, KeepAliveScheduler
+    from .utils.metrics import metrics
+    from .utils.tracing import hooks, tracer
+    from .utils.vault import SessionVault
+
+# import platonus_api_wrapper ничего не импортирует заранее: клиенты и их зависимости (requests, httpx)
+# загружаются при первом обращении к имени, см. PEP 562
+_LAZY_ATTRIBUTES = {
+    'PlatonusAPI': ('.base', 'PlatonusAPI'),
+    'AsyncPlatonusAPI': ('.base', 'AsyncPlatonusAPI'),
+    'PlatonusClientPool': ('.base', 'PlatonusClientPool'),
+    'AsyncPlatonusClientPool': ('.base', 'AsyncPlatonusClientPool'),
+    'MarkWatcher': ('.base', 'MarkWatcher'),
+    'AsyncMarkWatcher': ('.base', 'AsyncMarkWatcher'),
+    'KeepAliveScheduler': ('.utils.keepalive', 'KeepAliveScheduler'),
+    'AsyncKeepAliveScheduler': ('.utils.keepalive', 'AsyncKeepAliveScheduler'),
+    'SessionVault': ('.utils.vault', 'SessionVault'),
+    'Cassette': ('.utils.cassette', 'Cassette'),
+    'metrics': ('.utils.metrics', 'metrics'),
+    'hooks': ('.utils.tracing', 'hooks'),
+    'tracer': ('.utils.tracing', 'tracer'),
+    'exceptions': ('.utils.exceptions', None),
+}
+
+
+def __getattr__(name):
+    try:
+        module_name, attribute = _LAZY_ATTRIBUTES[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    module = import_module(module_name, __name__)
+    value = module if attribute is None else getattr(module, attribute)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
+
+
+__all__ = ['PlatonusAPI', 'AsyncPlatonusAPI', 'PlatonusClientPool', 'AsyncPlatonusClientPool', 'MarkWatcher', 'AsyncMarkWatcher', 'KeepAliveScheduler', 'AsyncKeepAliveScheduler', 'SessionVault', 'Cassette', 'metrics', 'hooks', 'tracer', 'exceptions']
@@ -1,3 +1,36 @@
-from .base import PlatonusAPI
+from importlib import import_module
+from typing import TYPE_CHECKING
 
-__all__ = ['PlatonusAPI']
+if TYPE_CHECKING:
+    from .async_base import AsyncPlatonusAPI
+    from .async_pool import AsyncPlatonusClientPool
+    from .base import PlatonusAPI
+    from .mark_watcher import AsyncMarkWatcher, MarkWatcher
+    from .pool import PlatonusClientPool
+
+# Модули импортируются при первом обращении к имени (PEP 562): синхронному клиенту не нужны httpx и asyncio,
+# а асинхронному - requests
+_LAZY_ATTRIBUTES = {
+    'PlatonusAPI': '.base',
+    'AsyncPlatonusAPI': '.async_base',
+    'PlatonusClientPool': '.pool',
+    'AsyncPlatonusClientPool': '.async_pool',
+    'MarkWatcher': '.mark_watcher',
+    'AsyncMarkWatcher': '.mark_watcher',
+}
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted({*globals(), *_LAZY_ATTRIBUTES})
+
+
+__all__ = ['PlatonusAPI', 'AsyncPlatonusAPI', 'PlatonusClientPool', 'AsyncPlatonusClientPool', 'MarkWatcher', 'AsyncMarkWatcher']
@@ -1,10 +1,11 @@
 from typing import Literal
 
 from ..const import LanguageCode
+from ..utils.metrics import EndpointManager
 from ..validators import language_code_to_int
 
 
-class ApiMethods:
+class ApiMethods(EndpointManager):
     """Менеджер REST API методов Платонуса
 
     Менеджер нужен:
@@ -18,6 +19,8 @@ class ApiMethods:
         rest_api_version - Принимает версию Платонуса.
     """
 
+    endpoint_prefix = "api"
+
     def __init__(self, language_code: LanguageCode, rest_api_version: float):
         self.language_code_str = language_code
         self.language_code_int = language_code_to_int(language_code)
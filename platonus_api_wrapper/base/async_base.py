@@ -0,0 +1,464 @@
+import logging
+from functools import cached_property
+from typing import Any, Hashable, Iterable, Literal, Optional
+
+from ..const import LanguageCode
+from ..utils import exceptions
+from ..utils.async_request import AsyncRequest, AsyncTransport
+from ..utils.cassette import Cassette
+from ..utils.dict2object import dict2object
+from ..utils.discovery import DiscoveredRestApiVersion, get_host_info
+from ..utils.fanout import agather
+from ..utils.json_backend import JSONBackend
+from ..utils.keepalive import SessionLifetime
+from ..utils.loginizer import AsyncReloginGate, login_required
+from ..utils.lru_cacher import timed_lru_cache
+from ..utils.memory_cacher import MemoryCacherMixin
+from ..utils.paginator import aiter_pages, page_items
+from ..utils.payload import generate_payload
+from ..utils.rate_limit import RateLimiter
+from ..utils.retry import CircuitBreaker, RetryPolicy
+from ..utils.vault import (
+    DEFAULT_ACCOUNT,
+    Credentials,
+    SessionRecord,
+    SessionVault,
+    capture_session,
+    from_requests_session,
+    restore_session,
+    to_requests_session,
+)
+from ..validators import (
+    URLNormalizer,
+    URLValidator,
+    language_code_to_int,
+    validate_language,
+    validate_login_credentials,
+)
+from ..models import Model, ServerTime, StudentTasks
+from .api import ApiMethods
+from .async_has_module import AsyncHasModule
+from .async_has_module_license import AsyncHasModuleLicense
+from .has_module import capability_calls, capability_report
+from .profile.api import ProfileApiMethods
+from .profile.async_methods import AsyncProfile
+from .study_room.api import StudyRoomApi
+from .study_room.async_methods import AsyncStudyRoom
+from .ux.api import UiApiMethods
+from .ux.async_methods import AsyncUI
+
+logger = logging.getLogger("platonus_api_wrapper")
+
+
+class AsyncPlatonusBase(MemoryCacherMixin):
+    """
+    Base class for asynchronous Platonus API.
+
+    Аргументы те же, что и у PlatonusBase. Версия Платонуса запрашивается в initialize() один раз на хост:
+    при входе в async with, при login и перед любым методом, требующим авторизации, так что клиент работает
+    и без async with, например после import_session.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        language: LanguageCode,
+        context_path: str = "/",
+        auto_relogin: bool = True,
+        cache_namespace: Optional[Hashable] = None,
+        cache_maxsize: Optional[int] = None,
+        transport: Optional[AsyncTransport] = None,
+        rest_api_version: Optional[dict2object] = None,
+        json_backend: JSONBackend = "auto",
+        conditional_requests: bool = False,
+        discovery_path: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cassette: Optional[Cassette] = None,
+    ):
+        super().__init__(cache_namespace, cache_maxsize)
+
+        URLValidator(base_url)
+        validate_language(language)
+
+        platonus_url = URLNormalizer(base_url, context_path)
+
+        self.language = language
+
+        self.session = AsyncRequest(
+            platonus_url,
+            transport=transport,
+            json_backend=json_backend,
+            conditional_requests=conditional_requests,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            rate_limiter=rate_limiter,
+            cassette=cassette,
+        )
+        self.session.header = {"language": language_code_to_int(language)}
+
+        self.host_info = get_host_info(platonus_url, discovery_path)
+
+        self._auth_credentials = {}
+        # Одна переавторизация на аккаунт, даже если сессия истекла сразу у нескольких вызовов
+        self._relogin_gate = AsyncReloginGate()
+        # Наблюдаемое время жизни сессии, см. KeepAliveScheduler
+        self._session_lifetime = SessionLifetime()
+
+        self.auto_relogin = auto_relogin
+
+        self._rest_api_version = rest_api_version
+
+        # Менеджеры REST API методов создаются сразу, как у PlatonusAPI. Свойство не может дождаться запроса версии,
+        # поэтому менеджеры берут ее из уже полученных сведений о хосте, см. initialize()
+        if rest_api_version is None:
+            rest_api_version = DiscoveredRestApiVersion(self.host_info)
+        self.api = ApiMethods(self.language, rest_api_version)
+        self.profile_api = ProfileApiMethods(self.language, rest_api_version)
+        self.study_room_api = StudyRoomApi(self.language, rest_api_version)
+        self.ui_api = UiApiMethods(self.language, rest_api_version)
+
+    async def initialize(self):
+        """
+        Запрашивает версию Платонуса, если она еще не известна. Вызывать самому не обязательно:
+        методы, требующие авторизации, и методы, адрес которых зависит от версии, вызывают его сами
+        """
+        if self._rest_api_version is None and self.host_info.version is None:
+            await self.rest_api_information()
+
+    async def close(self):
+        await self.session.close()
+
+    async def __aenter__(self):
+        await self.initialize()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _auth_type_value(self):
+        return (await self.auth_type()).value
+
+    async def rest_api_version(self):
+        rest_info = await self.rest_api_information()
+        return dict2object(
+            {
+                "version": float(rest_info.VERSION),
+                "build_number": int(rest_info.BUILD_NUMBER),
+            }
+        )
+
+    def import_session(self, session_file: str, account: str = DEFAULT_ACCOUNT, credentials: Credentials = None) -> bool:
+        """Импортирует сессию Платонуса из файла, см. PlatonusAPI.import_session"""
+        with SessionVault(session_file) as vault:
+            return vault.restore(account, self, credentials)
+
+    def export_session(self, session_file: str, account: str = DEFAULT_ACCOUNT, credentials_ref: Optional[str] = None):
+        """Экспортирует сессию Платонуса в файл, см. PlatonusAPI.export_session"""
+        with SessionVault(session_file) as vault:
+            vault.capture(account, self, credentials_ref)
+            vault.save()
+
+    def export_session_record(self, credentials_ref: Optional[str] = None) -> SessionRecord:
+        """Возвращает сессию в виде записи хранилища сессий, см. PlatonusAPI.export_session_record"""
+        return capture_session(self, credentials_ref)
+
+    def import_session_record(self, record: SessionRecord, credentials: Credentials = None):
+        """Восстанавливает сессию из записи export_session_record, см. PlatonusAPI.import_session_record"""
+        restore_session(self, record, credentials)
+
+    @property
+    def session_data(self) -> dict[Literal["session", "auth_credentials"], Any]:
+        """Сессия (requests.Session с токеном и куками аккаунта) и авторизационные данные, см. PlatonusAPI.session_data"""
+        return {
+            "session": to_requests_session(self),
+            "auth_credentials": self._auth_credentials,
+        }
+
+    @session_data.setter
+    def session_data(self, value: dict[Literal["session", "auth_credentials"], Any]):
+        if "session" not in value or "auth_credentials" not in value:
+            raise ValueError("Invalid session data")
+
+        from_requests_session(self, value["session"])
+        self._auth_credentials = value["auth_credentials"]
+
+    @property
+    def user_is_authed(self):
+        """Checks whether credentials were passed or a session was imported."""
+        return True if self._auth_credentials or self.session.headers.get("token") else False
+
+
+class AsyncPlatonusAPI(AsyncPlatonusBase):
+    """
+    Асинхронный аналог PlatonusAPI с тем же набором методов. Пример использования:
+
+        async with AsyncPlatonusAPI("http://test4.platonus.kz", language="ru") as platonus_session:
+            await platonus_session.login(login="...", password="...")
+            print(await platonus_session.profile.profile_info())
+    """
+
+    async def login(
+        self,
+        login: Optional[str] = None,
+        password: Optional[str] = None,
+        IIN: Optional[str] = None,
+        icNumber: Optional[str] = None,
+        authForDeductedStudentsAndGraduates: bool = False,
+    ):
+        """Авторизация в Платонус, см. PlatonusAPI.login"""
+        payload = generate_payload(**locals())
+
+        await self.initialize()
+
+        validate_login_credentials(dict2object(payload), await self._auth_type_value())
+
+        response = (await self.session.post(self.api.login, payload)).as_object()
+
+        if response.login_status == "invalid":
+            raise exceptions.NotCorrectLoginCredentials(response.message)
+
+        self.session.header = {"token": response.auth_token}
+        self._session_lifetime.started()
+        self._auth_credentials = payload
+
+        return response
+
+    async def login_with_eds(self):
+        """Авторизация в Платонус при помощи ЭЦП, см. PlatonusAPI.login_with_eds"""
+        raise NotImplementedError("Функция не реализованa")
+
+    @login_required
+    async def logout(self):
+        response = await self.session.post(self.api.logout)
+
+        self._auth_credentials = {}
+        self.session.header = {"token": None}
+        self._session_lifetime.ended()
+        self.cache_clear()
+        if self.session.validators is not None:
+            self.session.validators.clear()
+
+        if response.status_code == 204:
+            return dict2object({"logout_status": "success"})
+        else:
+            return dict2object({"logout_status": "unknown"})
+
+    @login_required
+    async def change_login_or_password(
+        self,
+        old_password: str,
+        new_password: str,
+        confirm_new_password: str,
+        new_login: str = None,
+    ):
+        if not new_login:
+            new_login = self._auth_credentials["login"]
+
+        if new_password != confirm_new_password:
+            raise exceptions.NotCorrectLoginCredentials(
+                "Новый пароль и его подтверждение не совпадают"
+            )
+        elif old_password != self._auth_credentials["password"]:
+            raise exceptions.NotCorrectLoginCredentials(
+                "Вы ввели не верный старый пароль"
+            )
+        elif old_password == new_password:
+            raise exceptions.NotCorrectLoginCredentials(
+                "Новый и старый пароль одинаковы, смысл тогда менять пароль ?!"
+            )
+        elif len(new_login) < 4 or len(new_password) < 4:
+            raise exceptions.NotCorrectLoginCredentials(
+                "Длина логина/пароля должна быть не менее 4 символов"
+            )
+
+        payload = {
+            "login": new_login,
+            "oldPassword": old_password,
+            "password": new_password,
+            "confPassword": confirm_new_password,
+        }
+        response = (await self.session.post("rest/api/changePassword", payload)).as_object()
+
+        self._auth_credentials["login"] = new_login
+        self._auth_credentials["password"] = new_password
+
+        return response
+
+    @login_required
+    @timed_lru_cache(86400)
+    async def applicant_reg_degrees(self):
+        """Возвращает список степеней для поступающих, см. PlatonusAPI.applicant_reg_degrees"""
+        response = await self.session.get(self.api.applicant_reg_degrees)
+        return response.json()
+
+    @login_required
+    @timed_lru_cache(86400)
+    async def university_application_types(self, degree_id: int | Literal[""] = ""):
+        """Возвращает список типов заявлений для поступающих в университет"""
+        response = await self.session.get(self.api.university_application_types(degree_id))
+        return response.json()
+
+    @login_required
+    @timed_lru_cache(86400)
+    async def citizenship_list(self):
+        """Возвращает список гражданств"""
+        response = await self.session.get(self.api.citizenship_list)
+        return response.json()
+
+    @login_required
+    @timed_lru_cache(60)
+    async def student_tasks(
+        self,
+        countInPart,
+        endDate,
+        partNumber,
+        recipientStatus,
+        startDate,
+        studyGroupID="-1",
+        subjectID="-1",
+        term="-1",
+        topic="",
+        tutorID="-1",
+        year="-1",
+    ):
+        """Возвращает все задания ученика"""
+        payload = generate_payload(**locals())
+        response = await self.session.post(self.api.student_tasks, payload)
+        return response.as_object(StudentTasks)
+
+    @login_required
+    async def _student_tasks_page(self, payload, partNumber):
+        """Загружает одну страницу заданий в обход кэша"""
+        response = await self.session.post(
+            self.api.student_tasks, {**payload, "partNumber": str(partNumber)}
+        )
+        return response.as_object(StudentTasks)
+
+    async def iter_student_tasks(
+        self,
+        recipientStatus,
+        startDate,
+        endDate,
+        countInPart=20,
+        studyGroupID="-1",
+        subjectID="-1",
+        term="-1",
+        topic="",
+        tutorID="-1",
+        year="-1",
+        prefetch=1,
+    ):
+        """
+        Асинхронный генератор заданий ученика, см. PlatonusAPI.iter_student_tasks
+
+            async for task in platonus_session.iter_student_tasks(recipientStatus="2", startDate="10-01-2021", endDate="23-02-2021"):
+                print(task.topic)
+        """
+        payload = generate_payload(exclude_list=["prefetch"], **locals())
+        count_in_part = int(countInPart)
+
+        pages = aiter_pages(
+            lambda part_number: self._student_tasks_page(payload, part_number),
+            lambda page: len(page_items(page, ("tasks",))) < count_in_part,
+            concurrency=prefetch,
+        )
+        async for page in pages:
+            for task in page_items(page, ("tasks",)):
+                yield task
+
+    @login_required
+    async def recipient_task_info(self, recipient_task_id):
+        response = await self.session.get(self.api.recipient_task_info(recipient_task_id))
+        return response.as_object()
+
+    @login_required
+    async def study_years_list(self):
+        response = await self.session.get(self.api.study_years_list)
+        return response.as_object()
+
+    @login_required
+    async def get_marks_by_date(self):
+        response = await self.session.get(self.api.get_marks_by_date)
+        return response.as_object()
+
+    @login_required
+    @timed_lru_cache(43200)
+    async def terms_list(self):
+        """Возвращает список семестров"""
+        response = await self.session.get(self.api.terms_list)
+        return response.as_object()
+
+    @login_required
+    @timed_lru_cache(86400)
+    async def recipient_statuses_list(self):
+        """Возвращает список всех возможных статусов задании"""
+        response = await self.session.get(self.api.recipient_statuses_list)
+        return response.as_object()
+
+    async def platonus_icon(self, icon_size: str = "small"):
+        """Возвращает иконку Плаонуса в формате PNG, icon_size: small или big"""
+        response = await self.session.get(f"img/platonus-logo-{icon_size}.png")
+        return response.content
+
+    async def emblem_image(self):
+        """Возвращает эмблему колледжа/университета в формате JPG"""
+        response = await self.session.get("images/emblem.jpg")
+        return response.content
+
+    @timed_lru_cache(30)
+    async def server_time(self):
+        """Возвращает текущее серверное время Плаонуса, см. PlatonusAPI.server_time"""
+        await self.initialize()
+        response = await self.session.get(self.api.server_time)
+        return response.as_object(ServerTime)
+
+    async def rest_api_information(self):
+        """Возвращает данные об Платонусе, см. PlatonusAPI.rest_api_information"""
+        return Model(await self.host_info.aget_version(self._fetch_rest_api_information))
+
+    async def _fetch_rest_api_information(self) -> dict:
+        response = await self.session.get("rest/api/version")
+        return response.json()
+
+    async def licence_type(self) -> str:
+        """Тип лицензии Платонуса, см. PlatonusAPI.licence_type"""
+        return (await self.rest_api_information()).licenceType
+
+    async def auth_type(self):
+        """Возвращает тип авторизации в Платонус, см. PlatonusAPI.auth_type"""
+
+        async def fetch():
+            await self.initialize()
+            response = await self.session.get(self.api.auth_type)
+            return response.json()
+
+        return Model(await self.host_info.aget("auth_type", fetch))
+
+    async def capabilities(
+        self, modules: Iterable[str] = (), licenses: Iterable[str] = (), concurrency: int = 16
+    ) -> dict[str, dict[str, Optional[bool]]]:
+        """Асинхронный аналог PlatonusAPI.capabilities"""
+        calls = capability_calls(self, modules, licenses)
+        return capability_report(calls, *await agather(calls, concurrency))
+
+    @cached_property
+    def profile(self):
+        return AsyncProfile(self)
+
+    @cached_property
+    def has_module(self):
+        return AsyncHasModule(self)
+
+    @cached_property
+    def has_module_license(self):
+        return AsyncHasModuleLicense(self)
+
+    @cached_property
+    def study_room(self):
+        return AsyncStudyRoom(self)
+
+    @cached_property
+    def ui(self):
+        return AsyncUI(self)
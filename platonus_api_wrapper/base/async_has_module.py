@@ -0,0 +1,65 @@
+from typing import Iterable, Optional
+
+from ..utils.base_cls_inject import inheritance_from_base_cls
+from ..utils.fanout import agather
+from ..utils.loginizer import login_required
+from ..utils.lru_cacher import timed_lru_cache
+from .has_module import MODULES, capability_map
+
+
+class AsyncHasModule:
+    def __init__(self, base_cls):
+        self.base_cls = base_cls
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(86400)
+    async def probe(self, module_name: str):
+        """Проверяет, доступен ли аккаунту модуль Платонуса. Результат кэшируется для аккаунта"""
+        response = await self.session.get(self.api.has_module(module_name))
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    async def capabilities(self, modules: Iterable[str] = (), concurrency: int = 8) -> dict[str, Optional[bool]]:
+        """Асинхронный аналог HasModule.capabilities"""
+        names = list(dict.fromkeys([*MODULES.values(), *modules]))
+        results, errors = await agather(
+            {name: (lambda name=name: self.has_module.probe(name)) for name in names}, concurrency
+        )
+        return capability_map(names, results, errors, "hasModule")
+
+    @inheritance_from_base_cls
+    async def profile(self):
+        return await self.has_module.probe("student")
+
+    @inheritance_from_base_cls
+    async def journal(self):
+        return await self.has_module.probe("studentregister")
+
+    @inheritance_from_base_cls
+    async def current_journal(self):
+        return await self.has_module.probe("current_progress_gradebook_student")
+
+    @inheritance_from_base_cls
+    async def assignment(self):
+        return await self.has_module.probe("assignment")
+
+    @inheritance_from_base_cls
+    async def study_room(self):
+        return await self.has_module.probe("studyroom")
+
+    @inheritance_from_base_cls
+    async def messages(self):
+        return await self.has_module.probe("messages")
+
+    @inheritance_from_base_cls
+    async def user_auth(self):
+        return await self.has_module.probe("user_auth")
+
+    @inheritance_from_base_cls
+    async def release(self):
+        return await self.has_module.probe("release")
+
+    @inheritance_from_base_cls
+    async def request_for_developers(self):
+        return await self.has_module.probe("request_for_developers")
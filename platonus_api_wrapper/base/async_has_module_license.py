@@ -0,0 +1,56 @@
+from typing import Iterable, Optional
+
+from ..models import Model
+from ..utils.base_cls_inject import inheritance_from_base_cls
+from ..utils.fanout import agather
+from ..utils.loginizer import login_required
+from .has_module import capability_map
+from .has_module_license import LICENSE_MODULES
+
+
+class AsyncHasModuleLicense:
+    def __init__(self, base_cls):
+        self.base_cls = base_cls
+
+    @inheritance_from_base_cls
+    @login_required
+    async def probe(self, module_name: str):
+        """
+        Проверяет, есть ли у Платонуса лицензия на модуль.
+        Лицензия общая для всего Платонуса, поэтому результат хранится в сведениях о хосте (см. utils/discovery.py)
+        """
+
+        async def fetch():
+            response = await self.session.get(self.api.has_module_license(module_name))
+            return response.json()
+
+        return Model(await self.host_info.aget(f"module_license:{module_name}", fetch))
+
+    @inheritance_from_base_cls
+    async def capabilities(self, modules: Iterable[str] = (), concurrency: int = 8) -> dict[str, Optional[bool]]:
+        """Асинхронный аналог HasModuleLicense.capabilities"""
+        names = list(dict.fromkeys([*LICENSE_MODULES.values(), *modules]))
+        results, errors = await agather(
+            {name: (lambda name=name: self.has_module_license.probe(name)) for name in names}, concurrency
+        )
+        return capability_map(names, results, errors, "hasLicense")
+
+    @inheritance_from_base_cls
+    async def technical_support(self):
+        return await self.has_module_license.probe("technical_support")
+
+    @inheritance_from_base_cls
+    async def online_consultant(self):
+        return await self.has_module_license.probe("online_consultant")
+
+    @inheritance_from_base_cls
+    async def extended_license(self):
+        return await self.has_module_license.probe("extended_license")
+
+    @inheritance_from_base_cls
+    async def profile(self):
+        return await self.has_module_license.probe("profile")
+
+    @inheritance_from_base_cls
+    async def for_visually_impaired(self):
+        return await self.has_module_license.probe("for_visually_impaired")
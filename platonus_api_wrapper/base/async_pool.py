@@ -0,0 +1,41 @@
+from typing import Optional
+
+from ..const import LanguageCode
+from ..utils.async_request import AsyncTransport
+from ..utils.cassette import Cassette
+from .async_base import AsyncPlatonusAPI
+from .pool import _BasePlatonusClientPool
+
+
+class AsyncPlatonusClientPool(_BasePlatonusClientPool):
+    """
+    Асинхронный аналог PlatonusClientPool: все клиенты делят один AsyncTransport.
+    Args:
+        max_connections: максимальное количество соединений к хосту
+        cassette: кассета общего транспорта, см. PlatonusClientPool
+    """
+
+    client_cls = AsyncPlatonusAPI
+
+    def __init__(
+        self,
+        base_url: str,
+        language: LanguageCode = "ru",
+        context_path: str = "/",
+        max_connections: int = 10,
+        max_retries: int = 3,
+        cassette: Optional[Cassette] = None,
+        **client_kwargs,
+    ):
+        super().__init__(base_url, language, context_path, **client_kwargs)
+
+        self.transport = AsyncTransport(max_retries=max_retries, max_connections=max_connections, cassette=cassette)
+
+    async def client(self, account: Optional[str] = None, **kwargs) -> AsyncPlatonusAPI:
+        """Возвращает инициализированный клиент аккаунта поверх общего пула соединений, см. PlatonusClientPool.client"""
+        client = self._get_or_create(account, kwargs)
+        await client.initialize()
+        return client
+
+    async def close(self):
+        await self.transport.close()
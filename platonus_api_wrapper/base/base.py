@@ -2,17 +2,35 @@
 # encoding: utf-8
 
 import logging
-import pickle
-from typing import Any, Literal, Optional
+from functools import cached_property
+from typing import Any, Hashable, Iterable, Literal, Optional
 
 from ..const import LanguageCode
 from ..utils import exceptions
+from ..utils.cassette import Cassette
 from ..utils.dict2object import dict2object
-from ..utils.loginizer import login_required
+from ..utils.discovery import LazyRestApiVersion, get_host_info
+from ..utils.fanout import gather
+from ..utils.json_backend import JSONBackend
+from ..utils.keepalive import SessionLifetime
+from ..utils.loginizer import ReloginGate, login_required
 from ..utils.lru_cacher import timed_lru_cache
 from ..utils.memory_cacher import MemoryCacherMixin
+from ..utils.paginator import iter_pages, page_items
 from ..utils.payload import generate_payload
-from ..utils.request import Request
+from ..utils.rate_limit import RateLimiter
+from ..utils.request import Request, Transport
+from ..utils.retry import CircuitBreaker, RetryPolicy
+from ..utils.vault import (
+    DEFAULT_ACCOUNT,
+    Credentials,
+    SessionRecord,
+    SessionVault,
+    capture_session,
+    from_requests_session,
+    restore_session,
+    to_requests_session,
+)
 from ..validators import (
     URLNormalizer,
     URLValidator,
@@ -20,10 +38,16 @@ from ..validators import (
     validate_language,
     validate_login_credentials,
 )
+from ..models import Model, ServerTime, StudentTasks
 from .api import ApiMethods
-from .has_module import HasModule
+from .has_module import HasModule, capability_calls, capability_report
 from .has_module_license import HasModuleLicense
 from .profile import Profile
+from .profile.api import ProfileApiMethods
+from .study_room import StudyRoom
+from .study_room.api import StudyRoomApi
+from .ux import UI
+from .ux.api import UiApiMethods
 
 """
 Platonus_API_Wrapper
@@ -48,6 +72,21 @@ class PlatonusBase(MemoryCacherMixin):
                     и вести там главную страницу колледжа, а Платонус поставить на example.kz/platonus, вот как раз /platonus является контекстом Платонуса.
                     Более подробнее читайте здесь: https://medium.com/javascript-essentials/what-is-context-path-d442b3de164b
         auto_relogin_after_session_expires: автоматическая реавторизация после истекании срока сессии
+        cache_namespace: пространство имен кэша, например логин аккаунта. Клиенты с одинаковым пространством имен делят кэш
+        cache_maxsize: ограничение количества записей в кэше каждого метода
+        transport: общий пул соединений, см. PlatonusClientPool. По умолчанию у клиента свой пул
+        rest_api_version: заранее известная версия Платонуса. По умолчанию версия запрашивается лениво, при первой
+                          необходимости, один раз на хост, см. utils/discovery.py
+        json_backend: библиотека для декодирования JSON: auto (orjson/ujson, если установлены), orjson, ujson, stdlib или своя функция
+        conditional_requests: отправлять условные GET запросы (ETag/Last-Modified), статистика в session.validators.stats().
+                              Выключено по умолчанию: тела последних ответов хранятся в памяти клиента
+        discovery_path: JSON файл, в котором между запусками хранятся версия, билд, тип лицензии и тип авторизации Платонуса
+        retry_policy: повтор идемпотентных запросов с экспоненциальной задержкой, см. utils/retry.py
+        circuit_breaker: предохранитель хоста, по умолчанию общий для всех клиентов этого Платонуса в процессе
+        rate_limiter: ограничитель запросов в секунду и одновременных запросов к хосту, по умолчанию общий
+                      для всех клиентов этого Платонуса в процессе, см. utils/rate_limit.py
+        cassette: запись и воспроизведение ответов Платонуса без сети, см. utils/cassette.py.
+                  Вместе с transport не передается: кассету подключают к общему транспорту
     """
 
     def __init__(
@@ -56,8 +95,19 @@ class PlatonusBase(MemoryCacherMixin):
         language: LanguageCode,
         context_path: str = "/",
         auto_relogin: bool = True,
+        cache_namespace: Optional[Hashable] = None,
+        cache_maxsize: Optional[int] = None,
+        transport: Optional[Transport] = None,
+        rest_api_version: Optional[dict2object] = None,
+        json_backend: JSONBackend = "auto",
+        conditional_requests: bool = False,
+        discovery_path: Optional[str] = None,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cassette: Optional[Cassette] = None,
     ):
-        super().__init__()
+        super().__init__(cache_namespace, cache_maxsize)
 
         # Проверка URL адреса на валидность
         URLValidator(base_url)
@@ -69,40 +119,90 @@ class PlatonusBase(MemoryCacherMixin):
         platonus_url = URLNormalizer(base_url, context_path)
 
         # Инициализируем сессию
-        self.session = Request(platonus_url)
+        self.session = Request(
+            platonus_url,
+            transport=transport,
+            json_backend=json_backend,
+            conditional_requests=conditional_requests,
+            retry_policy=retry_policy,
+            circuit_breaker=circuit_breaker,
+            rate_limiter=rate_limiter,
+            cassette=cassette,
+        )
 
         # Инициализируем язык Платонуса в хэйдер запросов
-        self.session.request_header = {"language": language_code_to_int(language)}
+        self.session.header = {"language": language_code_to_int(language)}
 
         # Инициализируем хранилище значении авторизационных данных, чтобы можно было автоматическии переавторизоватся в случае истекании сессиии
         self._auth_credentials = {}
-
-        # Инициализируем менеджер REST API методов
-        self.api = ApiMethods(language, self.rest_api_version)
+        # Одна переавторизация на аккаунт, даже если сессия истекла сразу у нескольких вызовов
+        self._relogin_gate = ReloginGate()
+        # Наблюдаемое время жизни сессии, см. KeepAliveScheduler
+        self._session_lifetime = SessionLifetime()
+
+        # Сведения о Платонусе общие для всех клиентов одного хоста и запрашиваются только при первой необходимости
+        self.host_info = get_host_info(platonus_url, discovery_path)
+
+        # Инициализируем менеджеры REST API методов
+        if rest_api_version is None:
+            rest_api_version = LazyRestApiVersion(self.host_info, self._fetch_rest_api_information)
+        self.api = ApiMethods(language, rest_api_version)
+        self.profile_api = ProfileApiMethods(language, rest_api_version)
+        self.study_room_api = StudyRoomApi(language, rest_api_version)
+        self.ui_api = UiApiMethods(language, rest_api_version)
 
         # Инициализируем значение автоматиеского релогина после истечений действий сессии
         self.auto_relogin = auto_relogin
 
-    def import_session(self, session_file):
+    def import_session(self, session_file: str, account: str = DEFAULT_ACCOUNT, credentials: Credentials = None) -> bool:
         """
         Импортирует сессию Платонуса из файла. Это позваляет каждый раз не логинится,
         достаточно залогинится, экспортировать сессию через export_session и в нужый момент зайти в сессию через import_session.
+
+        Пароли в файл не сохраняются, поэтому для автоматической переавторизации передайте авторизационные данные
+        через credentials: словарь, либо функцию, получающую их по credentials_ref, указанному при экспорте.
+        Сессии множества аккаунтов удобнее хранить в одном файле, см. utils/vault.py
+        Returns:
+            False, если сессии аккаунта в файле нет
         """
-        with open(session_file, "rb") as f:
-            self.session_data = pickle.load(f)
+        with SessionVault(session_file) as vault:
+            return vault.restore(account, self, credentials)
 
-    def export_session(self, session_file):
+    def export_session(self, session_file: str, account: str = DEFAULT_ACCOUNT, credentials_ref: Optional[str] = None):
         """
         Экспортирует сессию Платонуса в файл. Это позваляет каждый раз не логинится,
         достаточно залогинится, экспортировать сессию через export_session и в нужый момент зайти в сессию через import_session.
+
+        Сохраняются токен, куки и сведения о Платонусе. Сессии других аккаунтов в том же файле сохраняются
+        Args:
+            account: аккаунт, под которым сессия хранится в файле
+            credentials_ref: ссылка на авторизационные данные во внешнем хранилище, передается в credentials при импорте
         """
-        with open(session_file, "wb") as f:
-            pickle.dump(self.session_data, f)
+        with SessionVault(session_file) as vault:
+            vault.capture(account, self, credentials_ref)
+            vault.save()
+
+    def export_session_record(self, credentials_ref: Optional[str] = None) -> SessionRecord:
+        """
+        Возвращает сессию в виде записи хранилища сессий (токен, куки, наблюдения за временем жизни сессии) без
+        записи в файл, например для своего хранилища. Пароль в запись не попадает, см. utils/vault.py
+        Args:
+            credentials_ref: ссылка на авторизационные данные во внешнем хранилище
+        """
+        return capture_session(self, credentials_ref)
+
+    def import_session_record(self, record: SessionRecord, credentials: Credentials = None):
+        """Восстанавливает сессию из записи export_session_record, аргумент credentials - как у import_session"""
+        restore_session(self, record, credentials)
 
     @property
     def session_data(self) -> dict[Literal["session", "auth_credentials"], Any]:
+        """
+        Сессия (requests.Session с токеном и куками аккаунта) и авторизационные данные.
+        Для хранения сессий без паролей используйте export_session_record или export_session
+        """
         return {
-            "session": self.session.request_session,
+            "session": to_requests_session(self),
             "auth_credentials": self._auth_credentials,
         }
 
@@ -111,7 +211,7 @@ class PlatonusBase(MemoryCacherMixin):
         if "session" not in value or "auth_credentials" not in value:
             raise ValueError("Invalid session data")
 
-        self.session.request_session = value["session"]
+        from_requests_session(self, value["session"])
         self._auth_credentials = value["auth_credentials"]
 
     @property
@@ -128,10 +228,18 @@ class PlatonusBase(MemoryCacherMixin):
             }
         )
 
+    @property
+    def licence_type(self) -> str:
+        """Тип лицензии Платонуса: college - колледж, university - университет"""
+        return self.rest_api_information().licenceType
+
+    def _fetch_rest_api_information(self) -> dict:
+        return self.session.get("rest/api/version").json()
+
     @property
     def user_is_authed(self):
-        """Checks whether credentials were passed."""
-        return True if self._auth_credentials else False
+        """Checks whether credentials were passed or a session was imported."""
+        return True if self._auth_credentials or self.session.headers.get("token") else False
 
     def __del__(self):
         """
@@ -189,6 +297,7 @@ class PlatonusAPI(PlatonusBase):
             raise exceptions.NotCorrectLoginCredentials(response.message)
 
         self.session.header = {"token": response.auth_token}
+        self._session_lifetime.started()
         self._auth_credentials = payload
 
         return response
@@ -212,8 +321,11 @@ class PlatonusAPI(PlatonusBase):
         self._auth_credentials = {}
         # И заодно токен тоже удаляем из хейдера запросов
         self.session.header = {"token": None}
-        # Очищаем хранилище кэша от закэшированных запросов
-        del self._cached_functions_list
+        self._session_lifetime.ended()
+        # Очищаем хранилище кэша от закэшированных запросов этого клиента
+        self.cache_clear()
+        if self.session.validators is not None:
+            self.session.validators.clear()
 
         # После отправки запроса на выход из сессии сервер Платонуса ничего не отправляет кроме статус кода
         if response.status_code == 204:
@@ -364,9 +476,53 @@ class PlatonusAPI(PlatonusBase):
     ):
         """Возвращает все задания ученика"""
         payload = generate_payload(**locals())
-        response = self.session.post(self.api.student_tasks, payload).as_object()
+        response = self.session.post(self.api.student_tasks, payload).as_object(StudentTasks)
         return response
 
+    @login_required
+    def _student_tasks_page(self, payload, partNumber):
+        """Загружает одну страницу заданий в обход кэша"""
+        return self.session.post(
+            self.api.student_tasks, {**payload, "partNumber": str(partNumber)}
+        ).as_object(StudentTasks)
+
+    def iter_student_tasks(
+        self,
+        recipientStatus,
+        startDate,
+        endDate,
+        countInPart=20,
+        studyGroupID="-1",
+        subjectID="-1",
+        term="-1",
+        topic="",
+        tutorID="-1",
+        year="-1",
+        prefetch=1,
+    ):
+        """
+        Генератор, постранично отдающий задания ученика. Номер страницы (partNumber) перебирается сам,
+        пока Платонус не вернет неполную страницу. Следующая страница загружается, пока обрабатывается текущая,
+        в памяти держится не больше prefetch + 1 страниц.
+        Args:
+            countInPart: количество заданий на странице
+            prefetch: сколько страниц загружать заранее
+            остальные аргументы - см. student_tasks
+
+            for task in platonus_session.iter_student_tasks(recipientStatus="2", startDate="10-01-2021", endDate="23-02-2021"):
+                print(task.topic)
+        """
+        payload = generate_payload(exclude_list=["prefetch"], **locals())
+        count_in_part = int(countInPart)
+
+        pages = iter_pages(
+            lambda part_number: self._student_tasks_page(payload, part_number),
+            lambda page: len(page_items(page, ("tasks",))) < count_in_part,
+            concurrency=prefetch,
+        )
+        for page in pages:
+            yield from page_items(page, ("tasks",))
+
     @login_required
     def recipient_task_info(self, recipient_task_id):
         response = self.session.get(
@@ -422,10 +578,9 @@ class PlatonusAPI(PlatonusBase):
             date: дата
             dayOfWeek: день недели
         """
-        response = self.session.get(self.api.server_time).as_object()
+        response = self.session.get(self.api.server_time).as_object(ServerTime)
         return response
 
-    @timed_lru_cache(600)
     def rest_api_information(self):
         """
         Возвращает данные об Платонусе
@@ -439,10 +594,8 @@ class PlatonusAPI(PlatonusBase):
             licenceType (appType): тип лицензии / для кого предназначен - college: колледж
                                                                           university: университет
         """
-        response = self.session.get("rest/api/version").as_object()
-        return response
+        return Model(self.host_info.get_version(self._fetch_rest_api_information))
 
-    @timed_lru_cache(3600)
     def auth_type(self):
         """
         Возвращает тип авторизации в Платонус
@@ -452,17 +605,38 @@ class PlatonusAPI(PlatonusBase):
                     3 - ИИН и пароль
                     4 - ничего (?)
         """
-        response = self.session.get(self.api.auth_type).as_object()
-        return response
+        return Model(self.host_info.get("auth_type", lambda: self.session.get(self.api.auth_type).json()))
 
-    @property
+    def capabilities(
+        self, modules: Iterable[str] = (), licenses: Iterable[str] = (), concurrency: int = 16
+    ) -> dict[str, dict[str, Optional[bool]]]:
+        """
+        Проверяет доступность всех модулей (HasModule.capabilities) и лицензий (HasModuleLicense.capabilities)
+        одной волной параллельных запросов, к примеру сразу после логина, чтобы решить, какие меню показывать
+        Args:
+            modules, licenses: дополнительные модули Платонуса
+        Returns:
+            {"modules": {модуль: True/False/None}, "licenses": {модуль: True/False/None}}
+        """
+        calls = capability_calls(self, modules, licenses)
+        return capability_report(calls, *gather(calls, concurrency))
+
+    @cached_property
     def profile(self):
         return Profile(self)
 
-    @property
+    @cached_property
     def has_module(self):
         return HasModule(self)
 
-    @property
+    @cached_property
     def has_module_license(self):
         return HasModuleLicense(self)
+
+    @cached_property
+    def study_room(self):
+        return StudyRoom(self)
+
+    @cached_property
+    def ui(self):
+        return UI(self)
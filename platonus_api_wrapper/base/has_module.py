@@ -1,7 +1,83 @@
+from typing import Any, Callable, Iterable, Optional
+
 from ..utils.base_cls_inject import inheritance_from_base_cls
+from ..utils.fanout import gather
 from ..utils.loginizer import login_required
 from ..utils.lru_cacher import timed_lru_cache
 
+# Методы HasModule и соответствующие им модули Платонуса
+MODULES = {
+    "profile": "student",
+    "journal": "studentregister",
+    "current_journal": "current_progress_gradebook_student",
+    "assignment": "assignment",
+    "study_room": "studyroom",
+    "messages": "messages",
+    "user_auth": "user_auth",
+    "release": "release",
+    "request_for_developers": "request_for_developers",
+}
+
+# Методы HasModuleLicense и соответствующие им модули Платонуса
+LICENSE_MODULES = {
+    "technical_support": "technical_support",
+    "online_consultant": "online_consultant",
+    "extended_license": "extended_license",
+    "profile": "profile",
+    "for_visually_impaired": "for_visually_impaired",
+}
+
+
+def capability_map(names: Iterable[str], results: dict, errors: dict, field: str) -> dict[str, Optional[bool]]:
+    """Собирает {модуль: доступен ли}. Для модулей, которые не удалось проверить, значение None"""
+    capabilities = {}
+    for name in names:
+        if name in errors:
+            capabilities[name] = None
+        else:
+            capabilities[name] = bool(results[name].get(field))
+    return capabilities
+
+
+# Разделы ответа capabilities клиента и поле, в котором probe возвращает доступность
+CAPABILITY_FIELDS = {"modules": "hasModule", "licenses": "hasLicense"}
+
+
+def capability_calls(
+    client, modules: Iterable[str] = (), licenses: Iterable[str] = ()
+) -> dict[tuple[str, str], Callable[[], Any]]:
+    """
+    Проверки для capabilities клиента (PlatonusAPI или AsyncPlatonusAPI): ключ - (раздел, модуль),
+    значение - вызов probe, для асинхронного клиента он возвращает корутину
+    """
+    calls = {
+        ("modules", name): (lambda name=name: client.has_module.probe(name))
+        for name in dict.fromkeys([*MODULES.values(), *modules])
+    }
+    calls.update(
+        {
+            ("licenses", name): (lambda name=name: client.has_module_license.probe(name))
+            for name in dict.fromkeys([*LICENSE_MODULES.values(), *licenses])
+        }
+    )
+    return calls
+
+
+def capability_report(
+    calls: dict[tuple[str, str], Any], results: dict, errors: dict
+) -> dict[str, dict[str, Optional[bool]]]:
+    """Раскладывает результаты проверок capability_calls по разделам: {"modules": {...}, "licenses": {...}}"""
+    report = {}
+    for kind, field in CAPABILITY_FIELDS.items():
+        names = [name for call_kind, name in calls if call_kind == kind]
+        report[kind] = capability_map(
+            names,
+            {name: results[kind, name] for name in names if (kind, name) in results},
+            {name: errors[kind, name] for name in names if (kind, name) in errors},
+            field,
+        )
+    return report
+
 
 class HasModule:
     def __init__(self, base_cls):
@@ -10,66 +86,56 @@ class HasModule:
     @inheritance_from_base_cls
     @login_required
     @timed_lru_cache(86400)
+    def probe(self, module_name: str):
+        """Проверяет, доступен ли аккаунту модуль Платонуса. Результат кэшируется для аккаунта"""
+        response = self.session.get(self.api.has_module(module_name))
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    def capabilities(self, modules: Iterable[str] = (), concurrency: int = 8) -> dict[str, Optional[bool]]:
+        """
+        Проверяет все известные модули (MODULES) и дополнительные modules параллельно, за одно ожидание
+        Returns:
+            {модуль Платонуса: True/False}, None - если модуль не удалось проверить
+        """
+        names = list(dict.fromkeys([*MODULES.values(), *modules]))
+        results, errors = gather(
+            {name: (lambda name=name: self.has_module.probe(name)) for name in names}, concurrency
+        )
+        return capability_map(names, results, errors, "hasModule")
+
+    @inheritance_from_base_cls
     def profile(self):
-        response = self.session.get(self.api.has_module("student")).as_object()
-        return response
+        return self.has_module.probe("student")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def journal(self):
-        response = self.session.get(self.api.has_module("studentregister")).as_object()
-        return response
+        return self.has_module.probe("studentregister")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def current_journal(self):
-        response = self.session.get(
-            self.api.has_module("current_progress_gradebook_student")
-        ).as_object()
-        return response
+        return self.has_module.probe("current_progress_gradebook_student")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def assignment(self):
-        response = self.session.get(self.api.has_module("assignment")).as_object()
-        return response
+        return self.has_module.probe("assignment")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def study_room(self):
-        response = self.session.get(self.api.has_module("studyroom")).as_object()
-        return response
+        return self.has_module.probe("studyroom")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def messages(self):
-        response = self.session.get(self.api.has_module("messages")).as_object()
-        return response
+        return self.has_module.probe("messages")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def user_auth(self):
-        response = self.session.get(self.api.has_module("user_auth")).as_object()
-        return response
+        return self.has_module.probe("user_auth")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def release(self):
-        response = self.session.get(self.api.has_module("release")).as_object()
-        return response
+        return self.has_module.probe("release")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def request_for_developers(self):
-        response = self.session.get(
-            self.api.has_module("request_for_developers")
-        ).as_object()
-        return response
+        return self.has_module.probe("request_for_developers")
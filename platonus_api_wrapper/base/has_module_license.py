@@ -1,6 +1,10 @@
+from typing import Iterable, Optional
+
+from ..models import Model
 from ..utils.base_cls_inject import inheritance_from_base_cls
+from ..utils.fanout import gather
 from ..utils.loginizer import login_required
-from ..utils.lru_cacher import timed_lru_cache
+from .has_module import LICENSE_MODULES, capability_map
 
 
 class HasModuleLicense:
@@ -9,43 +13,47 @@ class HasModuleLicense:
 
     @inheritance_from_base_cls
     @login_required
-    @timed_lru_cache(86400)
+    def probe(self, module_name: str):
+        """
+        Проверяет, есть ли у Платонуса лицензия на модуль.
+        Лицензия общая для всего Платонуса, поэтому результат хранится в сведениях о хосте (см. utils/discovery.py)
+        """
+        return Model(
+            self.host_info.get(
+                f"module_license:{module_name}",
+                lambda: self.session.get(self.api.has_module_license(module_name)).json(),
+            )
+        )
+
+    @inheritance_from_base_cls
+    def capabilities(self, modules: Iterable[str] = (), concurrency: int = 8) -> dict[str, Optional[bool]]:
+        """
+        Проверяет все известные лицензии модулей (LICENSE_MODULES) и дополнительные modules параллельно, за одно ожидание
+        Returns:
+            {модуль Платонуса: True/False}, None - если модуль не удалось проверить
+        """
+        names = list(dict.fromkeys([*LICENSE_MODULES.values(), *modules]))
+        results, errors = gather(
+            {name: (lambda name=name: self.has_module_license.probe(name)) for name in names}, concurrency
+        )
+        return capability_map(names, results, errors, "hasLicense")
+
+    @inheritance_from_base_cls
     def technical_support(self):
-        response = self.session.get(
-            self.api.has_module_license("technical_support")
-        ).as_object()
-        return response
+        return self.has_module_license.probe("technical_support")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def online_consultant(self):
-        response = self.session.get(
-            self.api.has_module_license("online_consultant")
-        ).as_object()
-        return response
+        return self.has_module_license.probe("online_consultant")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def extended_license(self):
-        response = self.session.get(
-            self.api.has_module_license("extended_license")
-        ).as_object()
-        return response
+        return self.has_module_license.probe("extended_license")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def profile(self):
-        response = self.session.get(self.api.has_module_license("profile")).as_object()
-        return response
+        return self.has_module_license.probe("profile")
 
     @inheritance_from_base_cls
-    @login_required
-    @timed_lru_cache(86400)
     def for_visually_impaired(self):
-        response = self.session.get(
-            self.api.has_module_license("for_visually_impaired")
-        ).as_object()
-        return response
+        return self.has_module_license.probe("for_visually_impaired")
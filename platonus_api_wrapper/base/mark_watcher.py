@@ -0,0 +1,277 @@
+import datetime
+import hashlib
+import json
+from typing import Any, Iterable, NamedTuple, Optional, Union
+
+from ..models import Model, ModelList
+
+
+class NewMark(NamedTuple):
+    """В журнале появилась новая оценка"""
+
+    subject_id: Any
+    subject_name: str
+    key: str
+    mark: Any
+
+
+class MarkChanged(NamedTuple):
+    """Оценка в журнале изменилась"""
+
+    subject_id: Any
+    subject_name: str
+    key: str
+    old_mark: Any
+    new_mark: Any
+
+
+class MarkRemoved(NamedTuple):
+    """Оценка пропала из журнала"""
+
+    subject_id: Any
+    subject_name: str
+    key: str
+    mark: Any
+
+
+class NewTask(NamedTuple):
+    """Появилось новое задание"""
+
+    task_id: Any
+    task: Model
+
+
+Event = Union[NewMark, MarkChanged, MarkRemoved, NewTask]
+
+# Поля, по которым оценка узнается между опросами
+MARK_ID_FIELDS = ("ID", "markID")
+# Сколько ID заданий хранится в снимке, чтобы найти место, где начинаются уже известные задания
+MAX_KNOWN_TASKS = 500
+
+
+def current_study_term(today: Optional[datetime.date] = None) -> tuple[int, int]:
+    """Возвращает (учебный год, семестр) на дату: сентябрь-январь - первый семестр, февраль-август - второй"""
+    today = today or datetime.date.today()
+    if today.month >= 9:
+        return today.year, 1
+    if today.month == 1:
+        return today.year - 1, 1
+    return today.year - 1, 2
+
+
+def _digest(value: Any) -> str:
+    raw = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str).encode()
+    return hashlib.blake2b(raw, digest_size=8).hexdigest()
+
+
+def _raw(value: Any) -> Any:
+    if isinstance(value, Model):
+        return value.to_dict()
+    if isinstance(value, ModelList):
+        return value.to_list()
+    return value
+
+
+def _mark_entries(marks: Iterable) -> dict[str, Any]:
+    """Превращает список оценок предмета в {ключ оценки: значение}"""
+    entries = {}
+    dates_seen: dict[Any, int] = {}
+
+    for index, mark in enumerate(marks):
+        if not isinstance(mark, dict):
+            entries[f"#{index}"] = mark
+            continue
+
+        key = next((f"id:{mark[field]}" for field in MARK_ID_FIELDS if field in mark), None)
+        if key is None and "date" in mark:
+            # Несколько оценок за один день различаются порядковым номером
+            occurrence = dates_seen.get(mark["date"], 0)
+            dates_seen[mark["date"]] = occurrence + 1
+            key = f"{mark['date']}#{occurrence}"
+
+        entries[key or f"#{index}"] = mark.get("mark", mark)
+
+    return entries
+
+
+class _BaseMarkWatcher:
+    def __init__(
+        self,
+        client,
+        year: Optional[int] = None,
+        term: Optional[int] = None,
+        tasks_query: Optional[dict[str, Any]] = None,
+        snapshot: Optional[dict[str, Any]] = None,
+        check_marks_by_date: bool = True,
+    ):
+        self.client = client
+        self.year = year
+        self.term = term
+        self.tasks_query = tasks_query
+        self.check_marks_by_date = check_marks_by_date
+        self._snapshot = snapshot or {}
+
+    @property
+    def snapshot(self) -> dict[str, Any]:
+        """Текущий снимок в виде JSON-совместимого словаря, его можно сохранить и передать в конструктор"""
+        return self._snapshot
+
+    def _current_term(self) -> tuple[int, int]:
+        if self.year is not None and self.term is not None:
+            return self.year, self.term
+        return current_study_term()
+
+    def _journal_unchanged(self, year: int, term: int, marks_by_date: Any) -> bool:
+        """Журнал семестра можно не загружать: оценки по датам не изменились с последнего снимка,
+        и снимок сделан сегодня (раз в день журнал сверяется целиком)"""
+        return (
+            self._snapshot.get("year_term") == [year, term]
+            and self._snapshot.get("marks_by_date") == _digest(_raw(marks_by_date))
+            and self._snapshot.get("since") == datetime.date.today().isoformat()
+        )
+
+    def _remember_marks_by_date(self, marks_by_date: Any):
+        self._snapshot["marks_by_date"] = _digest(_raw(marks_by_date))
+        self._snapshot["since"] = datetime.date.today().isoformat()
+
+    def _diff_journal(self, year: int, term: int, journal: Iterable) -> list[Event]:
+        if self._snapshot.get("year_term") != [year, term]:
+            # Новый семестр - запоминаем его как исходное состояние, не порождая событий
+            baseline = True
+            self._snapshot = {"year_term": [year, term], "subjects": {}, "tasks": self._snapshot.get("tasks")}
+        else:
+            baseline = False
+
+        subjects = self._snapshot["subjects"]
+        seen = set()
+        events = []
+
+        for subject in journal:
+            raw = subject.to_dict() if isinstance(subject, Model) else subject
+            subject_id = raw.get("subjectID")
+            subject_name = raw.get("subjectName", "")
+            marks = raw.get("marks") or []
+            seen.add(str(subject_id))
+
+            digest = _digest(marks)
+            stored = subjects.get(str(subject_id))
+            # Неизменившийся предмет пропускается без разбора оценок
+            if stored is not None and stored["digest"] == digest:
+                continue
+
+            entries = _mark_entries(marks)
+            subjects[str(subject_id)] = {"id": subject_id, "name": subject_name, "digest": digest, "marks": entries}
+
+            if baseline:
+                continue
+
+            old_entries = stored["marks"] if stored else {}
+            for key, mark in entries.items():
+                if key not in old_entries:
+                    events.append(NewMark(subject_id, subject_name, key, mark))
+                elif old_entries[key] != mark:
+                    events.append(MarkChanged(subject_id, subject_name, key, old_entries[key], mark))
+            for key, mark in old_entries.items():
+                if key not in entries:
+                    events.append(MarkRemoved(subject_id, subject_name, key, mark))
+
+        # Предмет пропал из журнала - пропали и все его оценки
+        for subject_key in [key for key in subjects if key not in seen]:
+            stored = subjects.pop(subject_key)
+            if baseline:
+                continue
+            subject_id, subject_name = stored.get("id", subject_key), stored.get("name", "")
+            events += [MarkRemoved(subject_id, subject_name, key, mark) for key, mark in stored["marks"].items()]
+
+        return events
+
+    def _diff_tasks(self, new_tasks: list[tuple[Any, Model]]) -> list[Event]:
+        known = self._snapshot.get("tasks")
+        self._snapshot["tasks"] = ([task_id for task_id, _ in new_tasks] + (known or []))[:MAX_KNOWN_TASKS]
+
+        if known is None:
+            return []
+        return [NewTask(task_id, task) for task_id, task in new_tasks]
+
+    def _known_tasks(self) -> set:
+        return set(self._snapshot.get("tasks") or ())
+
+
+class MarkWatcher(_BaseMarkWatcher):
+    """
+    Отслеживает изменения оценок и заданий одного аккаунта
+
+    Каждый опрос сначала запрашивает легкий get_marks_by_date (оценки по датам) и сравнивает его хэш со снимком:
+    если оценки не менялись с последнего опроса, журнал не загружается. Иначе загружается только журнал текущего
+    семестра, сравнивается с компактным снимком (хэш оценок каждого предмета и сами оценки) и возвращаются
+    типизированные события. Предметы с неизменившимся хэшем не разбираются, для пропавших из журнала предметов
+    возвращается MarkRemoved по каждой оценке. Раз в день (дата последнего снимка - since) журнал сверяется целиком.
+    Задания читаются только до первого уже известного.
+    Первый опрос (и первый опрос в новом семестре) только запоминает состояние.
+
+        watcher = MarkWatcher(platonus_session)
+        while True:
+            for event in watcher.poll():
+                if isinstance(event, NewMark):
+                    print(event.subject_name, event.mark)
+            time.sleep(300)
+
+    Args:
+        client: авторизованный PlatonusAPI
+        year, term: отслеживаемый семестр, по умолчанию текущий (см. current_study_term)
+        tasks_query: аргументы iter_student_tasks (recipientStatus, startDate, endDate...). Если не указаны,
+                     задания не отслеживаются. Платонус отдает задания от новых к старым
+        snapshot: сохраненный ранее снимок (MarkWatcher.snapshot)
+        check_marks_by_date: проверять get_marks_by_date перед загрузкой журнала. False - журнал загружается
+                             при каждом опросе
+    """
+
+    def poll(self) -> list[Event]:
+        year, term = self._current_term()
+        events = []
+
+        marks_by_date = self.client.get_marks_by_date() if self.check_marks_by_date else None
+        if marks_by_date is None or not self._journal_unchanged(year, term, marks_by_date):
+            events += self._diff_journal(year, term, self.client.study_room._student_journal(year, term))
+            if marks_by_date is not None:
+                self._remember_marks_by_date(marks_by_date)
+
+        if self.tasks_query is not None:
+            known = self._known_tasks()
+            new_tasks = []
+            for task in self.client.iter_student_tasks(**self.tasks_query):
+                if task.get("ID") in known:
+                    break
+                new_tasks.append((task.get("ID"), task))
+            events += self._diff_tasks(new_tasks)
+
+        return events
+
+
+class AsyncMarkWatcher(_BaseMarkWatcher):
+    """Асинхронный аналог MarkWatcher для AsyncPlatonusAPI"""
+
+    async def poll(self) -> list[Event]:
+        year, term = self._current_term()
+        events = []
+
+        marks_by_date = await self.client.get_marks_by_date() if self.check_marks_by_date else None
+        if marks_by_date is None or not self._journal_unchanged(year, term, marks_by_date):
+            events += self._diff_journal(year, term, await self.client.study_room._student_journal(year, term))
+            if marks_by_date is not None:
+                self._remember_marks_by_date(marks_by_date)
+
+        if self.tasks_query is not None:
+            known = self._known_tasks()
+            new_tasks = []
+            tasks = self.client.iter_student_tasks(**self.tasks_query)
+            try:
+                async for task in tasks:
+                    if task.get("ID") in known:
+                        break
+                    new_tasks.append((task.get("ID"), task))
+            finally:
+                await tasks.aclose()
+            events += self._diff_tasks(new_tasks)
+
+        return events
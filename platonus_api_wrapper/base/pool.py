@@ -0,0 +1,168 @@
+import sys
+import threading
+import weakref
+from typing import Any, Optional
+
+from ..const import LanguageCode
+from ..utils.cassette import Cassette
+from ..utils.rate_limit import get_rate_limiter
+from ..utils.request import Transport
+from ..utils.retry import get_circuit_breaker
+from ..validators import URLNormalizer, URLValidator, validate_language
+from .base import PlatonusAPI
+
+
+def _deep_sizeof(obj: Any, shared_ids: set[int], seen: Optional[set[int]] = None) -> int:
+    """Приблизительный размер объекта в байтах без учета общих объектов (транспорт, версия Платонуса)"""
+    if seen is None:
+        seen = set()
+
+    if id(obj) in seen or id(obj) in shared_ids or isinstance(obj, type):
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, dict):
+        size += sum(
+            _deep_sizeof(key, shared_ids, seen) + _deep_sizeof(value, shared_ids, seen)
+            for key, value in list(obj.items())
+        )
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(_deep_sizeof(item, shared_ids, seen) for item in list(obj))
+    elif hasattr(obj, "__dict__"):
+        size += _deep_sizeof(vars(obj), shared_ids, seen)
+
+    return size
+
+
+class _BasePlatonusClientPool:
+    client_cls: type
+
+    def __init__(
+        self,
+        base_url: str,
+        language: LanguageCode = "ru",
+        context_path: str = "/",
+        **client_kwargs,
+    ):
+        URLValidator(base_url)
+        validate_language(language)
+
+        self.base_url = base_url
+        self.language = language
+        self.context_path = context_path
+        self.platonus_url = URLNormalizer(base_url, context_path)
+        self.client_kwargs = client_kwargs
+
+        self._clients: "weakref.WeakValueDictionary[str, Any]" = weakref.WeakValueDictionary()
+        self._lock = threading.Lock()
+
+    def _new_client(self, account: Optional[str], **kwargs):
+        kwargs = {**self.client_kwargs, **kwargs}
+        kwargs.setdefault("cache_namespace", account)
+
+        return self.client_cls(
+            self.base_url,
+            self.language,
+            self.context_path,
+            transport=self.transport,
+            **kwargs,
+        )
+
+    def _get_or_create(self, account: Optional[str], kwargs: dict[str, Any]):
+        """Живой клиент аккаунта или новый. Под блокировкой, чтобы одновременные вызовы не создали два клиента"""
+        with self._lock:
+            client = self._clients.get(account) if account is not None else None
+            if client is None:
+                client = self._new_client(account, **kwargs)
+                self._clients[account if account is not None else str(id(client))] = client
+            return client
+
+    def get(self, account: str):
+        """Возвращает уже созданный клиент аккаунта или None"""
+        return self._clients.get(account)
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Статистика пула для расчета размеров воркеров
+        Returns:
+            handles: количество живых клиентов
+            memory_per_handle: средний размер клиента в байтах без учета общего пула соединений
+            sockets: соединения по каждому хосту, см. Transport.sockets
+            circuit_breaker: состояние предохранителя хоста и количество повторов, см. CircuitBreaker.stats
+            rate_limiter: очередь и время ожидания ограничителя запросов к хосту, см. RateLimiter.stats
+        """
+        clients = list(self._clients.values())
+
+        shared_ids = {id(self.transport), id(self.transport.session)}
+        for client in clients:
+            shared_ids.update(
+                (
+                    id(client.host_info),
+                    id(client.session.retry_policy),
+                    id(client.session.circuit_breaker),
+                    id(client.session.rate_limiter),
+                )
+            )
+        memory = [_deep_sizeof(client, shared_ids) for client in clients]
+
+        return {
+            "handles": len(clients),
+            "memory_per_handle": sum(memory) // len(memory) if memory else 0,
+            "sockets": self.transport.sockets(),
+            "circuit_breaker": get_circuit_breaker(self.platonus_url).stats(),
+            "rate_limiter": get_rate_limiter(self.platonus_url).stats(),
+        }
+
+
+class PlatonusClientPool(_BasePlatonusClientPool):
+    """
+    Фабрика легковесных клиентов для множества аккаунтов одного Платонуса.
+
+    Все клиенты пула делят один Transport - ограниченный пул keep-alive соединений к хосту.
+    Каждый клиент хранит только свой токен, куки и авторизационные данные. Версия Платонуса запрашивается один раз на хост.
+
+        pool = PlatonusClientPool("http://test4.platonus.kz", language="ru", pool_maxsize=20)
+        platonus_session = pool.client("student1")
+        platonus_session.login(login="student1", password="...")
+
+    Args:
+        base_url, language, context_path: см. PlatonusBase
+        pool_maxsize: максимальное количество соединений к хосту. Если все заняты, запрос ждет свободное
+        max_retries: количество попыток после неудачного соединения
+        cassette: кассета общего транспорта для работы без сети, см. utils/cassette.py
+        client_kwargs: остальные аргументы PlatonusAPI, общие для всех клиентов
+    """
+
+    client_cls = PlatonusAPI
+
+    def __init__(
+        self,
+        base_url: str,
+        language: LanguageCode = "ru",
+        context_path: str = "/",
+        pool_maxsize: int = 10,
+        max_retries: int = 3,
+        cassette: Optional[Cassette] = None,
+        **client_kwargs,
+    ):
+        super().__init__(base_url, language, context_path, **client_kwargs)
+
+        self.transport = Transport(
+            self.platonus_url, max_retries=max_retries, pool_maxsize=pool_maxsize, pool_block=True, cassette=cassette
+        )
+
+    def client(self, account: Optional[str] = None, **kwargs) -> PlatonusAPI:
+        """
+        Возвращает клиент аккаунта поверх общего пула соединений. Пока клиент аккаунта жив,
+        повторный вызов возвращает его же, а не создает новый
+        Args:
+            account: идентификатор аккаунта, например логин. Используется как пространство имен кэша.
+                     None - всегда новый анонимный клиент
+            kwargs: аргументы PlatonusAPI, учитываются только при создании клиента
+        """
+        return self._get_or_create(account, kwargs)
+
+    def close(self):
+        self.transport.close()
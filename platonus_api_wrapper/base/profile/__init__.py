@@ -0,0 +1,3 @@
+from .methods import Profile
+
+__all__ = ["Profile"]
@@ -1,8 +1,9 @@
 from platonus_api_wrapper.const import LanguageCode
+from platonus_api_wrapper.utils.metrics import EndpointManager
 from platonus_api_wrapper.validators import language_code_to_int
 
 
-class ProfileApiMethods:
+class ProfileApiMethods(EndpointManager):
     """Менеджер REST API методов Платонуса
 
     Менеджер нужен:
@@ -16,6 +17,8 @@ class ProfileApiMethods:
         rest_api_version - Принимает версию Платонуса.
     """
 
+    endpoint_prefix = "profile"
+
     def __init__(self, language_code: LanguageCode, rest_api_version: float):
         self.language_code_str = language_code
         self.language_code_int = language_code_to_int(language_code)
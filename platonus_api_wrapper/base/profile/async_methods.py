@@ -0,0 +1,109 @@
+from platonus_api_wrapper.models import ProfileInfo
+from platonus_api_wrapper.utils.base64 import Base64Converter
+from platonus_api_wrapper.utils.base_cls_inject import inheritance_from_base_cls
+from platonus_api_wrapper.utils.loginizer import login_required
+from platonus_api_wrapper.utils.lru_cacher import timed_lru_cache
+
+
+class AsyncProfile(object):
+    def __init__(self, base_cls):
+        self.base_cls = base_cls
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(86400)
+    async def person_fio(self):
+        """Возвращает ФИО пользывателя"""
+        response = await self.session.get(self.profile_api.person_fio)
+        return response.text
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(86400)
+    async def person_id(self):
+        """Возвращает ID пользывателя"""
+        response = await self.session.get(self.profile_api.person_id)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(86400)
+    async def is_admin(self):
+        response = await self.session.get(self.profile_api.is_admin)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    async def profile_picture(self):
+        """Возвращает аватарку пользывателя"""
+        response = await self.session.get(self.profile_api.profile_picture)
+        return Base64Converter.decode(response.content)
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(86400)
+    async def person_type(self):
+        """Возвращает тип пользывателя, см. Profile.person_type"""
+        response = await self.session.get(self.profile_api.person_type)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(3600)
+    async def profile_info(self):
+        """Возвращает информацию о текущем пользывателе, см. Profile.profile_info"""
+        response = await self.session.get(self.profile_api.profile_info)
+        return response.as_object(ProfileInfo)
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(3600)
+    async def student_state_info(self):
+        response = await self.session.get(self.profile_api.student_state_info)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @timed_lru_cache(86400)
+    async def person_type_list(self):
+        await self.initialize()
+        response = await self.session.get(self.profile_api.person_type_list)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    async def upload_profile_picture(
+        self,
+        person_id: int,
+        person_type: str,
+        file_type: str,
+        cropped_image: str,
+        file=None,
+        file_name: str = "cardPhoto.jpg",
+        mime_type: str = "image/jpeg",
+    ):
+        """Upload a profile picture. See Profile.upload_profile_picture"""
+        fields = {
+            "personID": person_id,
+            "personType": person_type,
+            "fileType": file_type,
+            "croppedImage": cropped_image,
+            "fileName": file_name,
+            "mime": mime_type,
+        }
+
+        if file:
+            fields.update(
+                {
+                    "size": len(file.read()),
+                    "fileName": file.name,
+                    "mime": file.content_type,
+                }
+            )
+            file.seek(0)
+
+        response = await self.session.post(
+            self.profile_api.upload_profile_picture,
+            data=fields,
+            files={"file": file} if file else None,
+        )
+        return response.as_object()
@@ -1,4 +1,4 @@
-from platonus_api_wrapper.base.profile.api import ProfileApiMethods
+from platonus_api_wrapper.models import ProfileInfo
 from platonus_api_wrapper.utils.base64 import Base64Converter
 from platonus_api_wrapper.utils.base_cls_inject import inheritance_from_base_cls
 from platonus_api_wrapper.utils.loginizer import login_required
@@ -8,16 +8,13 @@ from platonus_api_wrapper.utils.lru_cacher import timed_lru_cache
 class Profile(object):
     def __init__(self, base_cls):
         self.base_cls = base_cls
-        self.profile_api = ProfileApiMethods(
-            base_cls.api.language_code, base_cls.api.rest_api_version
-        )
 
     @inheritance_from_base_cls
     @login_required
     @timed_lru_cache(86400)
     def person_fio(self):
         """Возвращает ФИО пользывателя"""
-        response = self.session.get(self.api.person_fio)
+        response = self.session.get(self.profile_api.person_fio)
         return response.text
 
     @inheritance_from_base_cls
@@ -25,21 +22,21 @@ class Profile(object):
     @timed_lru_cache(86400)
     def person_id(self):
         """Возвращает ID пользывателя"""
-        response = self.session.get(self.api.person_id).as_object()
+        response = self.session.get(self.profile_api.person_id).as_object()
         return response
 
     @inheritance_from_base_cls
     @login_required
     @timed_lru_cache(86400)
     def is_admin(self):
-        response = self.session.get(self.api.is_admin).as_object()
+        response = self.session.get(self.profile_api.is_admin).as_object()
         return response
 
     @inheritance_from_base_cls
     @login_required
     def profile_picture(self):
         """Возвращает аватарку пользывателя"""
-        response = self.session.get(self.api.profile_picture).content
+        response = self.session.get(self.profile_api.profile_picture).content
         return Base64Converter.decode(response)
 
     @inheritance_from_base_cls
@@ -50,7 +47,7 @@ class Profile(object):
 
         {"isPasswordExpired":false,"personType":1}
         """
-        response = self.session.get(self.api.person_type).as_object()
+        response = self.session.get(self.profile_api.person_type).as_object()
         return response
 
     @inheritance_from_base_cls
@@ -77,7 +74,7 @@ class Profile(object):
             specializationName: название специализации
             studyTechnology: тип обучаемой технологии = 2 - по оценкам (5/4/3/2) (но это не точно)
         """
-        response = self.session.get(self.api.profile_info).as_object()
+        response = self.session.get(self.profile_api.profile_info).as_object(ProfileInfo)
         return response
 
     @inheritance_from_base_cls
@@ -87,6 +84,7 @@ class Profile(object):
         response = self.session.get(self.profile_api.student_state_info).as_object()
         return response
 
+    @inheritance_from_base_cls
     @timed_lru_cache(86400)
     def person_type_list(self):
         """По идее должен возврящать список типов пользывателей Platonus, но почему-то ничего не возвращяет, нафиг его тогда  реализовали?!"""
@@ -95,7 +93,7 @@ class Profile(object):
 
     @inheritance_from_base_cls
     @login_required
-    async def upload_profile_picture(
+    def upload_profile_picture(
         self,
         person_id: int,
         person_type: str,
@@ -0,0 +1,3 @@
+from .methods import StudyRoom
+
+__all__ = ["StudyRoom"]
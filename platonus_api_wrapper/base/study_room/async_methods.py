@@ -0,0 +1,121 @@
+import time
+from typing import AsyncIterator, Iterable, Optional
+
+from platonus_api_wrapper.base.study_room.methods import _records_kwargs, _subject_ids, _year_term_pairs
+from platonus_api_wrapper.models import JournalHistory, JournalRecords, JournalSubject
+from platonus_api_wrapper.utils.base_cls_inject import inheritance_from_base_cls
+from platonus_api_wrapper.utils.fanout import Outcome, agather, aiter_completed
+from platonus_api_wrapper.utils.loginizer import login_required
+from platonus_api_wrapper.utils.lru_cacher import timed_lru_cache
+
+
+class AsyncStudyRoom:
+    def __init__(self, base_cls):
+        self.base_cls = base_cls
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(43200)
+    async def student_journal(self, year: int, term: int):
+        """
+        Возвращает журнал ученика
+        Принимаемые аргументы: (см. также функцию study_years_list())
+            year - год
+            term - семестр
+        """
+        return await self.study_room._student_journal(year, term)
+
+    @inheritance_from_base_cls
+    @login_required
+    async def _student_journal(self, year, term):
+        """Загружает журнал в обход кэша"""
+        response = await self.session.get(self.study_room_api.student_journal(year, term))
+        return response.as_object(JournalSubject)
+
+    @inheritance_from_base_cls
+    @login_required
+    async def student_journal_history(
+        self, years: Optional[Iterable] = None, terms: Optional[Iterable] = None, concurrency: int = 4
+    ) -> JournalHistory:
+        """Возвращает журналы ученика за все учебные годы и семестры, см. StudyRoom.student_journal_history"""
+        pairs = _year_term_pairs(
+            await self.study_years_list() if years is None else years,
+            await self.terms_list() if terms is None else terms,
+        )
+        terms, errors = await agather(
+            {
+                (year, term): (lambda year=year, term=term: self.study_room.student_journal(year, term))
+                for year, term in pairs
+            },
+            concurrency,
+        )
+        # Журналы в порядке лет и семестров, а не в порядке завершения запросов
+        return JournalHistory(
+            {pair: terms[pair] for pair in pairs if pair in terms},
+            {pair: errors[pair] for pair in pairs if pair in errors},
+        )
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(43200)
+    async def student_journal_records(self, year: int, term: int, subject_id: int):
+        """
+        Возвращает записи журнала ученика
+        Принимаемые аргументы:
+            year - год
+            term - семестр
+            subject_id - id предмета
+        """
+        return await self.study_room._student_journal_records(year, term, subject_id)
+
+    @inheritance_from_base_cls
+    @login_required
+    async def _student_journal_records(self, year, term, subject_id, **kwargs):
+        response = await self.session.get(
+            self.study_room_api.student_journal_records(year, term, subject_id), **kwargs
+        )
+        return response.as_object(JournalRecords)
+
+    @inheritance_from_base_cls
+    async def iter_journal_records(
+        self,
+        year: int,
+        term: int,
+        journal: Optional[Iterable[JournalSubject]] = None,
+        concurrency: int = 8,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[Outcome]:
+        """
+        Асинхронно загружает записи журнала по всем предметам семестра, см. StudyRoom.iter_journal_records
+
+            async for subject_id, records, error in platonus_session.study_room.iter_journal_records(2021, 1):
+                ...
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if journal is None:
+            journal = await self.study_room.student_journal(year, term)
+
+        outcomes = aiter_completed(
+            {
+                subject_id: (
+                    lambda subject_id=subject_id: self.study_room._student_journal_records(
+                        year, term, subject_id, **_records_kwargs(deadline)
+                    )
+                )
+                for subject_id in _subject_ids(journal)
+            },
+            concurrency,
+        )
+        try:
+            async for outcome in outcomes:
+                yield outcome
+        finally:
+            await outcomes.aclose()
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(43200)
+    async def report_without_appeal(self):
+        response = await self.session.get(self.study_room_api.report_without_appeal)
+        return response.as_object()
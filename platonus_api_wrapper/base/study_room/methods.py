@@ -1,15 +1,55 @@
-from platonus_api_wrapper.base.study_room.api import StudyRoomApi
+import time
+from typing import Any, Iterable, Iterator, Optional
+
+from platonus_api_wrapper.models import JournalHistory, JournalRecords, JournalSubject, Model
+from platonus_api_wrapper.utils import exceptions
 from platonus_api_wrapper.utils.base_cls_inject import inheritance_from_base_cls
+from platonus_api_wrapper.utils.fanout import Outcome, gather, iter_completed
 from platonus_api_wrapper.utils.loginizer import login_required
-from platonus_api_wrapper.utils.memory_cacher import timed_lru_cache
+from platonus_api_wrapper.utils.lru_cacher import timed_lru_cache
+
+# Поле, в котором study_years_list возвращает год, и поле, в котором terms_list возвращает номер семестра
+YEAR_FIELD = "year"
+TERM_FIELD = "number"
+
+
+def _number(value: Any, field: str) -> Any:
+    """Год или семестр из элемента study_years_list/terms_list; числа и строки возвращаются как есть
+
+    Raises:
+        ValueError: Если в модели нет поля field - иначе модель попала бы в адрес журнала
+    """
+    if isinstance(value, Model):
+        if field not in value:
+            raise ValueError(f"Ожидалось поле {field!r}, получено {value!r}")
+        return value[field]
+    return value
+
+
+def _subject_ids(journal: Iterable[JournalSubject]) -> list[Any]:
+    return [subject.get("subjectID") for subject in journal]
+
+
+def _records_kwargs(deadline: Optional[float]) -> dict:
+    """Аргументы запроса записей с учетом общего срока: таймаут - оставшееся время, без повторов"""
+    if deadline is None:
+        return {}
+
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise exceptions.TimedOut()
+    # Повтор после таймаута вышел бы за срок, поэтому запрос не повторяется
+    return {"timeout": remaining, "idempotent": False}
+
+
+def _year_term_pairs(years: Iterable, terms: Iterable) -> list[tuple[Any, Any]]:
+    terms = [_number(term, TERM_FIELD) for term in terms]
+    return [(_number(year, YEAR_FIELD), term) for year in years for term in terms]
 
 
 class StudyRoom:
     def __init__(self, base_cls):
         self.base_cls = base_cls
-        self.study_room_api = StudyRoomApi(
-            base_cls.api,
-        )
 
     @inheritance_from_base_cls
     @login_required
@@ -21,9 +61,46 @@ class StudyRoom:
             year - год
             term - семестр
         """
-        response = self.session.get(self.api.student_journal(year, term)).as_object()
+        return self.study_room._student_journal(year, term)
+
+    @inheritance_from_base_cls
+    @login_required
+    def _student_journal(self, year, term):
+        """Загружает журнал в обход кэша"""
+        response = self.session.get(self.study_room_api.student_journal(year, term)).as_object(JournalSubject)
         return response
 
+    @inheritance_from_base_cls
+    @login_required
+    def student_journal_history(
+        self, years: Optional[Iterable] = None, terms: Optional[Iterable] = None, concurrency: int = 4
+    ) -> JournalHistory:
+        """
+        Возвращает журналы ученика за все учебные годы и семестры
+        Журналы загружаются параллельно, не больше concurrency запросов одновременно.
+        Если журнал какой-то пары не удалось загрузить, ошибка попадает в JournalHistory.errors, а остальные журналы
+        все равно возвращаются
+        Принимаемые аргументы:
+            years - годы, по умолчанию study_years_list()
+            terms - семестры, по умолчанию terms_list()
+        """
+        pairs = _year_term_pairs(
+            self.study_years_list() if years is None else years,
+            self.terms_list() if terms is None else terms,
+        )
+        terms, errors = gather(
+            {
+                (year, term): (lambda year=year, term=term: self.study_room.student_journal(year, term))
+                for year, term in pairs
+            },
+            concurrency,
+        )
+        # Журналы в порядке лет и семестров, а не в порядке завершения запросов
+        return JournalHistory(
+            {pair: terms[pair] for pair in pairs if pair in terms},
+            {pair: errors[pair] for pair in pairs if pair in errors},
+        )
+
     @inheritance_from_base_cls
     @login_required
     @timed_lru_cache(43200)
@@ -35,14 +112,62 @@ class StudyRoom:
             term - семестр
             subject_id - id предмета
         """
+        return self.study_room._student_journal_records(year, term, subject_id)
+
+    @inheritance_from_base_cls
+    @login_required
+    def _student_journal_records(self, year, term, subject_id, **kwargs):
         response = self.session.get(
-            self.api.student_journal_records(year, term, subject_id)
-        ).as_object()
+            self.study_room_api.student_journal_records(year, term, subject_id), **kwargs
+        ).as_object(JournalRecords)
         return response
 
+    @inheritance_from_base_cls
+    def iter_journal_records(
+        self,
+        year: int,
+        term: int,
+        journal: Optional[Iterable[JournalSubject]] = None,
+        concurrency: int = 8,
+        timeout: Optional[float] = None,
+    ) -> Iterator[Outcome]:
+        """
+        Загружает записи журнала по всем предметам семестра параллельно и отдает их по мере готовности
+
+            for subject_id, records, error in platonus_session.study_room.iter_journal_records(2021, 1):
+                ...
+
+        Ошибка (к примеру TimedOut) относится только к своему предмету, остальные записи продолжают приходить.
+        Записи всегда запрашиваются заново, кэш student_journal_records не используется
+        Принимаемые аргументы:
+            year - год
+            term - семестр
+            journal - журнал семестра, по умолчанию student_journal(year, term)
+            concurrency - сколько запросов выполняется одновременно
+            timeout - общий срок в секундах на загрузку всех записей, считая с вызова метода. Каждый запрос
+                      получает оставшееся время и не повторяется, а предметы, до которых очередь дошла после срока,
+                      получают TimedOut. По умолчанию срока нет, запросы выполняются с таймаутом и повторами сессии
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        if journal is None:
+            journal = self.study_room.student_journal(year, term)
+
+        return iter_completed(
+            {
+                subject_id: (
+                    lambda subject_id=subject_id: self.study_room._student_journal_records(
+                        year, term, subject_id, **_records_kwargs(deadline)
+                    )
+                )
+                for subject_id in _subject_ids(journal)
+            },
+            concurrency,
+        )
+
     @inheritance_from_base_cls
     @login_required
     @timed_lru_cache(43200)
     def report_without_appeal(self):
-        response = self.session.get(self.api.report_without_appeal).as_object()
+        response = self.session.get(self.study_room_api.report_without_appeal).as_object()
         return response
@@ -0,0 +1,3 @@
+from .methods import UI
+
+__all__ = ["UI"]
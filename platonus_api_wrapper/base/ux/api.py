@@ -1,8 +1,9 @@
 from platonus_api_wrapper.const import LanguageCode
+from platonus_api_wrapper.utils.metrics import EndpointManager
 from platonus_api_wrapper.validators import language_code_to_int
 
 
-class UiApiMethods:
+class UiApiMethods(EndpointManager):
     """Менеджер REST API методов Платонуса для UI-компонентов
 
     Args:
@@ -10,6 +11,8 @@ class UiApiMethods:
         rest_api_version - Принимает версию Платонуса.
     """
 
+    endpoint_prefix = "ui"
+
     def __init__(self, language_code: LanguageCode, rest_api_version: float):
         self.language_code_str = language_code
         self.language_code_int = language_code_to_int(language_code)
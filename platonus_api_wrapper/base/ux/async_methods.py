@@ -0,0 +1,110 @@
+import datetime
+from typing import Collection, Literal, Optional
+
+from platonus_api_wrapper.const import MessageStatus
+from platonus_api_wrapper.base.ux.methods import _messages_params
+from platonus_api_wrapper.utils.base_cls_inject import inheritance_from_base_cls
+from platonus_api_wrapper.utils.loginizer import login_required
+from platonus_api_wrapper.utils.lru_cacher import timed_lru_cache
+from platonus_api_wrapper.utils.paginator import aiter_pages, page_items
+
+
+class AsyncUI(object):
+    def __init__(self, base_cls):
+        self.base_cls = base_cls
+
+    @inheritance_from_base_cls
+    @timed_lru_cache(86400)
+    async def has_for_visually_impaired_license(self):
+        await self.initialize()
+        response = await self.session.get(self.ui_api.has_for_visually_impaired_license)
+        return response.as_object().hasLicense
+
+    @inheritance_from_base_cls
+    @timed_lru_cache(86400)
+    async def get_logo(self):
+        await self.initialize()
+        response = await self.session.get(self.ui_api.get_logo)
+        return response.content
+
+    @inheritance_from_base_cls
+    @timed_lru_cache(3600)
+    async def has_unshown_release(self):
+        await self.initialize()
+        response = await self.session.get(self.ui_api.has_unshown_release)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(60)
+    async def survey_notifications(self):
+        response = await self.session.get(self.ui_api.survey_notifications)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(60)
+    async def notifications(self):
+        response = await self.session.get(self.ui_api.notifications)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(60)
+    async def system_messages_letters(self):
+        response = await self.session.get(self.ui_api.system_messages_letters)
+        return response.as_object()
+
+    @inheritance_from_base_cls
+    @login_required
+    @timed_lru_cache(60)
+    async def get_messages_by_params(
+        self,
+        status: MessageStatus = MessageStatus.NEW,
+        period: Optional[datetime.date] = None,
+        notification_category: Literal["all", ""] = "all",
+        countInPart: int = 5,
+        partNumber: int = 0,
+    ):
+        """period - день, за который нужны сообщения, по умолчанию сегодня"""
+        return await self.ui._messages_page(status, period, notification_category, countInPart, partNumber)
+
+    @inheritance_from_base_cls
+    @login_required
+    async def _messages_page(self, *args):
+        response = await self.session.get(
+            self.ui_api.get_messages_by_params, params=_messages_params(*args)
+        )
+        return response.as_object()
+
+    async def iter_messages(
+        self,
+        status: MessageStatus = MessageStatus.NEW,
+        period: Optional[datetime.date] = None,
+        notification_category: Literal["all", ""] = "all",
+        countInPart: int = 5,
+        concurrency: int = 4,
+        known_ids: Collection = (),
+        id_field: str = "ID",
+    ):
+        """
+        Асинхронный генератор всех сообщений, см. UI.iter_messages
+
+            async for message in platonus_session.ui.iter_messages(known_ids=already_sent_ids):
+                ...
+        """
+        pages = aiter_pages(
+            lambda part_number: self._messages_page(
+                status, period, notification_category, countInPart, part_number
+            ),
+            lambda page: len(page_items(page, ("messages",))) < countInPart,
+            concurrency=concurrency,
+        )
+        try:
+            async for page in pages:
+                for message in page_items(page, ("messages",)):
+                    if message.get(id_field) in known_ids:
+                        return
+                    yield message
+        finally:
+            await pages.aclose()
@@ -1,19 +1,29 @@
 import datetime
-from typing import Literal
+from typing import Collection, Literal, Optional
 
-from platonus_api_wrapper.base.ux.api import UiApiMethods
 from platonus_api_wrapper.const import MessageStatus
 from platonus_api_wrapper.utils.base_cls_inject import inheritance_from_base_cls
 from platonus_api_wrapper.utils.loginizer import login_required
 from platonus_api_wrapper.utils.lru_cacher import timed_lru_cache
+from platonus_api_wrapper.utils.paginator import iter_pages, page_items
+
+
+def _messages_params(status, period, notification_category, countInPart, partNumber):
+    # Значение по умолчанию вычисляется при каждом вызове, а не один раз при импорте модуля
+    period = period or datetime.date.today()
+    return {
+        # httpx кодирует член (str, Enum) как MessageStatus.NEW, а не как его значение
+        "status": MessageStatus(status).value,
+        "period": period.strftime("%Y-%m-%d %Y-%m-%d"),
+        "notification_category": notification_category,
+        "countInPart": countInPart,
+        "partNumber": partNumber,
+    }
 
 
 class UI(object):
     def __init__(self, base_cls):
         self.base_cls = base_cls
-        self.ui_api = UiApiMethods(
-            base_cls.api.language_code, base_cls.api.rest_api_version
-        )
 
     @inheritance_from_base_cls
     @timed_lru_cache(86400)
@@ -54,26 +64,63 @@ class UI(object):
         response = self.session.get(self.ui_api.system_messages_letters).as_object()
         return response
 
-    #
     @inheritance_from_base_cls
     @login_required
     @timed_lru_cache(60)
     def get_messages_by_params(
         self,
         status: MessageStatus = MessageStatus.NEW,
-        period: datetime.date = datetime.date.today(),
+        period: Optional[datetime.date] = None,
         notification_category: Literal["all", ""] = "all",
         countInPart: int = 5,
         partNumber: int = 0,
     ):
-        params = {
-            "status": status,
-            "period": period.strftime("%Y-%m-%d %Y-%m-%d"),
-            "notification_category": notification_category,
-            "countInPart": countInPart,
-            "partNumber": partNumber,
-        }
+        """period - день, за который нужны сообщения, по умолчанию сегодня"""
+        return self.ui._messages_page(status, period, notification_category, countInPart, partNumber)
+
+    @inheritance_from_base_cls
+    @login_required
+    def _messages_page(self, *args):
         response = self.session.get(
-            self.ui_api.get_messages_by_params, params
+            self.ui_api.get_messages_by_params, params=_messages_params(*args)
         ).as_object()
         return response
+
+    def iter_messages(
+        self,
+        status: MessageStatus = MessageStatus.NEW,
+        period: Optional[datetime.date] = None,
+        notification_category: Literal["all", ""] = "all",
+        countInPart: int = 5,
+        concurrency: int = 4,
+        known_ids: Collection = (),
+        id_field: str = "ID",
+    ):
+        """
+        Генератор всех сообщений с указанным статусом за период.
+
+        Страницы загружаются параллельно (не больше concurrency одновременно), но отдаются строго по порядку.
+        Генератор останавливается на последней (неполной) странице, либо на первом сообщении из known_ids -
+        это позволяет дочитывать только новые сообщения.
+        Args:
+            countInPart: количество сообщений на странице
+            concurrency: сколько страниц загружается одновременно
+            known_ids: ID уже обработанных сообщений
+            id_field: поле сообщения с его ID
+            остальные аргументы - см. get_messages_by_params
+        """
+        pages = iter_pages(
+            lambda part_number: self._messages_page(
+                status, period, notification_category, countInPart, part_number
+            ),
+            lambda page: len(page_items(page, ("messages",))) < countInPart,
+            concurrency=concurrency,
+        )
+        try:
+            for page in pages:
+                for message in page_items(page, ("messages",)):
+                    if message.get(id_field) in known_ids:
+                        return
+                    yield message
+        finally:
+            pages.close()
@@ -36,7 +36,7 @@ MessageStatusItem: TypeAlias = dict[str, int | str]
 
 class MessageStatus(str, Enum):
     ALL = "0"
-        NEW = "1"
+    NEW = "1"
     VIEWED = "2"
     DELETED = "4"
 
@@ -0,0 +1,20 @@
+from .base import Model, ModelList, convert
+from .journal import JournalHistory, JournalMark, JournalRecord, JournalRecords, JournalSubject
+from .profile import ProfileInfo
+from .server import ServerTime
+from .tasks import StudentTask, StudentTasks
+
+__all__ = [
+    'Model',
+    'ModelList',
+    'convert',
+    'JournalHistory',
+    'JournalMark',
+    'JournalRecord',
+    'JournalRecords',
+    'JournalSubject',
+    'ProfileInfo',
+    'ServerTime',
+    'StudentTask',
+    'StudentTasks',
+]
@@ -0,0 +1,113 @@
+from collections.abc import Sequence
+from typing import Any, ClassVar, Optional
+
+
+class Model:
+    """Компактная модель ответа Платонуса
+
+    В отличие от dict2object не копирует словарь в __dict__: модель хранит ссылку на исходный словарь,
+    а вложенные словари и списки превращает в модели только при первом обращении к полю.
+    Известные поля описаны аннотациями в наследниках, неизвестные все равно доступны как атрибуты
+    или через model["field"].
+
+    Attributes:
+        _nested: модели для вложенных полей, к примеру {"marks": JournalMark}. Поля, которых нет в
+                 _nested, превращаются в Model
+    """
+
+    __slots__ = ("_data", "_converted")
+
+    _nested: ClassVar[dict[str, type["Model"]]] = {}
+
+    def __init__(self, data: dict):
+        self._data = data
+        self._converted: Optional[dict[str, Any]] = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        try:
+            value = self._data[name]
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' has no field '{name}'") from None
+
+        if not isinstance(value, (dict, list)):
+            return value
+
+        if self._converted is None:
+            self._converted = {}
+
+        converted = self._converted.get(name)
+        if converted is None:
+            converted = convert(value, self._nested.get(name, Model))
+            self._converted[name] = converted
+        return converted
+
+    def __getitem__(self, name: str) -> Any:
+        return self._data[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._data
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, Model):
+            return self._data == other._data
+        return NotImplemented
+
+    def __dir__(self):
+        return [*super().__dir__(), *self._data.keys()]
+
+    def get(self, name: str, default: Any = None) -> Any:
+        try:
+            return getattr(self, name)
+        except AttributeError:
+            return default
+
+    def to_dict(self) -> dict:
+        """Возвращает исходный словарь ответа"""
+        return self._data
+
+    def __repr__(self):
+        return str(self._data)
+
+
+class ModelList(Sequence):
+    """Ленивый список моделей: элементы превращаются в модели при обращении к ним"""
+
+    __slots__ = ("_items", "_model")
+
+    def __init__(self, items: list, model: type[Model] = Model):
+        self._items = items
+        self._model = model
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return ModelList(self._items[index], self._model)
+        return convert(self._items[index], self._model)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ModelList):
+            return self._items == other._items
+        if isinstance(other, list):
+            return self._items == other
+        return NotImplemented
+
+    def to_list(self) -> list:
+        """Возвращает исходный список ответа"""
+        return self._items
+
+    def __repr__(self):
+        return str(self._items)
+
+
+def convert(value: Any, model: type[Model] = Model) -> Any:
+    """Оборачивает ответ в модель: словарь - в model, список - в ModelList, остальное возвращает как есть"""
+    if isinstance(value, dict):
+        return model(value)
+    elif isinstance(value, list):
+        return ModelList(value, model)
+    return value
@@ -0,0 +1,78 @@
+from collections.abc import Sequence
+
+from .base import Model
+
+
+class JournalMark(Model):
+    """Оценка в журнале"""
+
+    __slots__ = ()
+
+    date: str
+    mark: int
+
+
+class JournalSubject(Model):
+    """Предмет в журнале ученика, см. StudyRoom.student_journal"""
+
+    __slots__ = ()
+
+    _nested = {"marks": JournalMark}
+
+    subjectID: int
+    subjectName: str
+
+
+class JournalRecord(Model):
+    """Запись журнала по предмету, см. StudyRoom.student_journal_records"""
+
+    __slots__ = ()
+
+    date: str
+    mark: int
+
+
+class JournalRecords(Model):
+    """Записи журнала по предмету, см. StudyRoom.student_journal_records"""
+
+    __slots__ = ()
+
+    _nested = {"records": JournalRecord}
+
+
+class JournalHistory:
+    """Журналы ученика за несколько учебных лет и семестров, см. StudyRoom.student_journal_history
+
+    Attributes:
+        terms: журналы по парам (год, семестр)
+        errors: ошибки по парам (год, семестр), журналы которых не удалось загрузить
+        subjects: индекс предметов по subjectID - список (год, семестр, предмет)
+    """
+
+    __slots__ = ("terms", "errors", "subjects")
+
+    def __init__(self, terms: dict[tuple[int, int], Sequence], errors: dict[tuple[int, int], BaseException]):
+        self.terms = terms
+        self.errors = errors
+        self.subjects: dict[int, list[tuple[int, int, JournalSubject]]] = {}
+
+        for (year, term), journal in self.terms.items():
+            for subject in journal:
+                self.subjects.setdefault(subject.get("subjectID"), []).append((year, term, subject))
+
+    def __getitem__(self, year_term: tuple[int, int]) -> Sequence:
+        return self.terms[year_term]
+
+    def __iter__(self):
+        return iter(self.terms.items())
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    @property
+    def complete(self) -> bool:
+        """Все журналы загружены без ошибок"""
+        return not self.errors
+
+    def __repr__(self):
+        return f"<JournalHistory terms={list(self.terms)} errors={list(self.errors)}>"
@@ -0,0 +1,22 @@
+from .base import Model
+
+
+class ProfileInfo(Model):
+    """Информация о текущем пользывателе, см. Profile.profile_info"""
+
+    __slots__ = ()
+
+    lastName: str
+    firstName: str
+    patronymic: str
+    personType: int
+    photoBase64: str
+    passwordExpired: bool
+    temporaryPassword: bool
+    studentID: int
+    gpa: float
+    courseNumber: int
+    groupName: str
+    professionName: str
+    specializationName: str
+    studyTechnology: int
@@ -0,0 +1,12 @@
+from .base import Model
+
+
+class ServerTime(Model):
+    """Текущее серверное время Платонуса, см. PlatonusAPI.server_time"""
+
+    __slots__ = ()
+
+    hour: int
+    minute: int
+    date: str
+    dayOfWeek: int
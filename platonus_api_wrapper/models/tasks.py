@@ -0,0 +1,20 @@
+from .base import Model, ModelList
+
+
+class StudentTask(Model):
+    """Задание ученика"""
+
+    __slots__ = ()
+
+    ID: int
+    topic: str
+
+
+class StudentTasks(Model):
+    """Страница заданий ученика, см. PlatonusAPI.student_tasks"""
+
+    __slots__ = ()
+
+    _nested = {"tasks": StudentTask}
+
+    tasks: ModelList
@@ -0,0 +1,84 @@
+import time
+from http.cookies import SimpleCookie
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from .cassette import Cassette, Interaction
+
+# Заголовки, которые httpx вычисляет сам: тело в кассете и в ответе уже распаковано
+_CONTENT_HEADERS = frozenset({"content-encoding", "content-length", "transfer-encoding"})
+
+
+def _set_cookies(headers: "httpx.Headers") -> list[tuple[str, str, str]]:
+    cookies = []
+    for header in headers.get_list("set-cookie"):
+        for morsel in SimpleCookie(header).values():
+            cookies.append((morsel.key, morsel.value, morsel["path"] or "/"))
+    return cookies
+
+
+def _response(request: "httpx.Request", status_code: int, headers: list, content: bytes, extensions: dict) -> "httpx.Response":
+    # Тело отдается потоком, а не content=: клиент httpx дочитывает и закрывает поток, только тогда ответ
+    # получает elapsed
+    return httpx.Response(
+        status_code,
+        headers=[*headers, ("content-length", str(len(content)))],
+        stream=httpx.ByteStream(content),
+        request=request,
+        extensions=extensions,
+    )
+
+
+class AsyncCassetteTransport(httpx.AsyncBaseTransport if httpx is not None else object):
+    """Асинхронный аналог адаптера кассеты (см. utils/cassette.py): транспорт httpx поверх транспорта transport"""
+
+    def __init__(self, cassette: Cassette, transport: "httpx.AsyncBaseTransport"):
+        self.cassette = cassette
+        self.transport = transport
+
+    async def handle_async_request(self, request: "httpx.Request") -> "httpx.Response":
+        import asyncio
+
+        key = self.cassette.key(request.method, str(request.url), request.content)
+
+        interaction = self.cassette.find(key)
+        if interaction is not None:
+            await asyncio.sleep(self.cassette.delay(interaction))
+            return self._replay(request, interaction)
+        if not self.cassette.network_allowed:
+            self.cassette.miss(key)
+
+        started = time.monotonic()
+        response = await self.transport.handle_async_request(request)
+        try:
+            content = await response.aread()
+        finally:
+            await response.aclose()
+        self.cassette.record(
+            key,
+            response.status_code,
+            response.reason_phrase,
+            response.headers.multi_items(),
+            _set_cookies(response.headers),
+            content,
+            time.monotonic() - started,
+        )
+        headers = [(name, value) for name, value in response.headers.multi_items() if name.lower() not in _CONTENT_HEADERS]
+        return _response(request, response.status_code, headers, content, response.extensions)
+
+    @staticmethod
+    def _replay(request: "httpx.Request", interaction: Interaction) -> "httpx.Response":
+        headers = list(interaction.headers)
+        headers += [("set-cookie", f"{name}={value}; Path={path}") for name, value, path in interaction.cookies]
+        return _response(
+            request, interaction.status_code, headers, interaction.content, {"reason_phrase": interaction.reason.encode()}
+        )
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+__all__ = ["AsyncCassetteTransport"]
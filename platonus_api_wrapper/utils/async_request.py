@@ -0,0 +1,381 @@
+import copy
+import logging
+import time
+from http.cookiejar import CookieJar
+from typing import TYPE_CHECKING, Optional
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from . import exceptions
+from .conditional import ValidatorStore
+from .json_backend import JSONBackend, JSONLoads, get_json_loads
+from .metrics import endpoint_name, metrics
+from .rate_limit import RateLimiter, get_rate_limiter
+from .request import (
+    HEADER,
+    BaseResponse,
+    _RejectCookiesPolicy,
+    observe_error,
+    observe_response,
+    raise_by_status_code,
+    retry_callback,
+)
+from .retry import DEFAULT_RETRY_POLICY, CircuitBreaker, RetryPolicy, get_circuit_breaker
+from .single_flight import AsyncSingleFlight, coalescable, request_key
+from .tracing import Span, hooks, tracer
+
+if TYPE_CHECKING:
+    from .cassette import Cassette
+
+logger = logging.getLogger("platonus_api_wrapper")
+
+
+class AsyncResponse(BaseResponse):
+    def __init__(self, response_obj: "httpx.Response", json_loads: JSONLoads, span: Optional[Span] = None) -> None:
+        self._json_loads = json_loads
+        self._span = span
+        self.status_code = response_obj.status_code
+        self.headers = response_obj.headers
+        self.url = str(response_obj.url)
+        self.encoding = response_obj.encoding
+        self.reason = response_obj.reason_phrase
+        self.cookies = response_obj.cookies
+        self.elapsed = response_obj.elapsed
+        self.request = response_obj.request
+        self.content = response_obj.content
+        self.ok = response_obj.is_success
+
+
+def _copy_response(response: "httpx.Response") -> "httpx.Response":
+    """Копия ответа для вызова, объединенного с другими (AsyncSingleFlight): свои статус, тело и заголовки"""
+    copied = copy.copy(response)
+    copied.headers = response.headers.copy()
+    return copied
+
+
+class _HttpcoreTrace:
+    """
+    Обработчик расширения trace httpcore: собирает время этапов одной попытки запроса и записывает их
+    в трассировку. Разрешение DNS происходит внутри connect_tcp и отдельно не измеряется
+    """
+
+    # Событие httpcore (без префикса http11/http2 и суффикса) -> этап трассировки
+    STAGES = {
+        "connect_tcp": "connect",
+        "start_tls": "tls",
+        "receive_response_headers": "ttfb",
+        "receive_response_body": "body",
+    }
+
+    def __init__(self):
+        self.started: dict[str, float] = {}
+        self.finished: dict[str, float] = {}
+
+    @property
+    def connected(self) -> bool:
+        return "connect" in self.finished
+
+    async def __call__(self, event_name: str, info: dict):
+        # Например connection.connect_tcp.started или http11.receive_response_headers.complete
+        parts = event_name.rsplit(".", 2)
+        if len(parts) != 3:
+            return
+        _, event, state = parts
+        stage = self.STAGES.get(event)
+        if stage is None:
+            # Ожидание первого байта считаем от начала отправки запроса
+            if event == "send_request_headers" and state == "started":
+                self.started["ttfb"] = time.time()
+            return
+        if state == "started":
+            self.started.setdefault(stage, time.time())
+        elif state == "complete":
+            self.finished[stage] = time.time()
+
+    def record(self):
+        for stage in self.STAGES.values():
+            if stage in self.started and stage in self.finished:
+                tracer.record(stage, self.started[stage], self.finished[stage])
+
+
+class AsyncTransport:
+    """
+    Общий асинхронный пул соединений (httpx.AsyncClient), аналог Transport. Куки и токены в нем не хранятся.
+    Args:
+        proxy_dict: словарь прокси серверов, к примеру {"https": "http://127.0.0.1:3128"}
+        timeout: устанавливает таймаут на запросы
+        max_retries: количество попыток после неудачного соединения
+        ssl_verify: позволяет верифицировать SSL-сертификаты
+        max_connections: максимальное количество одновременно открытых соединений
+        cassette: кассета для записи и воспроизведения ответов без сети, см. utils/cassette.py
+    """
+
+    def __init__(
+        self,
+        proxy_dict: Optional[dict] = None,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        ssl_verify: bool = False,
+        max_connections: int = 100,
+        cassette: Optional["Cassette"] = None,
+    ):
+        if httpx is None:
+            raise ImportError(
+                "Для асинхронного клиента требуется httpx: pip install platonus_api_wrapper[async]"
+            )
+
+        self.max_connections = max_connections
+
+        limits = httpx.Limits(
+            max_connections=max_connections, max_keepalive_connections=max_connections
+        )
+        mounts = {
+            f"{scheme}://": httpx.AsyncHTTPTransport(
+                proxy=proxy, verify=ssl_verify, retries=max_retries, limits=limits
+            )
+            for scheme, proxy in (proxy_dict or {}).items()
+        }
+        transport = httpx.AsyncHTTPTransport(verify=ssl_verify, retries=max_retries, limits=limits)
+
+        self.cassette = cassette
+        if cassette is not None:
+            from .async_cassette import AsyncCassetteTransport
+
+            transport = AsyncCassetteTransport(cassette, transport)
+            mounts = {pattern: AsyncCassetteTransport(cassette, mount) for pattern, mount in mounts.items()}
+
+        self.session = httpx.AsyncClient(
+            headers=HEADER,
+            timeout=timeout,
+            cookies=CookieJar(policy=_RejectCookiesPolicy()),
+            transport=transport,
+            mounts=mounts,
+        )
+
+        self.single_flight = AsyncSingleFlight()
+
+    def sockets(self) -> dict[str, dict[str, int]]:
+        """Возвращает количество открытых, свободных и занятых соединений по каждому хосту"""
+        sockets = {}
+        # У httpx нет публичного API для статистики пула, поэтому читаем пул httpcore
+        transport = self.session._transport
+        # Транспорт кассеты оборачивает настоящий транспорт
+        transport = getattr(transport, "transport", transport)
+        connection_pool = getattr(transport, "_pool", None)
+        for connection in list(getattr(connection_pool, "connections", [])):
+            origin = str(connection._origin)
+            host = sockets.setdefault(
+                origin, {"open": 0, "idle": 0, "in_use": 0, "maxsize": self.max_connections}
+            )
+            host["open"] += 1
+            if connection.is_idle():
+                host["idle"] += 1
+            else:
+                host["in_use"] += 1
+        return sockets
+
+    async def close(self):
+        await self.session.aclose()
+
+
+class AsyncRequest:
+    """
+    Асинхронный аналог Request. Хранит только состояние аккаунта (хэйдеры с токеном и куки),
+    соединения берутся из AsyncTransport.
+    Args:
+        base_url: корневой адресс сайта
+        proxy_dict: словарь прокси серверов, к примеру {"https": "http://127.0.0.1:3128"}
+        timeout: устанавливает таймаут на запросы
+        max_retries: количество попыток после неудачного соединения
+        ssl_verify: позволяет верифицировать SSL-сертификаты
+        transport: общий пул соединений. Если не передан, создается собственный
+        json_backend: библиотека для декодирования JSON ответов, см. utils/json_backend.py
+        validators, conditional_requests: условные GET запросы, см. Request
+        single_flight: объединять одинаковые одновременные запросы в один, см. Request
+        retry_policy, circuit_breaker: повтор идемпотентных запросов и предохранитель хоста, см. Request
+        rate_limiter: ограничитель запросов к хосту, см. Request
+        cassette: кассета для работы без сети, см. Request
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        proxy_dict: Optional[dict] = None,
+        timeout: float = 10.0,
+        max_retries: int = 3,
+        ssl_verify: bool = False,
+        transport: Optional[AsyncTransport] = None,
+        json_backend: JSONBackend = "auto",
+        validators: Optional[ValidatorStore] = None,
+        conditional_requests: bool = False,
+        single_flight: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cassette: Optional["Cassette"] = None,
+    ):
+        if transport is not None and cassette is not None:
+            raise ValueError("Кассета подключается к транспорту: передайте ее в AsyncTransport(..., cassette=...)")
+
+        self.base_url = base_url
+        self.timeout = timeout
+
+        self._own_transport = transport is None
+        self.transport = transport or AsyncTransport(
+            proxy_dict, timeout=timeout, max_retries=max_retries, ssl_verify=ssl_verify, cassette=cassette
+        )
+        self.session = self.transport.session
+
+        self.headers: dict[str, str] = {}
+        self.cookies = httpx.Cookies()
+
+        self.json_loads = get_json_loads(json_backend)
+        self.validators = (validators or ValidatorStore()) if conditional_requests else None
+        self.single_flight = single_flight
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(base_url)
+        self.rate_limiter = rate_limiter or get_rate_limiter(base_url)
+
+    async def request(self, method, url, data=None, idempotent: Optional[bool] = None, **kwargs) -> AsyncResponse:
+        if not tracer.enabled:
+            return await self._request(None, method, url, data, idempotent, **kwargs)
+        with tracer.span(f"{method} {endpoint_name(url)}", method=method, url=url) as span:
+            return await self._request(span, method, url, data, idempotent, **kwargs)
+
+    async def _request(
+        self, span: Optional[Span], method, url, data=None, idempotent: Optional[bool] = None, **kwargs
+    ) -> AsyncResponse:
+        headers = self.headers
+
+        validators_key = None
+        if self.validators is not None and method == "GET" and data is None:
+            validators_key = self.validators.key(url, kwargs.get("params"))
+            headers = {**headers, **self.validators.conditional_headers(validators_key)}
+
+        if self.cookies:
+            headers = {
+                **headers,
+                "Cookie": "; ".join(f"{name}={value}" for name, value in self.cookies.items()),
+            }
+
+        if hooks.active:
+            hooks.emit("before_request", method=method, url=url, endpoint=endpoint_name(url), headers=dict(headers))
+
+        # Отправлен ли полученный ответ этим клиентом, а не другим, с которым запрос объединен
+        own_response = True
+
+        async def send_request():
+            nonlocal own_response
+            own_response = True
+            queued_at = time.time()
+            async with self.rate_limiter.aacquire():
+                if span is None:
+                    return await self.session.request(
+                        method, url=f"{self.base_url}{url}", json=data, headers=headers, **kwargs
+                    )
+                with tracer.span("attempt") as attempt:
+                    tracer.record("rate_limit", queued_at, time.time())
+                    trace = _HttpcoreTrace()
+                    response = await self.session.request(
+                        method,
+                        url=f"{self.base_url}{url}",
+                        json=data,
+                        headers=headers,
+                        extensions={"trace": trace},
+                        **kwargs,
+                    )
+                    trace.record()
+                    attempt.set(status_code=response.status_code, reused_connection=not trace.connected)
+                    return response
+
+        flight_key = None
+        # Куки клиента уже в заголовке Cookie, поэтому входят в ключ вместе с заголовками
+        if self.single_flight and coalescable(method, idempotent) and kwargs.keys() <= {"params", "timeout"}:
+            flight_key = request_key(method, url, data, kwargs.get("params"), headers)
+
+        def send():
+            nonlocal own_response
+            if flight_key is None:
+                return send_request()
+            own_response = False
+            return self.transport.single_flight.do(flight_key, send_request, _copy_response)
+
+        started = time.perf_counter() if metrics.enabled or hooks.active else None
+
+        try:
+            response = await self.retry_policy.acall(
+                send,
+                self.circuit_breaker,
+                self.retry_policy.is_retryable(method, idempotent),
+                failures=(httpx.HTTPError,),
+                on_retry=retry_callback(method, url, span),
+            )
+        except httpx.TimeoutException as e:
+            observe_error(url, method, e, started)
+            raise exceptions.TimedOut()
+        except httpx.HTTPError as e:
+            observe_error(url, method, e, started)
+            raise exceptions.NetworkError(e)
+        except exceptions.CircuitOpen as e:
+            observe_error(url, method, e, started)
+            raise
+
+        logger.debug(
+            f"URL: {self.base_url}{url}, status code: {response.status_code}, {method} request"
+        )
+        if started is not None:
+            observe_response(url, method, response.status_code, started, len(response.content))
+        if span is not None:
+            span.set(status_code=response.status_code)
+
+        # Куки чужого ответа (например новый JSESSIONID) принадлежат сессии другого клиента
+        if own_response:
+            self.cookies.extract_cookies(response)
+
+        if validators_key is not None:
+            if response.status_code == 304:
+                content = self.validators.not_modified_content(validators_key)
+                if content is not None:
+                    result = AsyncResponse(response, self.json_loads, span)
+                    result.status_code, result.content, result.ok = 200, content, True
+                    return result
+                # Тело уже вытеснено из хранилища: забываем валидаторы и повторяем запрос без условий
+                self.validators.discard(validators_key)
+                return await self._request(span, method, url, data, idempotent, **kwargs)
+            elif response.status_code == 200:
+                self.validators.store(validators_key, response.headers, response.content)
+
+        raise_by_status_code(response.status_code)
+
+        return AsyncResponse(response, self.json_loads, span)
+
+    async def post(self, url, data=None, **kwargs) -> AsyncResponse:
+        logger.debug(f"URL: {url}, POST request")
+        return await self.request("POST", url, data, **kwargs)
+
+    async def get(self, url, data=None, **kwargs) -> AsyncResponse:
+        logger.debug(f"URL: {url}, GET request")
+        return await self.request("GET", url, data, **kwargs)
+
+    @property
+    def header(self):
+        return self.headers
+
+    @header.setter
+    def header(self, header_value):
+        for key, value in header_value.items():
+            if value is None:
+                self.headers.pop(key, None)
+            else:
+                self.headers[key] = str(value)
+
+    async def close(self):
+        """Закрывает собственный пул соединений. Общий транспорт закрывает его владелец"""
+        if self._own_transport:
+            await self.transport.close()
+
+
+__all__ = ["AsyncRequest", "AsyncResponse", "AsyncTransport"]
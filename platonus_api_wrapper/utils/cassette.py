@@ -0,0 +1,351 @@
+import base64
+import gzip
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Iterable, Literal, NamedTuple, Optional, Union
+from urllib.parse import urlsplit
+
+from . import exceptions
+
+CassetteMode = Literal["record", "replay", "auto"]
+# Задержка ответа при воспроизведении: секунды, функция (распределение задержек) или recorded - как при записи
+Latency = Union[None, float, Callable[[], float], Literal["recorded"]]
+
+REDACTED = "<redacted>"
+# Значение кук в кассете: угловые скобки в куках недопустимы
+REDACTED_COOKIE = "redacted"
+
+# Поля JSON запросов и ответов, значения которых не попадают в кассету (без учета регистра)
+DEFAULT_REDACT_FIELDS = frozenset(
+    {"login", "password", "oldpassword", "confpassword", "iin", "icnumber", "auth_token", "token", "sid", "uid"}
+)
+
+# Заголовки ответа, которые не нужны при воспроизведении: тело хранится уже распакованным, куки - отдельно
+_SKIPPED_HEADERS = frozenset(
+    {"date", "content-length", "content-encoding", "transfer-encoding", "connection", "keep-alive", "set-cookie"}
+)
+
+_FORMAT_VERSION = 1
+
+
+class Interaction(NamedTuple):
+    """
+    Записанный ответ на один запрос. Сам запрос хранится только ключом: метод, путь с параметрами
+    относительно хоста и хэш тела после удаления секретов
+    """
+
+    method: str
+    path: str
+    body_key: str
+    status_code: int
+    reason: str
+    headers: list[tuple[str, str]]
+    cookies: list[tuple[str, str, str]]  # имя, значение, путь
+    content: bytes
+    elapsed: float
+
+
+def redact(value: Any, fields: frozenset[str]) -> Any:
+    """Заменяет значения полей fields (на любой глубине) на REDACTED"""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in fields and item is not None else redact(item, fields)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item, fields) for item in value]
+    return value
+
+
+def _redact_body(content: Optional[bytes], fields: frozenset[str], canonical: bool = False) -> Optional[bytes]:
+    """
+    Удаляет секреты из JSON тела. Тело без секретов возвращается как есть,
+    если не нужен канонический вид (ключ запроса не должен зависеть от порядка полей)
+    """
+    if not content:
+        return content
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return content
+    redacted = redact(data, fields)
+    if redacted == data and not canonical:
+        return content
+    return json.dumps(redacted, ensure_ascii=False, sort_keys=True).encode()
+
+
+def request_path(url: str) -> str:
+    """Путь с параметрами без схемы и хоста: кассету, записанную на одном хосте, можно воспроизвести на другом"""
+    parts = urlsplit(url)
+    return f"{parts.path}?{parts.query}" if parts.query else parts.path
+
+
+class Cassette:
+    """
+    Кассета с записанными ответами Платонуса для запуска без сети: тестов, CI и бенчмарков.
+
+        with Cassette("journal.cassette", "record") as cassette:
+            platonus = PlatonusAPI("https://platonus.example.kz", "ru", cassette=cassette)
+            platonus.login(login="...", password="...")
+            platonus.study_room.student_journal(2021, 1)
+
+        # Позже, без сети - тот же код получает те же ответы
+        platonus = PlatonusAPI("https://platonus.example.kz", "ru", cassette=Cassette("journal.cassette"))
+
+    Логины, пароли, ИИН, токены и значения кук в кассету не попадают (см. redact_fields),
+    заголовки запроса (в том числе token) не записываются вовсе. Файл - сжатый gzip JSON.
+    Одинаковые запросы при воспроизведении получают ответы в порядке записи, последний ответ повторяется.
+    Args:
+        path: файл кассеты
+        mode: replay - только воспроизведение, запрос без записи вызывает CassetteMiss;
+              record - все запросы идут в сеть и записываются заново;
+              auto - записанные запросы воспроизводятся, остальные идут в сеть и дописываются
+        latency: задержка каждого ответа при воспроизведении: секунды, функция без аргументов
+                 (например lambda: random.lognormvariate(-3, 0.5)) или "recorded" - задержка, записанная с ответом
+        bandwidth: скорость передачи тела при воспроизведении в байтах в секунду, None - мгновенно
+        redact_fields: поля JSON тел, значения которых заменяются на REDACTED
+    """
+
+    def __init__(
+        self,
+        path: str,
+        mode: CassetteMode = "replay",
+        latency: Latency = None,
+        bandwidth: Optional[float] = None,
+        redact_fields: Iterable[str] = DEFAULT_REDACT_FIELDS,
+    ):
+        if mode not in ("record", "replay", "auto"):
+            raise ValueError(f"Unknown cassette mode {mode!r}, expected record, replay or auto")
+
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.redact_fields = frozenset(field.lower() for field in redact_fields)
+
+        self._lock = threading.Lock()
+        self._interactions: dict[tuple[str, str, str], list[Interaction]] = {}
+        # Сколько раз воспроизведен каждый запрос
+        self._played: dict[tuple[str, str, str], int] = {}
+        self._dirty = False
+
+        self.recorded = 0
+        self.played = 0
+        self.missed = 0
+
+        # В режиме record кассета записывается заново, старые записи не загружаются
+        if mode != "record":
+            self.load()
+
+    def load(self):
+        """Загружает записи из файла. Если файла нет, кассета пуста"""
+        if not os.path.exists(self.path):
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != _FORMAT_VERSION:
+            raise ValueError(f"{self.path} has unsupported cassette format {data.get('version')!r}")
+
+        interactions: dict[tuple[str, str, str], list[Interaction]] = {}
+        for method, path, body_key, status_code, reason, headers, cookies, content, binary, elapsed in data["interactions"]:
+            interaction = Interaction(
+                method,
+                path,
+                body_key,
+                status_code,
+                reason,
+                [tuple(header) for header in headers],
+                [tuple(cookie) for cookie in cookies],
+                base64.b64decode(content) if binary else content.encode(),
+                elapsed,
+            )
+            interactions.setdefault((method, path, body_key), []).append(interaction)
+
+        with self._lock:
+            self._interactions = interactions
+            self._played = {}
+
+    def save(self):
+        """Записывает кассету в файл, если с момента загрузки появились новые записи"""
+        with self._lock:
+            if not self._dirty:
+                return
+            interactions = [interaction for entries in self._interactions.values() for interaction in entries]
+            self._dirty = False
+
+        rows = []
+        for interaction in interactions:
+            try:
+                content, binary = interaction.content.decode(), False
+            except UnicodeDecodeError:
+                content, binary = base64.b64encode(interaction.content).decode(), True
+            rows.append([*interaction[:7], content, binary, round(interaction.elapsed, 4)])
+
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            json.dump({"version": _FORMAT_VERSION, "interactions": rows}, f, ensure_ascii=False, separators=(",", ":"))
+        os.replace(tmp_path, self.path)
+
+    def key(self, method: str, url: str, body: Optional[bytes]) -> tuple[str, str, str]:
+        redacted = _redact_body(body, self.redact_fields, canonical=True)
+        body_key = hashlib.blake2b(redacted, digest_size=8).hexdigest() if redacted else ""
+        return method, request_path(url), body_key
+
+    @property
+    def network_allowed(self) -> bool:
+        return self.mode != "replay"
+
+    def find(self, key: tuple[str, str, str]) -> Optional[Interaction]:
+        """Следующий записанный ответ на запрос или None. В режиме record записи не воспроизводятся"""
+        if self.mode == "record":
+            return None
+        with self._lock:
+            entries = self._interactions.get(key)
+            if not entries:
+                return None
+            played = self._played.get(key, 0)
+            self._played[key] = played + 1
+            self.played += 1
+            return entries[min(played, len(entries) - 1)]
+
+    def miss(self, key: tuple[str, str, str]):
+        """Raises: CassetteMiss, если запроса нет в кассете, а сеть недоступна"""
+        with self._lock:
+            self.missed += 1
+        method, path, _ = key
+        raise exceptions.CassetteMiss(f"Запрос {method} {path} не записан в кассету {self.path}")
+
+    def record(
+        self,
+        key: tuple[str, str, str],
+        status_code: int,
+        reason: str,
+        headers: Iterable[tuple[str, str]],
+        cookies: Iterable[tuple[str, str, str]],
+        content: bytes,
+        elapsed: float,
+    ):
+        method, path, body_key = key
+        interaction = Interaction(
+            method,
+            path,
+            body_key,
+            status_code,
+            reason or "",
+            [(name, value) for name, value in headers if name.lower() not in _SKIPPED_HEADERS],
+            [(name, REDACTED_COOKIE, cookie_path) for name, _, cookie_path in cookies],
+            _redact_body(content, self.redact_fields) or b"",
+            elapsed,
+        )
+        with self._lock:
+            self._interactions.setdefault(key, []).append(interaction)
+            self.recorded += 1
+            self._dirty = True
+
+    def delay(self, interaction: Interaction) -> float:
+        """Сколько секунд воспроизводить ответ: задержка плюс передача тела"""
+        if self.latency == "recorded":
+            delay = interaction.elapsed
+        elif callable(self.latency):
+            delay = max(0.0, self.latency())
+        else:
+            delay = self.latency or 0.0
+        if self.bandwidth:
+            delay += len(interaction.content) / self.bandwidth
+        return delay
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns:
+            interactions: сколько ответов в кассете
+            recorded, played, missed: сколько ответов записано, воспроизведено и не найдено
+        """
+        with self._lock:
+            return {
+                "interactions": sum(len(entries) for entries in self._interactions.values()),
+                "recorded": self.recorded,
+                "played": self.played,
+                "missed": self.missed,
+            }
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(entries) for entries in self._interactions.values())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.save()
+
+
+def jittered(latency: float, spread: float = 0.5) -> Callable[[], float]:
+    """Задержка latency плюс-минус spread её долей, например Cassette(..., latency=jittered(0.2))"""
+    return lambda: random.uniform(latency * (1 - spread), latency * (1 + spread))
+
+
+def cassette_adapter(cassette: Cassette, adapter):
+    """
+    Адаптер requests, который отвечает из кассеты, а в сеть ходит через adapter (записывая ответы),
+    только если это разрешено режимом кассеты
+    """
+    import requests
+    from requests.adapters import BaseAdapter
+    from requests.structures import CaseInsensitiveDict
+
+    class CassetteAdapter(BaseAdapter):
+        def __init__(self):
+            super().__init__()
+            self.cassette = cassette
+            self.adapter = adapter
+
+        def send(self, request, **kwargs):
+            body = request.body.encode() if isinstance(request.body, str) else request.body
+            key = cassette.key(request.method, request.url, body)
+
+            interaction = cassette.find(key)
+            if interaction is not None:
+                time.sleep(cassette.delay(interaction))
+                return self._replay(request, interaction)
+            if not cassette.network_allowed:
+                cassette.miss(key)
+
+            started = time.monotonic()
+            response = self.adapter.send(request, **kwargs)
+            # Тело читается здесь же, чтобы записать его и полное время ответа
+            content = response.content
+            cassette.record(
+                key,
+                response.status_code,
+                response.reason,
+                response.headers.items(),
+                [(cookie.name, cookie.value, cookie.path) for cookie in response.cookies],
+                content,
+                time.monotonic() - started,
+            )
+            return response
+
+        @staticmethod
+        def _replay(request, interaction: Interaction):
+            response = requests.Response()
+            response.status_code = interaction.status_code
+            response.reason = interaction.reason
+            response.headers = CaseInsensitiveDict(interaction.headers)
+            response._content = interaction.content
+            response.url = request.url
+            response.request = request
+            for name, value, path in interaction.cookies:
+                response.cookies.set(name, value, path=path)
+            return response
+
+        def close(self):
+            self.adapter.close()
+
+    return CassetteAdapter()
+
+
+__all__ = ["Cassette", "Interaction", "REDACTED", "jittered", "redact"]
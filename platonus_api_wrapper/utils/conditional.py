@@ -0,0 +1,114 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Mapping, NamedTuple, Optional
+
+
+class _Validators(NamedTuple):
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content: bytes
+
+
+class ValidatorStore:
+    """
+    Хранилище валидаторов (ETag, Last-Modified) и тел последних ответов на GET запросы одного аккаунта.
+
+    Request по ним отправляет условные запросы (If-None-Match, If-Modified-Since), и если Платонус отвечает
+    304 Not Modified, ответ собирается из сохраненного тела без повторной передачи.
+    Хранилище ограничено и количеством адресов, и суммарным размером тел: самые давно использованные вытесняются.
+    Args:
+        maxsize: сколько адресов хранится
+        max_bytes: сколько байт тел хранится. Ответы больше max_bytes не сохраняются
+    """
+
+    def __init__(self, maxsize: int = 128, max_bytes: int = 256 * 1024):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Any, _Validators]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.conditional_requests = 0
+        self.not_modified = 0
+        self.bytes_saved = 0
+
+    @staticmethod
+    def key(url: str, params: Optional[Mapping] = None) -> Any:
+        if not params:
+            return url
+        return url, tuple(sorted((str(name), str(value)) for name, value in params.items()))
+
+    def conditional_headers(self, key: Any) -> dict[str, str]:
+        """Возвращает заголовки условного запроса для адреса, либо пустой словарь"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return {}
+            self._entries.move_to_end(key)
+            self.conditional_requests += 1
+
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def store(self, key: Any, headers: Mapping[str, str], content: bytes):
+        """Запоминает валидаторы успешного ответа. Ответы без ETag и Last-Modified не сохраняются"""
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+
+        with self._lock:
+            self._pop(key)
+            if len(content) > self.max_bytes:
+                return
+
+            self._entries[key] = _Validators(etag, last_modified, content)
+            self._bytes += len(content)
+            while len(self._entries) > self.maxsize or self._bytes > self.max_bytes:
+                self._pop(next(iter(self._entries)))
+
+    def _pop(self, key: Any):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry.content)
+
+    def discard(self, key: Any):
+        """Забывает валидаторы адреса: следующий запрос будет обычным"""
+        with self._lock:
+            self._pop(key)
+
+    def not_modified_content(self, key: Any) -> Optional[bytes]:
+        """Возвращает сохраненное тело для ответа 304"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self.not_modified += 1
+            self.bytes_saved += len(entry.content)
+            return entry.content
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns:
+            entries: сколько адресов сохранено
+            bytes: сколько байт тел сохранено
+            conditional_requests: сколько отправлено условных запросов
+            not_modified: сколько из них получили 304
+            bytes_saved: сколько байт тела не пришлось передавать
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "conditional_requests": self.conditional_requests,
+                "not_modified": self.not_modified,
+                "bytes_saved": self.bytes_saved,
+            }
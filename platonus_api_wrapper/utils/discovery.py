@@ -0,0 +1,264 @@
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+    import msvcrt
+
+# Сколько секунд сведения о Платонусе считаются актуальными
+DISCOVERY_TTL = 3600.0
+
+_MISSING = object()
+
+# Файл сведений общий для всех хостов, поэтому записи из разных потоков процесса идут по очереди
+_file_lock = threading.Lock()
+
+
+@contextmanager
+def _locked_file(path: str):
+    """Блокирует файл сведений на время чтения-изменения-записи: от других потоков и от других процессов"""
+    with _file_lock, open(f"{path}.lock", "a+b") as lock_file:
+        # Блокировка снимается при закрытии файла
+        if fcntl is not None:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        else:  # pragma: no cover - Windows
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        yield
+
+
+class HostInfo:
+    """
+    Сведения об одном Платонусе (хосте): ответ rest/api/version (версия, билд, тип лицензии) и значения,
+    которые зависят только от билда, например тип авторизации.
+
+    Сведения запрашиваются лениво, при первом обращении, и общие для всех клиентов этого хоста.
+    Если задан path, они сохраняются в JSON файл и переживают перезапуск процесса.
+    Когда меняется BUILD_NUMBER (Платонус обновили), значения, привязанные к билду, запрашиваются заново.
+    Args:
+        platonus_url: нормализованный адрес Платонуса
+        ttl: сколько секунд ответ rest/api/version считается актуальным
+        path: путь к JSON файлу для хранения сведений между запусками
+    """
+
+    def __init__(self, platonus_url: str, ttl: float = DISCOVERY_TTL, path: Optional[str] = None):
+        self.platonus_url = platonus_url
+        self.ttl = ttl
+        self.path = path
+
+        self.version: Optional[dict[str, Any]] = None
+        self.values: dict[str, Any] = {}
+        self.fetched_at = 0.0
+
+        self._lock = threading.Lock()
+        # Каждое значение запрашивается одним потоком за раз, разные значения - параллельно и без блокировки самих сведений
+        self._version_lock = threading.Lock()
+        self._fetch_locks: dict[str, threading.Lock] = {}
+        self._load()
+
+    @property
+    def build_number(self) -> Optional[str]:
+        return None if self.version is None else str(self.version.get("BUILD_NUMBER"))
+
+    def _fresh(self) -> bool:
+        return self.version is not None and time.time() - self.fetched_at < self.ttl
+
+    def _set_version(self, version: dict[str, Any]):
+        with self._lock:
+            if self.version is not None and str(version.get("BUILD_NUMBER")) != self.build_number:
+                # Платонус обновили - значения прошлого билда больше не действительны
+                self.values = {}
+            self.version = version
+            self.fetched_at = time.time()
+            self._save()
+
+    def _fetch_lock(self, name: str) -> threading.Lock:
+        with self._lock:
+            lock = self._fetch_locks.get(name)
+            if lock is None:
+                lock = self._fetch_locks[name] = threading.Lock()
+            return lock
+
+    def _set_value(self, name: str, value: Any):
+        with self._lock:
+            self.values[name] = value
+            self._save()
+
+    def get_version(self, fetch: Callable[[], dict[str, Any]]) -> dict[str, Any]:
+        """Возвращает ответ rest/api/version, запрашивая его через fetch, только если сохраненный устарел"""
+        if self._fresh():
+            return self.version
+        with self._version_lock:
+            # Пока ждали блокировку, версию мог запросить другой клиент
+            if not self._fresh():
+                self._set_version(fetch())
+            return self.version
+
+    def get(self, name: str, fetch: Callable[[], Any]) -> Any:
+        """Возвращает значение, привязанное к билду, запрашивая его через fetch один раз на билд"""
+        # _set_version и invalidate заменяют словарь целиком, поэтому он читается один раз
+        value = self.values.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._fetch_lock(name):
+            value = self.values.get(name, _MISSING)
+            if value is _MISSING:
+                value = fetch()
+                self._set_value(name, value)
+            return value
+
+    async def aget_version(self, fetch: Callable[[], Awaitable[dict[str, Any]]]) -> dict[str, Any]:
+        """Асинхронный аналог get_version. Одновременные запросы объединяет single flight транспорта"""
+        if not self._fresh():
+            self._set_version(await fetch())
+        return self.version
+
+    async def aget(self, name: str, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Асинхронный аналог get"""
+        value = self.values.get(name, _MISSING)
+        if value is _MISSING:
+            value = await fetch()
+            self._set_value(name, value)
+        return value
+
+    def snapshot(self) -> dict[str, Any]:
+        """Сведения в виде, пригодном для JSON: их можно сохранить вместе с сессиями, см. SessionVault"""
+        with self._lock:
+            return {"version": self.version, "values": dict(self.values), "fetched_at": self.fetched_at}
+
+    def restore(self, snapshot: dict[str, Any]):
+        """Принимает сохраненные через snapshot сведения, если они свежее имеющихся"""
+        with self._lock:
+            if snapshot.get("version") is None or snapshot.get("fetched_at", 0.0) <= self.fetched_at:
+                return
+            self.version = snapshot["version"]
+            self.values = dict(snapshot.get("values", {}))
+            self.fetched_at = snapshot["fetched_at"]
+            self._save()
+
+    def invalidate(self):
+        """Забывает все сведения, следующее обращение запросит их заново"""
+        with self._lock:
+            self.version = None
+            self.values = {}
+            self.fetched_at = 0.0
+            self._save()
+
+    def _load(self):
+        if self.path is None or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entry = json.load(f).get(self.platonus_url)
+        except (OSError, ValueError):
+            return
+        if entry:
+            self.version = entry["version"]
+            self.values = entry.get("values", {})
+            self.fetched_at = entry.get("fetched_at", 0.0)
+
+    def _save(self):
+        if self.path is None:
+            return
+
+        with _locked_file(self.path):
+            # В одном файле могут храниться сведения о нескольких Платонусах
+            try:
+                with open(self.path, encoding="utf-8") as f:
+                    hosts = json.load(f)
+            except (OSError, ValueError):
+                hosts = {}
+
+            hosts[self.platonus_url] = {
+                "version": self.version,
+                "values": self.values,
+                "fetched_at": self.fetched_at,
+            }
+
+            directory, name = os.path.split(os.path.abspath(self.path))
+            fd, tmp_path = tempfile.mkstemp(prefix=f"{name}.", suffix=".tmp", dir=directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json.dump(hosts, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+
+_hosts: dict[tuple[str, Optional[str]], HostInfo] = {}
+_hosts_lock = threading.Lock()
+
+
+def get_host_info(platonus_url: str, path: Optional[str] = None, ttl: float = DISCOVERY_TTL) -> HostInfo:
+    """Возвращает общие для всего процесса сведения о Платонусе по его адресу"""
+    key = (platonus_url, path)
+    with _hosts_lock:
+        host_info = _hosts.get(key)
+        if host_info is None:
+            host_info = _hosts[key] = HostInfo(platonus_url, ttl, path)
+        return host_info
+
+
+class LazyRestApiVersion:
+    """
+    Версия Платонуса для менеджеров REST API методов, которая запрашивается только при первом обращении к
+    version или build_number. Благодаря ей конструктор клиента не обращается к сети
+    """
+
+    __slots__ = ("_host_info", "_fetch")
+
+    def __init__(self, host_info: HostInfo, fetch: Callable[[], dict[str, Any]]):
+        self._host_info = host_info
+        self._fetch = fetch
+
+    @property
+    def version(self) -> float:
+        return float(self._host_info.get_version(self._fetch)["VERSION"])
+
+    @property
+    def build_number(self) -> int:
+        return int(self._host_info.get_version(self._fetch)["BUILD_NUMBER"])
+
+    def __repr__(self):
+        if self._host_info.version is None:
+            return "<LazyRestApiVersion (not discovered yet)>"
+        return str({"version": self.version, "build_number": self.build_number})
+
+
+class DiscoveredRestApiVersion:
+    """
+    Версия Платонуса для менеджеров асинхронного клиента: свойство не может дождаться запроса, поэтому версия
+    берется из уже полученных сведений о хосте, даже устаревших. Запрашивает ее AsyncPlatonusBase.initialize()
+    """
+
+    __slots__ = ("_host_info",)
+
+    def __init__(self, host_info: HostInfo):
+        self._host_info = host_info
+
+    def _version(self) -> dict[str, Any]:
+        version = self._host_info.version
+        if version is None:
+            raise RuntimeError("Версия Платонуса еще не известна, выполните await client.initialize()")
+        return version
+
+    @property
+    def version(self) -> float:
+        return float(self._version()["VERSION"])
+
+    @property
+    def build_number(self) -> int:
+        return int(self._version()["BUILD_NUMBER"])
+
+    def __repr__(self):
+        if self._host_info.version is None:
+            return "<DiscoveredRestApiVersion (not discovered yet)>"
+        return str({"version": self.version, "build_number": self.build_number})
@@ -25,3 +25,9 @@ class NetworkError(Exception):
 
 class NotValidJSON(Exception):
     pass
+
+class CircuitOpen(ServerError):
+    pass
+
+class CassetteMiss(Exception):
+    pass
@@ -0,0 +1,91 @@
+import contextvars
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Hashable, Iterator, Mapping, Optional
+
+# (ключ, результат, исключение) - заполнено либо результат, либо исключение
+Outcome = tuple[Hashable, Any, Optional[BaseException]]
+
+
+def iter_completed(
+    calls: Mapping[Hashable, Callable[[], Any]],
+    concurrency: int = 4,
+) -> Iterator[Outcome]:
+    """Выполняет вызовы в фоновых потоках и отдает результаты по мере готовности
+
+    Одновременно выполняется не больше concurrency вызовов. Ошибка одного вызова не прерывает остальные,
+    а возвращается вместе с его ключом. Если перестать читать генератор, еще не начатые вызовы отменяются.
+
+    Args:
+        calls: вызовы без аргументов по ключам, например {(year, term): lambda: ...}
+        concurrency: сколько вызовов выполняется одновременно
+    """
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    # Вызовы видят контекст вызывающего потока, в том числе текущий этап трассировки
+    pending = {executor.submit(contextvars.copy_context().run, call): key for key, call in calls.items()}
+
+    try:
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = pending.pop(future)
+                error = future.exception()
+                yield key, None if error else future.result(), error
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_completed(
+    calls: Mapping[Hashable, Callable[[], Awaitable[Any]]],
+    concurrency: int = 4,
+) -> AsyncIterator[Outcome]:
+    """Асинхронный аналог iter_completed: вызовы выполняются в задачах asyncio, ограниченных семафором"""
+    # asyncio импортируется только асинхронным кодом, синхронному клиенту он не нужен
+    import asyncio
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(key, call):
+        async with semaphore:
+            try:
+                return key, await call(), None
+            except Exception as error:
+                return key, None, error
+
+    pending = {asyncio.ensure_future(run(key, call)) for key, call in calls.items()}
+
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+def gather(
+    calls: Mapping[Hashable, Callable[[], Any]], concurrency: int = 4
+) -> tuple[dict[Hashable, Any], dict[Hashable, BaseException]]:
+    """Выполняет все вызовы, см. iter_completed. Возвращает результаты и ошибки по ключам"""
+    results, errors = {}, {}
+    for key, result, error in iter_completed(calls, concurrency):
+        if error is None:
+            results[key] = result
+        else:
+            errors[key] = error
+    return results, errors
+
+
+async def agather(
+    calls: Mapping[Hashable, Callable[[], Awaitable[Any]]], concurrency: int = 4
+) -> tuple[dict[Hashable, Any], dict[Hashable, BaseException]]:
+    """Асинхронный аналог gather"""
+    results, errors = {}, {}
+    async for key, result, error in aiter_completed(calls, concurrency):
+        if error is None:
+            results[key] = result
+        else:
+            errors[key] = error
+    return results, errors
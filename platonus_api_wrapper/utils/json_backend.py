@@ -0,0 +1,51 @@
+import json
+from typing import Any, Callable, Literal, Union
+
+JSONLoads = Callable[[bytes], Any]
+JSONBackend = Union[Literal["auto", "orjson", "ujson", "stdlib"], JSONLoads]
+
+# Порядок, в котором "auto" ищет установленную библиотеку
+AUTO_BACKENDS = ("orjson", "ujson")
+
+
+def _stdlib_loads(data: bytes) -> Any:
+    return json.loads(data)
+
+
+def _import_loads(name: str) -> JSONLoads:
+    if name == "stdlib":
+        return _stdlib_loads
+    elif name == "orjson":
+        import orjson
+
+        return orjson.loads
+    elif name == "ujson":
+        import ujson
+
+        return ujson.loads
+
+    raise ValueError(f"Unknown JSON backend {name}. Supported backends: auto, {', '.join(AUTO_BACKENDS)}, stdlib")
+
+
+def get_json_loads(backend: JSONBackend = "auto") -> JSONLoads:
+    """Возвращает функцию, декодирующую JSON прямо из байтов
+    Args:
+        backend: "auto" - самая быстрая из установленных библиотек (orjson, ujson), иначе стандартный json;
+                 "orjson", "ujson", "stdlib" - конкретная библиотека;
+                 либо собственная функция, принимающая bytes
+    Raises:
+        ImportError: Если выбранная библиотека не установлена
+    """
+    if callable(backend):
+        return backend
+
+    if backend != "auto":
+        return _import_loads(backend)
+
+    for name in AUTO_BACKENDS:
+        try:
+            return _import_loads(name)
+        except ImportError:
+            continue
+
+    return _stdlib_loads
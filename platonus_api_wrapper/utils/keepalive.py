@@ -0,0 +1,291 @@
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+import weakref
+from collections import deque
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Literal, Optional
+
+from . import exceptions
+
+if TYPE_CHECKING:
+    import asyncio
+
+logger = logging.getLogger("platonus_api_wrapper")
+
+KeepAliveMode = Literal["refresh", "ping"]
+
+
+class SessionLifetime:
+    """
+    Оценка времени жизни сессии одного аккаунта.
+
+    Время жизни отсчитывается от последней активности: логина или успешного запроса продления (пинга), ведь
+    сервлет продлевает сессию при каждом запросе. Когда Платонус отвечает, что сессия истекла, время с последней
+    активности запоминается, и оценкой служит минимальное из последних наблюдений.
+
+    Наблюдения появляются только при настоящем истечении сессии. В режиме refresh планировщик заменяет сессию новым
+    логином до истечения, и сам ничего не узнает: оценка уточняется, только если сессия все же истекла раньше
+    продления (пользовательский запрос получил 401). Поэтому для refresh стоит задать default не больше реального
+    времени жизни, а режим ping, наоборот, учится на каждом неудачном пинге.
+    Args:
+        default: оценка до первого наблюдения, в секундах. По умолчанию 30 минут - стандартное время жизни сессии сервлета
+        history: сколько последних наблюдений учитывается
+    """
+
+    def __init__(self, default: float = 1800.0, history: int = 5):
+        self.default = default
+        self.observed: deque[float] = deque(maxlen=history)
+        # Момент (time.monotonic) логина или последнего успешного продления, None - сессии нет
+        self.active_at: Optional[float] = None
+
+    def started(self):
+        """Вызывается после логина"""
+        self.active_at = time.monotonic()
+
+    def touched(self):
+        """Вызывается после успешного пинга: сессия продлена, время жизни отсчитывается заново"""
+        if self.active_at is not None:
+            self.active_at = time.monotonic()
+
+    def ended(self):
+        """Вызывается после выхода из аккаунта"""
+        self.active_at = None
+
+    def expired(self):
+        if self.active_at is not None:
+            self.observed.append(time.monotonic() - self.active_at)
+            self.active_at = None
+
+    def snapshot(self) -> dict[str, Any]:
+        """Наблюдения и момент последней активности в виде, пригодном для JSON. Момент переводится в time.time()"""
+        active_at = None
+        if self.active_at is not None:
+            active_at = time.time() - (time.monotonic() - self.active_at)
+        return {"observed": list(self.observed), "active_at": active_at}
+
+    def restore(self, snapshot: dict[str, Any]):
+        """Принимает сохраненные через snapshot наблюдения, например после перезапуска процесса"""
+        self.observed.extend(snapshot.get("observed", ()))
+        # logged_in_at - ключ снимков, сохраненных предыдущими версиями
+        active_at = snapshot.get("active_at", snapshot.get("logged_in_at"))
+        if active_at is not None:
+            self.active_at = time.monotonic() - max(0.0, time.time() - active_at)
+
+    @property
+    def estimate(self) -> float:
+        return min(self.observed) if self.observed else self.default
+
+    def due_at(self, safety: float, jitter: float) -> Optional[float]:
+        """Момент (time.monotonic), когда сессию пора продлить, или None, если сессии нет"""
+        if self.active_at is None:
+            return None
+        # Случайный сдвиг разносит продления аккаунтов, залогинившихся одновременно
+        return self.active_at + self.estimate * safety * (1 - random.uniform(0, jitter))
+
+
+def _default_ping(client):
+    # Дешевый запрос, требующий авторизации, в обход кэша методов
+    return client.session.get(client.profile_api.person_id)
+
+
+class _BaseKeepAliveScheduler:
+    def __init__(
+        self,
+        mode: KeepAliveMode = "refresh",
+        safety: float = 0.8,
+        jitter: float = 0.1,
+        ping: Optional[Callable[[Any], Any]] = None,
+    ):
+        if mode not in ("refresh", "ping"):
+            raise ValueError(f"Unknown keep-alive mode {mode}. Supported modes: refresh, ping")
+
+        self.mode = mode
+        self.safety = safety
+        self.jitter = jitter
+        self.ping = ping or _default_ping
+
+        # (когда продлить, порядковый номер, клиент, последняя активность сессии, от которой посчитан срок)
+        self._heap: list[tuple[float, int, weakref.ref, Optional[float]]] = []
+        self._counter = itertools.count()
+        self.refreshed = 0
+        self.pinged = 0
+        self.failed = 0
+
+    def _push(self, client):
+        lifetime = client._session_lifetime
+        due = lifetime.due_at(self.safety, self.jitter)
+        if due is None:
+            # Пока аккаунт не залогинен, проверяем его раз в минуту
+            due = time.monotonic() + 60
+        heapq.heappush(self._heap, (due, next(self._counter), weakref.ref(client), lifetime.active_at))
+
+    def _pop_due(self) -> tuple[Optional[Any], Optional[float]]:
+        """Возвращает клиента, которому пора продлить сессию, либо (None, время до следующей проверки)"""
+        while self._heap:
+            due, _, client_ref, active_at = self._heap[0]
+            client = client_ref()
+            if client is None:
+                heapq.heappop(self._heap)
+                continue
+
+            now = time.monotonic()
+            if due > now:
+                return None, due - now
+
+            heapq.heappop(self._heap)
+            if active_at is None or client._session_lifetime.active_at != active_at:
+                # Сессию уже обновили (логин, переавторизация) или ее нет - переносим проверку
+                self._push(client)
+                continue
+            return client, None
+        return None, None
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "clients": len(self._heap),
+            "refreshed": self.refreshed,
+            "pinged": self.pinged,
+            "failed": self.failed,
+        }
+
+
+class KeepAliveScheduler(_BaseKeepAliveScheduler):
+    """
+    Фоновый поток, продлевающий сессии аккаунтов до их истечения, чтобы пользовательский запрос не тратил время
+    на 401 и повторный логин.
+
+        scheduler = KeepAliveScheduler(mode="ping")
+        scheduler.add(platonus_session)
+        scheduler.start()
+
+    Время жизни сессии каждого аккаунта изучается по ходу работы, см. SessionLifetime. В режиме refresh
+    планировщик сам время жизни не узнает, оценка уточняется только по 401 пользовательских запросов.
+    Args:
+        mode: refresh - заново логиниться, ping - отправлять дешевый запрос, продлевающий сессию
+        safety: доля времени жизни сессии, после которой сессия продлевается
+        jitter: доля случайного разброса моментов продления
+        ping: свой запрос для режима ping, принимает клиента
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def add(self, client):
+        with self._lock:
+            self._push(client)
+        self._wakeup.set()
+
+    def start(self):
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="platonus-keepalive", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stopped:
+            with self._lock:
+                client, wait = self._pop_due()
+
+            if client is None:
+                self._wakeup.wait(wait)
+                self._wakeup.clear()
+                continue
+
+            self._keep_alive(client)
+            with self._lock:
+                self._push(client)
+
+    def _keep_alive(self, client):
+        gate = client._relogin_gate
+        try:
+            if self.mode == "ping":
+                try:
+                    self.ping(client)
+                    client._session_lifetime.touched()
+                    self.pinged += 1
+                    return
+                except exceptions.LoginSessionExpired:
+                    gate.relogin(client, gate.generation)
+            else:
+                gate.relogin(client, gate.generation, expired=False)
+            self.refreshed += 1
+        except Exception as error:
+            self.failed += 1
+            logger.warning(f"Keep-alive failed: {error!r}")
+
+
+class AsyncKeepAliveScheduler(_BaseKeepAliveScheduler):
+    """Асинхронный аналог KeepAliveScheduler: фоновая задача asyncio для клиентов AsyncPlatonusAPI"""
+
+    def __init__(self, *args, ping: Optional[Callable[[Any], Awaitable[Any]]] = None, **kwargs):
+        super().__init__(*args, ping=ping, **kwargs)
+        self._wakeup: Optional["asyncio.Event"] = None
+        self._task: Optional["asyncio.Task"] = None
+
+    def add(self, client):
+        self._push(client)
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def start(self):
+        import asyncio
+
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        import asyncio
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self):
+        import asyncio
+
+        while True:
+            client, wait = self._pop_due()
+
+            if client is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                self._wakeup.clear()
+                continue
+
+            await self._keep_alive(client)
+            self._push(client)
+
+    async def _keep_alive(self, client):
+        gate = client._relogin_gate
+        try:
+            if self.mode == "ping":
+                try:
+                    await self.ping(client)
+                    client._session_lifetime.touched()
+                    self.pinged += 1
+                    return
+                except exceptions.LoginSessionExpired:
+                    await gate.relogin(client, gate.generation)
+            else:
+                await gate.relogin(client, gate.generation, expired=False)
+            self.refreshed += 1
+        except Exception as error:
+            self.failed += 1
+            logger.warning(f"Keep-alive failed: {error!r}")
@@ -1,28 +1,186 @@
+import inspect
 import logging
+import random
+import threading
+import time
 from functools import wraps
+from typing import Optional
 
 from . import exceptions
+from .metrics import metrics
+from .tracing import hooks, traced, tracer
 
 logger = logging.getLogger("platonus_api_wrapper")
 
+
+class _BaseReloginGate:
+    """
+    Переавторизация одного аккаунта: одновременные вызовы, получившие LoginSessionExpired, не логинятся каждый сам,
+    а ждут одну переавторизацию и повторяют запрос с новым токеном.
+    Если переавторизация не удалась, следующие попытки откладываются с экспоненциальной задержкой,
+    а вызовы в это время сразу получают LoginSessionExpired, причина которого - ошибка последней попытки.
+    Без сохраненных логина и пароля (импортированная сессия) вызовы сразу получают LoginSessionExpired.
+    """
+
+    base_delay = 0.5
+    max_delay = 30.0
+
+    def __init__(self):
+        # Номер переавторизации: вызов, начатый до нее, повторяется без нового логина
+        self.generation = 0
+        self.failures = 0
+        self.retry_at = 0.0
+        self.last_error: Optional[BaseException] = None
+
+    @staticmethod
+    def _outcome(outcome: str):
+        if metrics.enabled:
+            metrics.count_relogin(outcome)
+        if hooks.active:
+            hooks.emit("on_relogin", outcome=outcome)
+        span = tracer.current_span() if tracer.enabled else None
+        if span is not None:
+            span.set(relogin=outcome)
+
+    @staticmethod
+    def _check_credentials(client):
+        # Импортированная сессия (SessionVault, session_data) может быть без логина и пароля
+        if not client._auth_credentials:
+            raise exceptions.LoginSessionExpired(
+                "Сессия истекла, а данные для переавторизации не сохранены: выполните метод login"
+            )
+
+    def _check_backoff(self):
+        if self.failures and time.monotonic() < self.retry_at:
+            self._outcome("backoff")
+            raise exceptions.LoginSessionExpired(
+                f"Переавторизация отложена на {self.retry_at - time.monotonic():.1f} с после неудачной попытки"
+            ) from self.last_error
+
+    def _failed(self, error: BaseException):
+        self._outcome("failure")
+        self.failures += 1
+        self.last_error = error
+        delay = min(self.max_delay, self.base_delay * 2 ** (self.failures - 1))
+        # Случайная часть задержки, чтобы аккаунты не повторяли попытки одновременно
+        self.retry_at = time.monotonic() + random.uniform(delay / 2, delay)
+        logger.warning(f"Relogin failed ({error!r}), next attempt in {delay:.1f}s at most")
+
+    def _succeeded(self):
+        self._outcome("success")
+        self.generation += 1
+        self.failures = 0
+        self.last_error = None
+
+
+class ReloginGate(_BaseReloginGate):
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def relogin(self, client, generation: int, expired: bool = True):
+        """
+        Переавторизует клиента, если с начала вызова (generation) этого еще никто не сделал
+        Args:
+            expired: сессия действительно истекла (а не продлевается заранее) - это учитывается в оценке ее времени жизни
+        """
+        with self._lock:
+            if self.generation != generation:
+                # Пока мы ждали, токен уже обновил другой поток
+                self._outcome("joined")
+                return
+
+            if expired:
+                client._session_lifetime.expired()
+
+            with tracer.span("relogin"):
+                self._check_credentials(client)
+                self._check_backoff()
+                logger.warning("Login session is expired, reloging...")
+                try:
+                    client.login(**client._auth_credentials)
+                except Exception as error:
+                    self._failed(error)
+                    raise
+                self._succeeded()
+
+
+class AsyncReloginGate(_BaseReloginGate):
+    def __init__(self):
+        import asyncio
+
+        super().__init__()
+        self._lock = asyncio.Lock()
+
+    async def relogin(self, client, generation: int, expired: bool = True):
+        """Асинхронный аналог ReloginGate.relogin"""
+        async with self._lock:
+            if self.generation != generation:
+                self._outcome("joined")
+                return
+
+            if expired:
+                client._session_lifetime.expired()
+
+            with tracer.span("relogin"):
+                self._check_credentials(client)
+                self._check_backoff()
+                logger.warning("Login session is expired, reloging...")
+                try:
+                    await client.login(**client._auth_credentials)
+                except Exception as error:
+                    self._failed(error)
+                    raise
+                self._succeeded()
+
+
+def _check_authed(self, method):
+    if not self.user_is_authed:
+        raise exceptions.NotCorrectLoginCredentials(f"Метод '{method.__name__}' требует авторизацию, но вы не авторизовались в Платонус. Пожалуйста выполните метод login, и укажите авторизационные данные")
+
+
 def login_required(method):
-    """Make sure user is logged in before proceeding"""
+    """Make sure user is logged in before proceeding
+
+    Публичные методы к тому же становятся этапами трассировки, см. utils/tracing.py
+    """
+    if not method.__name__.startswith("_"):
+        return traced(_login_required(method))
+    return _login_required(method)
+
+
+def _login_required(method):
+    if inspect.iscoroutinefunction(method):
+        @wraps(method)
+        async def async_wrapper_login_required(self, *args, **kwargs):
+            _check_authed(self, method)
+            # Адреса некоторых методов зависят от версии Платонуса: асинхронный клиент узнает ее заранее
+            await self.initialize()
+
+            if not self.auto_relogin:
+                return await method(self, *args, **kwargs)
+
+            generation = self._relogin_gate.generation
+            try:
+                return await method(self, *args, **kwargs)
+            except exceptions.LoginSessionExpired:
+                await self._relogin_gate.relogin(self, generation)
+                return await method(self, *args, **kwargs)
+
+        return async_wrapper_login_required
+
     @wraps(method)
     def wrapper_login_required(self, *args, **kwargs):
-
-        if not self.user_is_authed:
-            raise exceptions.NotCorrectLoginCredentials(f"Метод '{method.__name__}' требует авторизацию, но вы не авторизовались в Платонус. Пожалуйста выполните метод login, и укажите авторизационные данные")
+        _check_authed(self, method)
 
         if not self.auto_relogin:
             return method(self, *args, **kwargs)
 
+        generation = self._relogin_gate.generation
         try:
             return method(self, *args, **kwargs)
         except exceptions.LoginSessionExpired:
-            logger.warning("Login session is expired, reloging...")
-
-            self.login(**self._auth_credentials)
+            self._relogin_gate.relogin(self, generation)
             return method(self, *args, **kwargs)
 
     return wrapper_login_required
-
@@ -1,34 +1,258 @@
+import datetime
+import inspect
 import logging
-from functools import lru_cache, wraps
-from datetime import datetime, timedelta
+import re
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from enum import Enum
+from functools import wraps
+from typing import Any, Hashable, Optional
+
+from .metrics import metrics
+from .tracing import hooks, tracer
 
 logger = logging.getLogger('platonus_api_wrapper')
 
+_MISSING = object()
+
+_INTEGER_RE = re.compile(r"-?[0-9]+")
+
+
+def canonical_key(value: Any) -> Hashable:
+    """Приводит аргумент к каноничному виду, чтобы "20" и 20 попадали в одну запись кэша
+
+    Raises:
+        TypeError: Если значение невозможно привести к хэшируемому виду
+    """
+    if isinstance(value, Enum):
+        value = value.value
+
+    if isinstance(value, str):
+        # "007" и "7" - разные аргументы, числом считается только строка в каноничной записи
+        if _INTEGER_RE.fullmatch(value) and str(int(value)) == value:
+            return int(value)
+        return value
+    elif isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    elif isinstance(value, (list, tuple)):
+        return tuple(canonical_key(item) for item in value)
+    elif isinstance(value, dict):
+        return tuple(sorted((str(key), canonical_key(item)) for key, item in value.items()))
+
+    hash(value)
+    return value
+
 
 # Another name of this cache mechanic: TLRU
-def timed_lru_cache(seconds: int, maxsize: int = 128):
+class TTLCache:
+    """LRU кэш, в котором у каждой записи свой срок жизни
+
+    Args:
+        seconds: время жизни записи в секундах
+        maxsize: максимальное количество записей, None - без ограничений
+        name: имя кэша в метриках (метод, обернутый в timed_lru_cache), None - не учитывать в метриках
+    """
+
+    def __init__(self, seconds: float, maxsize: Optional[int] = 128, name: Optional[str] = None):
+        self.lifetime = seconds
+        self.maxsize = maxsize
+        self.name = name
+
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+
+            if entry is _MISSING:
+                self.misses += 1
+                self._count("miss", key)
+                return default
+
+            expiration, value = entry
+            if time.monotonic() >= expiration:
+                logger.debug("The data in the cache is out of date, dropping the entry...")
+
+                del self._data[key]
+                self.expired += 1
+                self.misses += 1
+                self._count("expired", key)
+                return default
+
+            self._data.move_to_end(key)
+            self.hits += 1
+            self._count("hit", key)
+            return value
+
+    def _count(self, event: str, key: Hashable) -> None:
+        if self.name is None:
+            return
+        if metrics.enabled:
+            metrics.count_cache(self.name, event)
+        if tracer.enabled:
+            span = tracer.current_span()
+            if span is not None:
+                span.set(cache=event)
+        if event == "hit" and hooks.active:
+            hooks.emit("on_cache_hit", name=self.name, key=key)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.lifetime, value)
+            self._data.move_to_end(key)
+
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def cache_info(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "expired": self.expired,
+                "maxsize": self.maxsize,
+                "currsize": len(self._data),
+            }
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class CacheStorage:
+    """Хранилище кэшей одного пространства имен: экземпляра клиента или аккаунта
+
+    Каждая функция, обернутая в timed_lru_cache, получает в хранилище свой TTLCache.
+
+    Args:
+        maxsize: если указан, ограничивает размер каждого кэша в хранилище
+    """
+
+    def __init__(self, maxsize: Optional[int] = None):
+        self.maxsize = maxsize
+        self._caches: dict[str, TTLCache] = {}
+        self._lock = threading.Lock()
+
+    def cache_for(self, name: str, seconds: float, maxsize: Optional[int]) -> TTLCache:
+        cache = self._caches.get(name)
+        if cache is not None:
+            return cache
+
+        if self.maxsize is not None:
+            maxsize = self.maxsize if maxsize is None else min(maxsize, self.maxsize)
+
+        with self._lock:
+            return self._caches.setdefault(name, TTLCache(seconds, maxsize, name))
+
+    def clear(self) -> None:
+        for cache in list(self._caches.values()):
+            cache.clear()
+
+    def cache_info(self) -> dict[str, dict[str, Any]]:
+        return {name: cache.cache_info() for name, cache in list(self._caches.items())}
+
+
+# Хранилища с явно заданным пространством имен (например, логин аккаунта) разделяются между экземплярами клиента.
+# Ссылки слабые: хранилище живет, пока жив хотя бы один экземпляр, который его использует
+_namespaces: "weakref.WeakValueDictionary[Hashable, CacheStorage]" = weakref.WeakValueDictionary()
+_namespaces_lock = threading.Lock()
+
+
+def get_cache_storage(namespace: Optional[Hashable] = None, maxsize: Optional[int] = None) -> CacheStorage:
+    """Возвращает хранилище кэша для пространства имен, без пространства имен - новое приватное хранилище"""
+    if namespace is None:
+        return CacheStorage(maxsize)
+
+    with _namespaces_lock:
+        storage = _namespaces.get(namespace)
+        if storage is None:
+            storage = CacheStorage(maxsize)
+            _namespaces[namespace] = storage
+        return storage
+
+
+def _make_key(signature: inspect.Signature, args: tuple, kwargs: dict) -> Optional[Hashable]:
+    try:
+        bound = signature.bind(None, *args, **kwargs)
+    except TypeError:
+        return None
+    bound.apply_defaults()
+
+    arguments = iter(bound.arguments.items())
+    next(arguments)  # self
+
+    try:
+        return tuple((name, canonical_key(value)) for name, value in arguments)
+    except TypeError:
+        # Нехэшируемые аргументы (например, файлы) не кэшируем
+        return None
+
+
+def timed_lru_cache(seconds: int, maxsize: Optional[int] = 128):
+    """Кэширует результат метода в хранилище экземпляра (self._cache_storage) с собственным сроком жизни у каждой записи
+
+    Работает как с обычными методами, так и с корутинами - у последних кэшируется результат await.
+
+    Args:
+        seconds: время жизни записи в секундах
+        maxsize: максимальное количество записей на одно пространство имен
+    """
     def wrapper_cache(func):
-        func = lru_cache(maxsize)(func)
+        signature = inspect.signature(func)
+        cache_name = func.__qualname__
 
-        func.lifetime = timedelta(seconds=seconds)
-        func.expiration = datetime.utcnow() + func.lifetime
+        def lookup(self, args, kwargs):
+            storage = getattr(self, "_cache_storage", None)
+            key = _make_key(signature, args, kwargs)
 
-        @wraps(func)
-        def wrapped_func(self, *args, **kwargs):
-            logger.debug(f"Time now: {datetime.utcnow()}")
-            logger.debug(f"Cached value's expiration time: {func.expiration}")
+            if storage is None or key is None:
+                return None, None, _MISSING
+
+            cache = storage.cache_for(cache_name, seconds, maxsize)
+            return cache, key, cache.get(key)
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapped_func(self, *args, **kwargs):
+                cache, key, value = lookup(self, args, kwargs)
+                if value is not _MISSING:
+                    return value
 
-            self._cached_functions_list = func
+                value = await func(self, *args, **kwargs)
+                if cache is not None:
+                    cache.set(key, value)
+                return value
 
-            if datetime.utcnow() >= func.expiration:
-                logger.debug("The data in the cache is out of date, clearing the cache...")
+            async_wrapped_func.cache_name = cache_name
+            return async_wrapped_func
 
-                func.cache_clear()
-                func.expiration = datetime.utcnow() + func.lifetime
+        @wraps(func)
+        def wrapped_func(self, *args, **kwargs):
+            cache, key, value = lookup(self, args, kwargs)
+            if value is not _MISSING:
+                return value
 
-            return func(self, *args, **kwargs)
+            value = func(self, *args, **kwargs)
+            if cache is not None:
+                cache.set(key, value)
+            return value
 
+        wrapped_func.cache_name = cache_name
         return wrapped_func
 
     return wrapper_cache
-
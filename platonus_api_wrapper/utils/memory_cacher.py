@@ -1,25 +1,24 @@
-from typing import Callable
+from typing import Any, Hashable, Optional
 
+from .lru_cacher import CacheStorage, get_cache_storage
 
-class MemoryCacherMixin:
-    def __init__(self):
-        self.__memory_cacher: list[Callable] = []
 
-    @property
-    def _cached_functions_list(self) -> list[Callable]:
-        return self.__memory_cacher
+class MemoryCacherMixin:
+    """Дает экземпляру собственное хранилище кэша для методов, обернутых в timed_lru_cache
 
-    @_cached_functions_list.setter
-    def _cached_functions_list(self, value: Callable):
-        for list_value in self.__memory_cacher:
-            if list_value == value:
-                return
+    Args:
+        cache_namespace: пространство имен кэша. Экземпляры с одинаковым пространством имен (например, одним логином)
+                         используют общий кэш. По умолчанию у каждого экземпляра свой кэш
+        cache_maxsize: ограничение количества записей в каждом кэше
+    """
 
-        self.__memory_cacher.append(value)
+    def __init__(self, cache_namespace: Optional[Hashable] = None, cache_maxsize: Optional[int] = None):
+        self._cache_storage: CacheStorage = get_cache_storage(cache_namespace, cache_maxsize)
 
-    @_cached_functions_list.deleter
-    def _cached_functions_list(self):
-        for func in self.__memory_cacher:
-            func.cache_clear()
+    def cache_clear(self) -> None:
+        """Очищает кэш только своего пространства имен"""
+        self._cache_storage.clear()
 
-        self.__memory_cacher = []
+    def cache_info(self) -> dict[str, dict[str, Any]]:
+        """Возвращает статистику кэша (попадания, промахи, устаревшие записи) по каждому методу"""
+        return self._cache_storage.cache_info()
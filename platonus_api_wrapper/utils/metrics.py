@@ -0,0 +1,330 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable, Optional
+
+# Границы корзин гистограммы задержек в секундах, последняя корзина (+Inf) подразумевается
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Состояния предохранителя и события, которые считаются по хостам, см. utils/retry.py
+CIRCUIT_STATES = ("closed", "open", "half_open")
+CIRCUIT_EVENTS = ("opened", "half_open", "closed", "rejected")
+
+_ID_RE = re.compile(r"(?<=/)-?[0-9]+(?=/|$)")
+
+
+class Endpoint(str):
+    """Адрес REST API метода, который помнит имя своей логической точки, например study_room.student_journal"""
+
+    endpoint: str
+
+    def __new__(cls, url: str, endpoint: str):
+        obj = super().__new__(cls, url)
+        obj.endpoint = endpoint
+        return obj
+
+
+def endpoint_name(url: str) -> str:
+    """
+    Имя логической точки для метрик. Адреса из менеджеров REST API методов уже знают свое имя,
+    у остальных отбрасываются параметры запроса, а числовые части пути заменяются на :id
+    """
+    endpoint = getattr(url, "endpoint", None)
+    if endpoint is not None:
+        return endpoint
+    return _ID_RE.sub(":id", url.split("?", 1)[0])
+
+
+def _tagged(getter: Callable, endpoint: str) -> Callable:
+    def tagged(*args, **kwargs):
+        url = getter(*args, **kwargs)
+        return Endpoint(url, endpoint) if isinstance(url, str) else url
+
+    tagged.__name__, tagged.__qualname__, tagged.__doc__ = getter.__name__, getter.__qualname__, getter.__doc__
+    return tagged
+
+
+class EndpointManager:
+    """
+    Основа менеджеров REST API методов: адреса в атрибутах, свойствах и методах менеджера получают имя
+    логической точки "{endpoint_prefix}.{имя атрибута}", по которому Request собирает метрики.
+    Служебные атрибуты (language_code_str, rest_api_version) и приватные имена не помечаются
+    """
+
+    endpoint_prefix = "api"
+
+    _NOT_ENDPOINTS = frozenset({"language_code_str", "language_code_int", "rest_api_version"})
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for name, value in list(vars(cls).items()):
+            if name.startswith("_") or name in cls._NOT_ENDPOINTS:
+                continue
+            endpoint = f"{cls.endpoint_prefix}.{name}"
+            if isinstance(value, property) and value.fget is not None:
+                setattr(cls, name, property(_tagged(value.fget, endpoint), value.fset, value.fdel, value.__doc__))
+            elif callable(value) and not isinstance(value, (staticmethod, classmethod, type)):
+                setattr(cls, name, _tagged(value, endpoint))
+
+    def __setattr__(self, name: str, value: Any):
+        if type(value) is str and not name.startswith("_") and name not in self._NOT_ENDPOINTS:
+            value = Endpoint(value, f"{self.endpoint_prefix}.{name}")
+        super().__setattr__(name, value)
+
+
+class Histogram:
+    """Гистограмма с фиксированными границами корзин, как в Prometheus"""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Оценка квантиля по верхней границе корзины, None - наблюдений нет или квантиль за последней границей"""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return None
+
+    def snapshot(self) -> dict[str, Any]:
+        buckets, seen = {}, 0
+        for bound, count in zip((*self.bounds, float("inf")), self.counts):
+            seen += count
+            buckets[bound] = seen
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": buckets,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class _EndpointStats:
+    __slots__ = ("latency", "statuses", "errors", "bytes")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.latency = Histogram(bounds)
+        self.statuses: dict[int, int] = {}
+        self.errors: dict[str, int] = {}
+        self.bytes = 0
+
+
+class Metrics:
+    """
+    Метрики клиента по логическим точкам REST API (имя атрибута менеджера, а не адрес с ID):
+    гистограмма задержек, коды ответов, ошибки, байты ответов. Отдельно считаются попадания, промахи и
+    устаревшие записи кэша timed_lru_cache по методам, переавторизации по исходу, повторы запросов
+    и состояние предохранителей по хостам.
+
+    По умолчанию метрики выключены: запрос проверяет один флаг и ничего не записывает.
+    Включаются на весь процесс: platonus_api_wrapper.metrics.enable()
+    Args:
+        enabled: собирать ли метрики
+        buckets: границы корзин гистограммы задержек в секундах
+    """
+
+    def __init__(self, enabled: bool = False, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+
+        self._lock = threading.Lock()
+        self._endpoints: dict[tuple[str, str], _EndpointStats] = {}
+        self._cache: dict[tuple[str, str], int] = {}
+        self._relogins: dict[str, int] = {}
+        self._retries: dict[tuple[str, str], int] = {}
+        self._circuit_events: dict[tuple[str, str], int] = {}
+        self._circuit_states: dict[str, str] = {}
+        self.started_at = time.time()
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        """Обнуляет все метрики"""
+        with self._lock:
+            self._endpoints = {}
+            self._cache = {}
+            self._relogins = {}
+            self._retries = {}
+            self._circuit_events = {}
+            self._circuit_states = {}
+            self.started_at = time.time()
+
+    def _endpoint(self, url: str, method: str) -> _EndpointStats:
+        key = (endpoint_name(url), method)
+        stats = self._endpoints.get(key)
+        if stats is None:
+            stats = self._endpoints[key] = _EndpointStats(self.buckets)
+        return stats
+
+    def observe_response(self, url: str, method: str, status_code: int, seconds: float, size: int):
+        """Записывает ответ хоста: задержку вместе с повторами, код ответа и размер тела в байтах"""
+        with self._lock:
+            stats = self._endpoint(url, method)
+            stats.latency.observe(seconds)
+            stats.statuses[status_code] = stats.statuses.get(status_code, 0) + 1
+            stats.bytes += size
+
+    def observe_error(self, url: str, method: str, error: BaseException, seconds: float):
+        """Записывает запрос, не получивший ответа: таймаут, сетевая ошибка, разомкнутый предохранитель"""
+        name = type(error).__name__
+        with self._lock:
+            stats = self._endpoint(url, method)
+            stats.latency.observe(seconds)
+            stats.errors[name] = stats.errors.get(name, 0) + 1
+
+    def count_cache(self, name: str, event: str):
+        """event: hit, miss или expired (устаревшая запись, тоже считается промахом)"""
+        with self._lock:
+            key = (name, event)
+            self._cache[key] = self._cache.get(key, 0) + 1
+
+    def count_relogin(self, outcome: str):
+        """outcome: success, failure, backoff (попытка отложена после неудачи) или joined (токен обновил другой вызов)"""
+        with self._lock:
+            self._relogins[outcome] = self._relogins.get(outcome, 0) + 1
+
+    def count_retry(self, host: str, outcome: str):
+        """outcome: retried (запрос будет повторен) или exhausted (повторы закончились ошибкой)"""
+        with self._lock:
+            key = (host, outcome)
+            self._retries[key] = self._retries.get(key, 0) + 1
+
+    def count_circuit(self, host: str, event: str, state: str):
+        """
+        event: opened (предохранитель разомкнулся), half_open (пропущен пробный запрос), closed (замкнулся)
+               или rejected (запрос отклонен без обращения к хосту); state - состояние после события
+        """
+        with self._lock:
+            key = (host, event)
+            self._circuit_events[key] = self._circuit_events.get(key, 0) + 1
+            self._circuit_states[host] = state
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns:
+            endpoints: {"api.login": {"POST": {"latency": ..., "statuses": ..., "errors": ..., "bytes": ...}}}
+            cache: {"StudyRoom.student_journal": {"hit": 10, "miss": 2, "expired": 1}}
+            relogins: {"success": 1, "joined": 15}
+            retries: {"https://platonus.example.kz/": {"retried": 4, "exhausted": 1}}
+            circuit_breakers: {"https://platonus.example.kz/": {"state": "open", "opened": 1, "rejected": 12, ...}}
+        """
+        with self._lock:
+            endpoints: dict[str, dict[str, Any]] = {}
+            for (endpoint, method), stats in sorted(self._endpoints.items()):
+                endpoints.setdefault(endpoint, {})[method] = {
+                    "latency": stats.latency.snapshot(),
+                    "statuses": dict(stats.statuses),
+                    "errors": dict(stats.errors),
+                    "bytes": stats.bytes,
+                }
+
+            cache: dict[str, dict[str, int]] = {}
+            for (name, event), count in sorted(self._cache.items()):
+                cache.setdefault(name, {"hit": 0, "miss": 0, "expired": 0})[event] = count
+
+            retries: dict[str, dict[str, int]] = {}
+            for (host, outcome), count in sorted(self._retries.items()):
+                retries.setdefault(host, {"retried": 0, "exhausted": 0})[outcome] = count
+
+            circuit_breakers: dict[str, dict[str, Any]] = {
+                host: {"state": state, "opened": 0, "half_open": 0, "closed": 0, "rejected": 0}
+                for host, state in sorted(self._circuit_states.items())
+            }
+            for (host, event), count in self._circuit_events.items():
+                circuit_breakers[host][event] = count
+
+            return {
+                "since": self.started_at,
+                "endpoints": endpoints,
+                "cache": cache,
+                "relogins": dict(self._relogins),
+                "retries": retries,
+                "circuit_breakers": circuit_breakers,
+            }
+
+    def prometheus(self, prefix: str = "platonus") -> str:
+        """Метрики в текстовом формате Prometheus (text exposition format 0.0.4)"""
+        snapshot = self.snapshot()
+        lines = [
+            f"# HELP {prefix}_request_duration_seconds Время запроса к Платонусу вместе с повторами",
+            f"# TYPE {prefix}_request_duration_seconds histogram",
+        ]
+        responses, errors, sizes = [], [], []
+        for endpoint, methods in snapshot["endpoints"].items():
+            for method, stats in methods.items():
+                labels = f'endpoint="{_escape(endpoint)}",method="{method}"'
+                latency = stats["latency"]
+                for bound, count in latency["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{labels},le="{le}"}} {count}')
+                lines.append(f"{prefix}_request_duration_seconds_sum{{{labels}}} {latency['sum']!r}")
+                lines.append(f"{prefix}_request_duration_seconds_count{{{labels}}} {latency['count']}")
+                responses += [f'{prefix}_responses_total{{{labels},status="{status}"}} {count}'
+                              for status, count in sorted(stats["statuses"].items())]
+                errors += [f'{prefix}_request_errors_total{{{labels},error="{error}"}} {count}'
+                           for error, count in sorted(stats["errors"].items())]
+                sizes.append(f"{prefix}_response_bytes_total{{{labels}}} {stats['bytes']}")
+
+        lines += [f"# HELP {prefix}_responses_total Ответы Платонуса по кодам", f"# TYPE {prefix}_responses_total counter"]
+        lines += responses
+        lines += [f"# HELP {prefix}_request_errors_total Запросы без ответа", f"# TYPE {prefix}_request_errors_total counter"]
+        lines += errors
+        lines += [f"# HELP {prefix}_response_bytes_total Байты тел ответов", f"# TYPE {prefix}_response_bytes_total counter"]
+        lines += sizes
+
+        lines += [f"# HELP {prefix}_cache_events_total Обращения к кэшу методов", f"# TYPE {prefix}_cache_events_total counter"]
+        for name, events in snapshot["cache"].items():
+            lines += [f'{prefix}_cache_events_total{{method="{_escape(name)}",event="{event}"}} {count}'
+                      for event, count in events.items()]
+
+        lines += [f"# HELP {prefix}_relogins_total Переавторизации по исходу", f"# TYPE {prefix}_relogins_total counter"]
+        lines += [f'{prefix}_relogins_total{{outcome="{outcome}"}} {count}'
+                  for outcome, count in sorted(snapshot["relogins"].items())]
+
+        lines += [f"# HELP {prefix}_retries_total Повторы запросов к хосту", f"# TYPE {prefix}_retries_total counter"]
+        for host, outcomes in snapshot["retries"].items():
+            lines += [f'{prefix}_retries_total{{host="{_escape(host)}",outcome="{outcome}"}} {count}'
+                      for outcome, count in outcomes.items()]
+
+        states, events = [], []
+        for host, breaker in snapshot["circuit_breakers"].items():
+            label = f'host="{_escape(host)}"'
+            states += [f'{prefix}_circuit_breaker_state{{{label},state="{state}"}} {int(breaker["state"] == state)}'
+                       for state in CIRCUIT_STATES]
+            events += [f'{prefix}_circuit_breaker_events_total{{{label},event="{event}"}} {breaker[event]}'
+                       for event in CIRCUIT_EVENTS]
+        lines += [f"# HELP {prefix}_circuit_breaker_state Состояние предохранителя хоста: 1 - текущее",
+                  f"# TYPE {prefix}_circuit_breaker_state gauge"]
+        lines += states
+        lines += [f"# HELP {prefix}_circuit_breaker_events_total Переключения предохранителя и отклоненные запросы",
+                  f"# TYPE {prefix}_circuit_breaker_events_total counter"]
+        lines += events
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Метрики общие для всего процесса, как и предохранители с ограничителями хостов
+metrics = Metrics()
@@ -0,0 +1,103 @@
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterator, Sequence
+
+from ..models import Model, ModelList
+
+
+def page_items(page: Any, keys: Sequence[str] = ()) -> Sequence:
+    """Достает список элементов из страницы ответа
+
+    Страница может быть самим списком, либо объектом, в котором список лежит в одном из полей keys.
+    Если ни одного из полей нет, берется первое поле со списком.
+    """
+    if isinstance(page, (list, ModelList)):
+        return page
+
+    if isinstance(page, Model):
+        for key in keys:
+            if key in page:
+                return getattr(page, key)
+
+        for key, value in page.to_dict().items():
+            if isinstance(value, list):
+                return getattr(page, key)
+
+    return []
+
+
+def iter_pages(
+    fetch_page: Callable[[int], Any],
+    is_last_page: Callable[[Any], bool],
+    concurrency: int = 1,
+    start: int = 0,
+) -> Iterator[Any]:
+    """Постранично загружает ответы, заранее запрашивая следующие страницы в фоновых потоках
+
+    Страницы отдаются строго по порядку. В памяти одновременно находится не больше concurrency + 1 страниц,
+    поэтому расход памяти не зависит от общего количества страниц.
+
+    Args:
+        fetch_page: функция, загружающая страницу по ее номеру
+        is_last_page: функция, определяющая по странице, что страниц больше нет
+        concurrency: сколько страниц загружается одновременно, 1 - только следующая страница
+        start: номер первой страницы
+    """
+    executor = ThreadPoolExecutor(max_workers=concurrency)
+    pending = deque()
+    next_page_number = start
+
+    try:
+        while True:
+            while len(pending) < concurrency:
+                pending.append(executor.submit(fetch_page, next_page_number))
+                next_page_number += 1
+
+            page = pending.popleft().result()
+
+            if is_last_page(page):
+                yield page
+                return
+
+            # Пока вызывающий код обрабатывает страницу, следующая уже загружается
+            pending.append(executor.submit(fetch_page, next_page_number))
+            next_page_number += 1
+
+            yield page
+    finally:
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+async def aiter_pages(
+    fetch_page: Callable[[int], Awaitable[Any]],
+    is_last_page: Callable[[Any], bool],
+    concurrency: int = 1,
+    start: int = 0,
+) -> AsyncIterator[Any]:
+    """Асинхронный аналог iter_pages: следующие страницы загружаются в отдельных задачах asyncio"""
+    import asyncio
+
+    pending = deque()
+    next_page_number = start
+
+    try:
+        while True:
+            while len(pending) < concurrency:
+                pending.append(asyncio.ensure_future(fetch_page(next_page_number)))
+                next_page_number += 1
+
+            page = await pending.popleft()
+
+            if is_last_page(page):
+                yield page
+                return
+
+            pending.append(asyncio.ensure_future(fetch_page(next_page_number)))
+            next_page_number += 1
+
+            yield page
+    finally:
+        for task in pending:
+            task.cancel()
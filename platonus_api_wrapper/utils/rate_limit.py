@@ -0,0 +1,250 @@
+import os
+import struct
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+
+class TokenBucket:
+    """
+    Ведро токенов: в среднем rate запросов в секунду, всплеск до burst запросов.
+
+    Каждый вызов reserve резервирует токен, даже если ведро пусто: тогда возвращается время до его появления.
+    Ожидающие получают токены по очереди, без опроса.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self) -> float:
+        """Резервирует токен и возвращает, сколько секунд подождать до него"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate) - 1
+            self._updated = now
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+
+class FileTokenBucket(TokenBucket):
+    """
+    Ведро токенов, общее для нескольких процессов: состояние хранится в локальном файле
+    и изменяется под блокировкой flock. Работает только на POSIX системах.
+    Args:
+        path: файл состояния, создается при первом обращении. Все процессы должны указывать один и тот же файл
+    """
+
+    _STATE = struct.Struct("<dd")
+
+    def __init__(self, path: str, rate: float, burst: int):
+        import fcntl
+
+        super().__init__(rate, burst)
+        self.path = path
+        self._flock = fcntl.flock
+        self._lock_exclusive, self._unlock = fcntl.LOCK_EX, fcntl.LOCK_UN
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+
+    def reserve(self) -> float:
+        with self._lock:
+            self._flock(self._fd, self._lock_exclusive)
+            try:
+                state = os.pread(self._fd, self._STATE.size, 0)
+                # Часы общие для процессов, поэтому time.time(), а не time.monotonic()
+                now = time.time()
+                if len(state) == self._STATE.size:
+                    tokens, updated = self._STATE.unpack(state)
+                else:
+                    tokens, updated = float(self.burst), now
+                tokens = min(self.burst, tokens + max(0.0, now - updated) * self.rate) - 1
+                os.pwrite(self._fd, self._STATE.pack(tokens, now), 0)
+            finally:
+                self._flock(self._fd, self._unlock)
+        return 0.0 if tokens >= 0 else -tokens / self.rate
+
+    def close(self):
+        os.close(self._fd)
+
+
+class RateLimiter:
+    """
+    Ограничитель запросов к одному хосту Платонуса: не больше rate запросов в секунду (ведро токенов)
+    и не больше max_in_flight одновременных запросов.
+
+    Запрос сверх лимита не получает ошибку, а ждет своей очереди (backpressure), время ожидания видно в stats().
+    Ограничитель общий для всех клиентов (синхронных и асинхронных) одного хоста в процессе, см. get_rate_limiter.
+    Чтобы делить лимит запросов в секунду между процессами, укажите path - файл состояния ведра токенов.
+    Лимит одновременных запросов действует в пределах процесса.
+    Args:
+        rate: запросов в секунду, None - без ограничения
+        burst: сколько запросов можно отправить разом после простоя, по умолчанию rate
+        max_in_flight: одновременных запросов, None - без ограничения
+        path: файл для общего между процессами ведра токенов (только POSIX)
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = 20.0,
+        burst: Optional[int] = None,
+        max_in_flight: Optional[int] = 16,
+        path: Optional[str] = None,
+    ):
+        self.rate = rate
+        self.max_in_flight = max_in_flight
+
+        self.bucket: Optional[TokenBucket] = None
+        if rate is not None:
+            burst = burst or max(1, int(rate))
+            self.bucket = FileTokenBucket(path, rate, burst) if path else TokenBucket(rate, burst)
+
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        # Функции, передающие освободившееся место ожидающему потоку или задаче
+        self._waiters: deque[Callable[[], None]] = deque()
+
+        self.requests = 0
+        self.queued = 0
+        self.waited = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def _enqueue(self):
+        with self._lock:
+            self.requests += 1
+            self.queued += 1
+
+    def _dequeue(self, started: float):
+        wait_time = time.monotonic() - started
+        with self._lock:
+            self.queued -= 1
+            # Доли миллисекунды - это накладные расходы, а не ожидание
+            if wait_time >= 0.001:
+                self.waited += 1
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+
+    def _try_take_slot(self, waiter: Callable[[], None]) -> bool:
+        with self._lock:
+            if self.max_in_flight is None or self._in_flight < self.max_in_flight:
+                self._in_flight += 1
+                return True
+            self._waiters.append(waiter)
+            return False
+
+    def _release_slot(self):
+        with self._lock:
+            if not self._waiters:
+                self._in_flight -= 1
+                return
+            # Место не освобождается, а сразу переходит первому ожидающему
+            wake = self._waiters.popleft()
+        wake()
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """Ждет разрешения на запрос в текущем потоке. Место освобождается при выходе из with"""
+        started = time.monotonic()
+        self._enqueue()
+        try:
+            if self.bucket is not None:
+                delay = self.bucket.reserve()
+                if delay:
+                    time.sleep(delay)
+
+            event = threading.Event()
+            if not self._try_take_slot(event.set):
+                event.wait()
+        finally:
+            self._dequeue(started)
+
+        try:
+            yield
+        finally:
+            self._release_slot()
+
+    @asynccontextmanager
+    async def aacquire(self) -> AsyncIterator[None]:
+        """Асинхронный аналог acquire: ожидание не блокирует event loop"""
+        import asyncio
+
+        started = time.monotonic()
+        self._enqueue()
+        try:
+            if self.bucket is not None:
+                delay = self.bucket.reserve()
+                if delay:
+                    await asyncio.sleep(delay)
+
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+
+            def hand_over():
+                if future.done():
+                    # Задачу отменили, пока место шло к ней - отдаем его следующему
+                    self._release_slot()
+                else:
+                    future.set_result(None)
+
+            def wake():
+                loop.call_soon_threadsafe(hand_over)
+
+            if not self._try_take_slot(wake):
+                try:
+                    await future
+                except asyncio.CancelledError:
+                    with self._lock:
+                        handed_over = wake not in self._waiters
+                        if not handed_over:
+                            self._waiters.remove(wake)
+                    if handed_over and future.done() and not future.cancelled():
+                        self._release_slot()
+                    raise
+        finally:
+            self._dequeue(started)
+
+        try:
+            yield
+        finally:
+            self._release_slot()
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            requests: сколько запросов прошло через ограничитель
+            in_flight: сколько запросов выполняется сейчас
+            queued: сколько запросов ждет сейчас
+            waited: сколько запросов ждали своей очереди
+            wait_time_total, wait_time_max: суммарное и максимальное время ожидания в секундах
+        """
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "in_flight": self._in_flight,
+                "queued": self.queued,
+                "waited": self.waited,
+                "wait_time_total": self.wait_time_total,
+                "wait_time_max": self.wait_time_max,
+            }
+
+
+_limiters: dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(platonus_url: str, **kwargs) -> RateLimiter:
+    """
+    Возвращает общий для всего процесса ограничитель хоста. Аргументы RateLimiter учитываются при создании,
+    поэтому свои лимиты нужно задать до создания первого клиента:
+
+        get_rate_limiter(URLNormalizer("http://test4.platonus.kz", "/"), rate=5, max_in_flight=4)
+    """
+    with _limiters_lock:
+        limiter = _limiters.get(platonus_url)
+        if limiter is None:
+            limiter = _limiters[platonus_url] = RateLimiter(**kwargs)
+        return limiter
@@ -1,11 +1,29 @@
+import copy
 import json
 import logging
+import time
+from contextvars import ContextVar
+from functools import lru_cache
+from http.cookiejar import DefaultCookiePolicy
+from typing import TYPE_CHECKING, Callable, Optional
 
-import requests
-from requests.adapters import HTTPAdapter
-
-from ..utils.dict2object import dict2object
+from ..models import Model, convert
 from . import exceptions
+from .conditional import ValidatorStore
+from .json_backend import JSONBackend, JSONLoads, get_json_loads
+from .metrics import endpoint_name, metrics
+from .rate_limit import RateLimiter, get_rate_limiter
+from .retry import DEFAULT_RETRY_POLICY, CircuitBreaker, RetryCallback, RetryPolicy, get_circuit_breaker
+from .single_flight import SingleFlight, coalescable, request_key
+from .tracing import Span, hooks, tracer
+
+if TYPE_CHECKING:
+    import requests
+
+    from .cassette import Cassette
+
+# requests импортируется при создании первого Transport: модуль нужен и асинхронному клиенту
+# (общие ответ и заголовки), которому requests не нужен
 
 logging.getLogger("urllib3").setLevel(logging.WARNING)
 
@@ -17,66 +35,197 @@ HEADER = {
 }
 
 
-class Response:
-    def __init__(self, request_obj: requests.Response) -> None:
-        #: Integer Code of responded HTTP Status, e.g. 404 or 200.
-        self.status_code = request_obj.status_code
+class BaseResponse:
+    """Общая часть синхронного и асинхронного ответа: декодирование тела
+
+    Когда трассировка включена, декодирование JSON и конвертация в модель записываются этапами запроса (_span)
+    """
+
+    __slots__ = ()
+
+    content: bytes
+    _json_loads: JSONLoads
+    _span: Optional[Span]
 
-        #: Case-insensitive Dictionary of Response Headers.
-        #: For example, ``headers['content-encoding']`` will return the
-        #: value of a ``'Content-Encoding'`` response header.
-        self.headers = request_obj.headers
+    @property
+    def text(self, encoding="utf-8") -> str:
+        """Returns the text/str version of the response (decoded)"""
+        try:
+            return self.content.decode(encoding)
+        except Exception:
+            return str(self.content).encode(encoding).decode(encoding)
 
-        #: File-like object representation of response (for advanced usage).
-        #: Use of ``raw`` requires that ``stream=True`` be set on the request.
-        #: This requirement does not apply for use internally to Requests.
-        self.raw = request_obj.raw
+    def json(self, **kwargs):
+        if self._span is None or not tracer.enabled:
+            return self._decode_json(kwargs)
+        with tracer.span("json_decode", parent=self._span, bytes=len(self.content)):
+            return self._decode_json(kwargs)
+
+    def _decode_json(self, kwargs: dict):
+        # Декодируем прямо из байтов, промежуточная строка не нужна
+        if kwargs:
+            return json.loads(self.content, **kwargs)
+        return self._json_loads(self.content)
+
+    def as_object(self, model: type[Model] = Model):
+        """Возвращает ответ в виде модели (списки - в виде ModelList), вложенные поля конвертируются лениво"""
+        if self._span is None or not tracer.enabled:
+            return convert(self._decode_json({}), model)
+        with tracer.span("as_object", parent=self._span, model=model.__name__) as span:
+            with tracer.span("json_decode", parent=span, bytes=len(self.content)):
+                data = self._decode_json({})
+            return convert(data, model)
+
+
+def raise_by_status_code(status_code):
+    # Ported from Android
+    if status_code == 401:
+        raise exceptions.LoginSessionExpired(
+            "Сессия истекла, возобновите сессию с помощью метода login"
+        )
+    elif status_code == 404:
+        raise exceptions.ServerError(
+            f"Серверная ошибка, попробуйте чуть позже, код ошибки: {status_code}"
+        )
+    elif status_code >= 402:
+        raise exceptions.ServerError(
+            f"Серверная ошибка, попробуйте чуть позже, код ошибки: {status_code}"
+        )
 
-        #: Final URL location of Response.
-        self.url = request_obj.url
 
-        #: Encoding to decode with when accessing r.text.
-        self.encoding = request_obj.encoding
+def observe_error(url: str, method: str, error: BaseException, started: Optional[float]):
+    if started is not None and metrics.enabled:
+        metrics.observe_error(url, method, error, time.perf_counter() - started)
 
-        #: A list of :class:`Response <Response>` objects from
-        #: the history of the Request. Any redirect responses will end
-        #: up here. The list is sorted from the oldest to the most recent request.
-        self.history = request_obj.history
 
-        #: Textual reason of responded HTTP Status, e.g. "Not Found" or "OK".
-        self.reason = request_obj.reason
+def observe_response(url: str, method: str, status_code: int, started: float, size: int):
+    """Передает полученный ответ в метрики и обработчики after_response"""
+    elapsed = time.perf_counter() - started
+    if metrics.enabled:
+        metrics.observe_response(url, method, status_code, elapsed, size)
+    if hooks.active:
+        hooks.emit(
+            "after_response",
+            method=method, url=url, endpoint=endpoint_name(url), status_code=status_code, elapsed=elapsed, size=size,
+        )
 
-        #: A CookieJar of Cookies the server sent back.
-        self.cookies = request_obj.cookies
 
-        #: The amount of time elapsed between sending the request
-        #: and the arrival of the response (as a timedelta).
-        #: This property specifically measures the time taken between sending
-        #: the first byte of the request and finishing parsing the headers. It
-        #: is therefore unaffected by consuming the response content or the
-        #: value of the ``stream`` keyword argument.
-        self.elapsed = request_obj.elapsed
+def retry_callback(method: str, url: str, span: Optional[Span]) -> Optional[RetryCallback]:
+    """Обработчик повторов для RetryPolicy: отмечает повтор в этапе запроса и вызывает обработчики on_retry"""
+    if span is None and not hooks.active:
+        return None
 
-        #: The :class:`PreparedRequest <PreparedRequest>` object to which this
-        #: is a response.
-        self.request = request_obj.request
+    def on_retry(attempt: int, delay: float, status_code: Optional[int], error: Optional[BaseException]):
+        if span is not None:
+            span.set(retries=attempt)
+        if hooks.active:
+            hooks.emit(
+                "on_retry",
+                method=method, url=url, endpoint=endpoint_name(url),
+                attempt=attempt, delay=delay, status_code=status_code, error=error,
+            )
 
-        # properties
-        self.content = request_obj.content
-        self.apparent_encoding = request_obj.apparent_encoding
-        self.is_redirect = request_obj.is_redirect
-        self.is_permanent_redirect = request_obj.is_permanent_redirect
-        self.links = request_obj.links
-        self.next = request_obj.next
-        self.ok = request_obj.ok
+    return on_retry
 
-    @property
-    def text(self, encoding="utf-8") -> str:
-        """Returns the text/str version of the response (decoded)"""
+
+# Время установки соединения в текущей попытке запроса, см. _traced_attempt
+_connected_at: ContextVar[Optional[float]] = ContextVar("platonus_connected_at", default=None)
+
+
+def _copy_response(response: "requests.Response") -> "requests.Response":
+    """Копия ответа для вызова, объединенного с другими (SingleFlight): свои статус, тело, заголовки и куки"""
+    from requests.structures import CaseInsensitiveDict
+
+    copied = copy.copy(response)
+    copied.headers = CaseInsensitiveDict(response.headers)
+    copied.cookies = response.cookies.copy()
+    return copied
+
+
+def _traced_attempt(http_request: Callable[[], "requests.Response"], queued_at: float) -> "requests.Response":
+    """
+    Попытка запроса с этапами: ожидание ограничителя, соединение (DNS, TCP и TLS вместе, urllib3 не разделяет их),
+    ожидание первого байта и чтение тела
+    """
+    with tracer.span("attempt") as attempt:
+        started = time.time()
+        tracer.record("rate_limit", queued_at, started)
+        token = _connected_at.set(None)
         try:
-            return self.content.decode(encoding)
-        except Exception:
-            return str(self.content).encode(encoding).decode(encoding)
+            response = http_request()
+            connected_at = _connected_at.get()
+        finally:
+            _connected_at.reset(token)
+        finished = time.time()
+
+        # requests измеряет elapsed от отправки запроса до разбора заголовков ответа, тело читается после
+        headers_at = started + response.elapsed.total_seconds()
+        tracer.record("ttfb", connected_at or started, headers_at)
+        tracer.record("body", headers_at, finished, bytes=len(response.content))
+        attempt.set(status_code=response.status_code, reused_connection=connected_at is None)
+        return response
+
+
+@lru_cache(maxsize=None)
+def _traced_pool_classes() -> dict[str, type]:
+    """Пулы urllib3, соединения которых записывают этап connect, когда трассировка включена"""
+    from urllib3.connection import HTTPConnection, HTTPSConnection
+    from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+    def traced_connect(connection_cls):
+        def connect(self):
+            if not tracer.enabled:
+                return connection_cls.connect(self)
+            with tracer.span("connect", host=self.host, port=self.port, tls=connection_cls is HTTPSConnection):
+                connection_cls.connect(self)
+            _connected_at.set(time.time())
+
+        return connect
+
+    class TracedHTTPConnection(HTTPConnection):
+        connect = traced_connect(HTTPConnection)
+
+    class TracedHTTPSConnection(HTTPSConnection):
+        connect = traced_connect(HTTPSConnection)
+
+    class TracedHTTPConnectionPool(HTTPConnectionPool):
+        ConnectionCls = TracedHTTPConnection
+
+    class TracedHTTPSConnectionPool(HTTPSConnectionPool):
+        ConnectionCls = TracedHTTPSConnection
+
+    return {"http": TracedHTTPConnectionPool, "https": TracedHTTPSConnectionPool}
+
+
+class Response(BaseResponse):
+    """Ленивая обертка над requests.Response
+
+    Атрибуты (status_code, headers, url, encoding, history, reason, cookies, elapsed, request, raw,
+    is_redirect, links, next, ok ...) читаются из requests.Response только при обращении к ним.
+    Определение кодировки (apparent_encoding) запускается только если его явно запросить.
+    """
+
+    __slots__ = ("_response", "_json_loads", "_span")
+
+    def __init__(
+        self, request_obj: "requests.Response", json_loads: JSONLoads = json.loads, span: Optional[Span] = None
+    ) -> None:
+        self._response = request_obj
+        self._json_loads = json_loads
+        self._span = span
+
+    @property
+    def status_code(self) -> int:
+        return self._response.status_code
+
+    @property
+    def content(self) -> bytes:
+        return self._response.content
+
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._response, name)
 
     def raise_for_status(self):
         """Raise an exception if the status code of the response is less than 400"""
@@ -86,22 +235,115 @@ class Response:
                 "Request Status Code: {code}".format(code=str(self.status_code)),
             )
 
-    def json(self, **kwargs):
-        return json.loads(self.text, **kwargs)
 
-    def as_object(self):
-        return dict2object(self.json())
+class _RejectCookiesPolicy(DefaultCookiePolicy):
+    """Политика, запрещающая сохранять куки в общей сессии: куки каждого аккаунта хранятся в его Request"""
+
+    def set_ok(self, cookie, request):
+        return False
+
+
+class Transport:
+    """
+    Общий пул соединений к одному хосту Платонуса. Один транспорт могут делить тысячи Request (аккаунтов):
+    в нем нет ни токенов, ни кук, только keep-alive соединения.
+    Args:
+        base_url: корневой адресс сайта
+        max_retries: количество попыток после неудачного соединения. Повтор запроса после таймаута чтения
+                     решает RetryPolicy, а не пул соединений
+        pool_maxsize: максимальное количество соединений к хосту
+        pool_block: если True, при исчерпании пула запрос ждет свободное соединение, а не открывает лишнее
+        cassette: кассета для записи и воспроизведения ответов без сети, см. utils/cassette.py
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        max_retries: int = 3,
+        pool_maxsize: int = 100,
+        pool_block: bool = False,
+        cassette: Optional["Cassette"] = None,
+    ):
+        import requests
+        from requests.adapters import HTTPAdapter
+        from requests.cookies import RequestsCookieJar
+        from urllib3.util.retry import Retry
+
+        self.base_url = base_url
+        self.pool_maxsize = pool_maxsize
+
+        self.adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=pool_maxsize,
+            # Пул повторяет только установку соединения: таймаут чтения должен дойти до нас как TimedOut,
+            # а не как исчерпанные повторы (NetworkError), а повтор ответов 503 с Retry-After решает RetryPolicy
+            max_retries=Retry(total=max_retries, read=False, respect_retry_after_header=False),
+            pool_block=pool_block,
+        )
+
+        self.session = requests.Session()
+        self.session.headers.update(HEADER)
+        self.session.cookies = RequestsCookieJar(policy=_RejectCookiesPolicy())
+        self.session.mount(base_url, self.adapter)
+        # Соединения пула записывают этап connect, см. utils/tracing.py
+        self.adapter.poolmanager.pool_classes_by_scheme = _traced_pool_classes()
+
+        self.cassette = cassette
+        if cassette is not None:
+            from .cassette import cassette_adapter
+
+            # Ответы берутся из кассеты, а в сеть (если режим кассеты разрешает) запросы идут через тот же пул
+            self.session.mount(base_url, cassette_adapter(cassette, self.adapter))
+
+        # Одинаковые одновременные запросы всех аккаунтов транспорта отправляются один раз
+        self.single_flight = SingleFlight()
+
+    def sockets(self) -> dict[str, dict[str, int]]:
+        """Возвращает количество открытых, свободных и занятых соединений по каждому хосту"""
+        sockets = {}
+        for key in list(self.adapter.poolmanager.pools.keys()):
+            pool = self.adapter.poolmanager.pools.get(key)
+            if pool is None:
+                continue
+            # В очереди пула лежат свободные соединения и пустые слоты (None), занятые соединения из очереди изъяты
+            idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+            in_use = pool.pool.maxsize - pool.pool.qsize()
+            sockets[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+                "open": idle + in_use,
+                "idle": idle,
+                "in_use": in_use,
+                "created": pool.num_connections,
+                "maxsize": self.pool_maxsize,
+            }
+        return sockets
+
+    def close(self):
+        self.session.close()
 
 
 class Request:
     """
     Вспомогательный класс, для работы с POST и GET запросами.
+    Хранит только состояние аккаунта (хэйдеры с токеном и куки), соединения берутся из Transport.
     Args:
         base_url: корневой адресс сайта
         proxy_dict: словарь прокси серверов
         timeout: устанавливает таймаут на запросы
         request_retries: количество попыток после неудачного соединения
         ssl_verify: позволяет верифицировать SSL-сертификаты
+        transport: общий пул соединений. Если не передан, создается собственный
+        json_backend: библиотека для декодирования JSON ответов, см. utils/json_backend.py
+        validators: хранилище ETag/Last-Modified для условных GET запросов, по умолчанию собственное
+        conditional_requests: отправлять ли условные GET запросы (If-None-Match, If-Modified-Since). Выключено по умолчанию:
+                              тела ответов хранятся в памяти каждого аккаунта, см. ValidatorStore
+        single_flight: объединять одинаковые одновременные запросы (метод, адрес, тело, токен) в один, см. SingleFlight.
+                       Объединяются только GET запросы и запросы, помеченные idempotent=True
+        retry_policy: повтор идемпотентных запросов, см. RetryPolicy. По умолчанию два повтора GET запросов
+        circuit_breaker: предохранитель хоста, см. CircuitBreaker. По умолчанию общий для всех клиентов хоста
+        rate_limiter: ограничитель запросов в секунду и одновременных запросов, см. RateLimiter.
+                      По умолчанию общий для всех клиентов хоста
+        cassette: кассета для работы без сети, см. utils/cassette.py. Подключается к собственному транспорту,
+                  общему транспорту кассету передают при его создании
     """
 
     def __init__(
@@ -111,61 +353,152 @@ class Request:
         timeout: float = 10.0,
         max_retries: int = 3,
         ssl_verify: bool = False,
+        transport: Optional[Transport] = None,
+        json_backend: JSONBackend = "auto",
+        validators: Optional[ValidatorStore] = None,
+        conditional_requests: bool = False,
+        single_flight: bool = True,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        cassette: Optional["Cassette"] = None,
     ):
+        if transport is not None and cassette is not None:
+            raise ValueError("Кассета подключается к транспорту: передайте ее в Transport(..., cassette=...)")
+
         self.base_url = base_url
         self.proxies = proxy_dict
         self.timeout = timeout
         self.verify = ssl_verify
 
-        adapter = HTTPAdapter(
-            pool_connections=100, pool_maxsize=100, max_retries=max_retries
-        )
+        self.transport = transport or Transport(base_url, max_retries=max_retries, cassette=cassette)
+        self.session = self.transport.session
 
-        self.session = requests.Session()
-        self.session.headers.update(HEADER)
-        self.session.mount(base_url, adapter)
+        from requests.cookies import RequestsCookieJar
 
-    def request(self, method, url, data, *args, **kwargs) -> Response:
-        try:
-            response = self.session.request(
+        self.headers: dict[str, str] = {}
+        self.cookies = RequestsCookieJar()
+
+        self.json_loads = get_json_loads(json_backend)
+        self.validators = (validators or ValidatorStore()) if conditional_requests else None
+        self.single_flight = single_flight
+        self.retry_policy = retry_policy or DEFAULT_RETRY_POLICY
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker(base_url)
+        self.rate_limiter = rate_limiter or get_rate_limiter(base_url)
+
+    def request(self, method, url, data, *args, idempotent: Optional[bool] = None, **kwargs) -> Response:
+        if not tracer.enabled:
+            return self._request(None, method, url, data, *args, idempotent=idempotent, **kwargs)
+        with tracer.span(f"{method} {endpoint_name(url)}", method=method, url=url) as span:
+            return self._request(span, method, url, data, *args, idempotent=idempotent, **kwargs)
+
+    def _request(self, span: Optional[Span], method, url, data, *args, idempotent: Optional[bool] = None, **kwargs) -> Response:
+        import requests
+
+        kwargs.setdefault("timeout", self.timeout)
+
+        headers = self.headers
+        validators_key = None
+        if self.validators is not None and method == "GET" and data is None:
+            validators_key = self.validators.key(url, kwargs.get("params"))
+            headers = {**headers, **self.validators.conditional_headers(validators_key)}
+
+        if hooks.active:
+            hooks.emit("before_request", method=method, url=url, endpoint=endpoint_name(url), headers=dict(headers))
+
+        def http_request():
+            return self.session.request(
                 method,
                 url=f"{self.base_url}{url}",
                 json=data,
-                timeout=self.timeout,
+                headers=headers,
+                cookies=self.cookies,
                 proxies=self.proxies,
                 verify=self.verify,
                 *args,
                 **kwargs,
             )
+
+        # Отправлен ли полученный ответ этим клиентом, а не другим, с которым запрос объединен
+        own_response = True
+
+        def send_request():
+            nonlocal own_response
+            own_response = True
+            queued_at = time.time()
+            # Лимит расходуют только реально отправленные запросы, объединенные с чужими его не тратят
+            with self.rate_limiter.acquire():
+                if span is None:
+                    return http_request()
+                return _traced_attempt(http_request, queued_at)
+
+        flight_key = None
+        # Объединяются только идемпотентные запросы, запросы с файлами и прочими нестандартными аргументами - нет
+        if self.single_flight and coalescable(method, idempotent) and not args and kwargs.keys() <= {"params", "timeout"}:
+            flight_key = request_key(method, url, data, kwargs.get("params"), headers, self.cookies.get_dict())
+
+        def send():
+            nonlocal own_response
+            if flight_key is None:
+                return send_request()
+            own_response = False
+            return self.transport.single_flight.do(flight_key, send_request, _copy_response)
+
+        # Метрики и обработчики выключены - не тратим время даже на замер
+        started = time.perf_counter() if metrics.enabled or hooks.active else None
+
+        try:
+            response = self.retry_policy.call(
+                send,
+                self.circuit_breaker,
+                self.retry_policy.is_retryable(method, idempotent),
+                failures=(requests.RequestException,),
+                on_retry=retry_callback(method, url, span),
+            )
             response.encoding = "utf-8"
-        except requests.Timeout:
+        except requests.Timeout as e:
+            observe_error(url, method, e, started)
             raise exceptions.TimedOut()
         except (requests.RequestException, requests.exceptions.ConnectionError) as e:
+            observe_error(url, method, e, started)
             raise exceptions.NetworkError(e)
+        except exceptions.CircuitOpen as e:
+            observe_error(url, method, e, started)
+            raise
         else:
             logger.debug(
                 f"URL: {self.base_url}{url}, status code: {response.status_code}, {method} request"
             )
+            if started is not None:
+                observe_response(url, method, response.status_code, started, len(response.content))
+            if span is not None:
+                span.set(status_code=response.status_code)
+
+            # Куки чужого ответа (например новый JSESSIONID) принадлежат сессии другого клиента
+            if own_response:
+                for history_response in response.history:
+                    self.cookies.update(history_response.cookies)
+                self.cookies.update(response.cookies)
+
+            if validators_key is not None:
+                if response.status_code == 304:
+                    content = self.validators.not_modified_content(validators_key)
+                    if content is None:
+                        # Тело уже вытеснено из хранилища: забываем валидаторы и повторяем запрос без условий
+                        self.validators.discard(validators_key)
+                        return self._request(span, method, url, data, *args, idempotent=idempotent, **kwargs)
+                    # Тело не изменилось - отдаем сохраненное, как будто пришел обычный ответ
+                    response.status_code = 200
+                    response._content = content
+                elif response.status_code == 200:
+                    self.validators.store(validators_key, response.headers, response.content)
 
             self.raise_by_status_code(response.status_code)
 
-            return Response(response)
+            return Response(response, self.json_loads, span)
 
     def raise_by_status_code(self, status_code):
-        # Ported from Android
-        if status_code == 401:
-            raise exceptions.LoginSessionExpired(
-                "Сессия истекла, возобновите сессию с помощью метода login"
-            )
-        elif status_code == 404:
-            raise exceptions.ServerError(
-                f"Серверная ошибка, попробуйте чуть позже, код ошибки: {status_code}"
-            )
-        elif status_code >= 402:
-            if status_code <= 500:
-                raise exceptions.ServerError(
-                    f"Серверная ошибка, попробуйте чуть позже, код ошибки: {status_code}"
-                )
+        raise_by_status_code(status_code)
 
     def post(self, url, data=None, *args, **kwargs) -> Response:
         logger.debug(f"URL: {url}, POST request")
@@ -179,18 +512,18 @@ class Request:
 
     @property
     def header(self):
-        return self.session.header
+        return self.headers
 
     @header.setter
     def header(self, header_value):
         for key, value in header_value.items():
             if value is None:
-                self.session.headers.pop(key)
+                self.headers.pop(key, None)
             else:
-                self.session.headers.update(header_value)
+                self.headers[key] = str(value)
 
     def __dell__(self):
         self.session.close()
 
 
-__all__ = ["Request"]
+__all__ = ["Request", "Transport"]
@@ -0,0 +1,308 @@
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable, Iterable, Literal, Mapping, Optional
+
+from . import exceptions
+from .metrics import metrics
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+# Номер повтора, задержка, код ответа или исключение, из-за которых запрос повторяется
+RetryCallback = Callable[[int, float, Optional[int], Optional[BaseException]], None]
+
+# Статусы перегруженного Платонуса: их имеет смысл повторить позже
+OVERLOAD_STATUSES = (429, 502, 503, 504)
+
+
+class RetryPolicy:
+    """
+    Повтор идемпотентных запросов с экспоненциальной задержкой и случайным разбросом (full jitter).
+
+    Повторяются таймауты, сетевые ошибки и ответы с retry_statuses. По умолчанию идемпотентными считаются только
+    GET запросы, запросы других методов повторяются, если их явно пометить: session.post(..., idempotent=True).
+    Args:
+        retries: сколько раз повторить запрос, 0 - не повторять
+        base_delay: задержка перед первым повтором в секундах, дальше удваивается
+        max_delay: максимальная задержка, в том числе из заголовка Retry-After
+        retry_statuses: статусы ответа, после которых запрос повторяется
+        idempotent_methods: методы, запросы которых повторяются без пометки
+    """
+
+    def __init__(
+        self,
+        retries: int = 2,
+        base_delay: float = 0.5,
+        max_delay: float = 10.0,
+        retry_statuses: Iterable[int] = OVERLOAD_STATUSES,
+        idempotent_methods: Iterable[str] = ("GET",),
+    ):
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = frozenset(retry_statuses)
+        self.idempotent_methods = frozenset(idempotent_methods)
+
+    def is_retryable(self, method: str, idempotent: Optional[bool] = None) -> bool:
+        if self.retries <= 0:
+            return False
+        return method in self.idempotent_methods if idempotent is None else idempotent
+
+    def delay(self, attempt: int, headers: Optional[Mapping[str, str]] = None) -> float:
+        """Задержка перед повтором номер attempt (с нуля). Retry-After ответа имеет приоритет"""
+        retry_after = headers.get("Retry-After") if headers is not None else None
+        if retry_after is not None:
+            try:
+                return min(self.max_delay, max(0.0, float(retry_after)))
+            except ValueError:
+                # Retry-After в виде даты не поддерживается, считаем задержку сами
+                pass
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+    def _retry_again(self, breaker: "CircuitBreaker", retryable: bool, attempt: int) -> bool:
+        if not retryable:
+            return False
+        if attempt >= self.retries:
+            breaker.count_retry(exhausted=True)
+            return False
+        breaker.count_retry()
+        return True
+
+    def call(
+        self,
+        send: Callable[[], Any],
+        breaker: "CircuitBreaker",
+        retryable: bool,
+        failures: tuple[type[BaseException], ...],
+        on_retry: Optional[RetryCallback] = None,
+    ) -> Any:
+        """
+        Выполняет запрос send через предохранитель хоста, повторяя его по политике
+        Args:
+            retryable: можно ли повторять запрос, см. is_retryable
+            failures: исключения HTTP библиотеки, которые считаются неудачей хоста (таймауты, сетевые ошибки)
+            on_retry: вызывается перед каждым повтором с номером повтора (с единицы), задержкой,
+                      кодом ответа или исключением, из-за которых запрос повторяется
+        Returns:
+            ответ HTTP библиотеки, в том числе со статусом ошибки, если повторы закончились
+        """
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                response = send()
+            except failures as error:
+                breaker.record_failure()
+                if not self._retry_again(breaker, retryable, attempt):
+                    raise
+                delay = self.delay(attempt)
+                if on_retry is not None:
+                    on_retry(attempt + 1, delay, None, error)
+            except BaseException:
+                breaker.record_aborted()
+                raise
+            else:
+                breaker.record_status(response.status_code)
+                if response.status_code not in self.retry_statuses or not self._retry_again(breaker, retryable, attempt):
+                    return response
+                delay = self.delay(attempt, response.headers)
+                if on_retry is not None:
+                    on_retry(attempt + 1, delay, response.status_code, None)
+
+            time.sleep(delay)
+            attempt += 1
+
+    async def acall(
+        self,
+        send: Callable[[], Awaitable[Any]],
+        breaker: "CircuitBreaker",
+        retryable: bool,
+        failures: tuple[type[BaseException], ...],
+        on_retry: Optional[RetryCallback] = None,
+    ) -> Any:
+        """Асинхронный аналог call"""
+        import asyncio
+
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                response = await send()
+            except failures as error:
+                breaker.record_failure()
+                if not self._retry_again(breaker, retryable, attempt):
+                    raise
+                delay = self.delay(attempt)
+                if on_retry is not None:
+                    on_retry(attempt + 1, delay, None, error)
+            except BaseException:
+                breaker.record_aborted()
+                raise
+            else:
+                breaker.record_status(response.status_code)
+                if response.status_code not in self.retry_statuses or not self._retry_again(breaker, retryable, attempt):
+                    return response
+                delay = self.delay(attempt, response.headers)
+                if on_retry is not None:
+                    on_retry(attempt + 1, delay, response.status_code, None)
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+
+# Политика по умолчанию одна на все клиенты: она не хранит состояния
+DEFAULT_RETRY_POLICY = RetryPolicy()
+
+
+class CircuitBreaker:
+    """
+    Предохранитель одного хоста Платонуса: после failure_threshold неудач подряд (таймауты, сетевые ошибки,
+    статусы перегрузки) запросы к хосту сразу получают CircuitOpen, не нагружая его еще больше.
+    Через recovery_timeout секунд пропускается пробный запрос (half-open): если он успешен, предохранитель
+    замыкается, иначе снова размыкается.
+
+    Предохранитель общий для всех клиентов одного хоста в процессе, см. get_circuit_breaker.
+    Там же считаются повторы запросов к хосту. Переключения, отклоненные запросы и повторы попадают и в metrics.
+    Args:
+        failure_threshold: сколько неудач подряд размыкают предохранитель, None - никогда не размыкать (только метрики)
+        recovery_timeout: сколько секунд предохранитель разомкнут до пробного запроса
+        half_open_max_calls: сколько пробных запросов выполняется одновременно
+        failure_statuses: статусы ответа, которые считаются неудачей хоста
+        host: имя хоста в metrics, get_circuit_breaker передает адрес Платонуса
+    """
+
+    def __init__(
+        self,
+        failure_threshold: Optional[int] = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        failure_statuses: Iterable[int] = OVERLOAD_STATUSES,
+        host: str = "custom",
+    ):
+        self.host = host
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.failure_statuses = frozenset(failure_statuses)
+
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._opened_at = 0.0
+        self._probes = 0
+
+        self.failures = 0
+        self.opened = 0
+        self.rejected = 0
+        self.retries = 0
+        self.retries_exhausted = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def _event(self, event: str):
+        if metrics.enabled:
+            metrics.count_circuit(self.host, event, self._state)
+
+    def _update_state(self):
+        if self._state == "open" and time.monotonic() - self._opened_at >= self.recovery_timeout:
+            self._state = "half_open"
+            self._probes = 0
+            self._event("half_open")
+
+    def _open(self):
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self.opened += 1
+        self._event("opened")
+
+    def before_request(self):
+        """Вызывается перед запросом. Raises: CircuitOpen, если хост сейчас не принимает запросы"""
+        with self._lock:
+            self._update_state()
+            if self._state == "closed":
+                return
+            if self._state == "half_open" and self._probes < self.half_open_max_calls:
+                self._probes += 1
+                return
+            self.rejected += 1
+            self._event("rejected")
+            retry_in = max(0.0, self.recovery_timeout - (time.monotonic() - self._opened_at))
+
+        raise exceptions.CircuitOpen(
+            f"Платонус не отвечает, запросы приостановлены, следующая попытка через {retry_in:.0f} с"
+        )
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._probes = 0
+            if self._state != "closed":
+                self._state = "closed"
+                self._event("closed")
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.failure_threshold is None:
+                return
+            if self._state == "half_open" or (self._state == "closed" and self.failures >= self.failure_threshold):
+                self._probes = 0
+                self._open()
+
+    def record_status(self, status_code: int):
+        if status_code in self.failure_statuses:
+            self.record_failure()
+        else:
+            self.record_success()
+
+    def count_retry(self, exhausted: bool = False):
+        with self._lock:
+            if exhausted:
+                self.retries_exhausted += 1
+            else:
+                self.retries += 1
+        if metrics.enabled:
+            metrics.count_retry(self.host, "exhausted" if exhausted else "retried")
+
+    def record_aborted(self):
+        """Запрос прерван не по вине хоста (например отменен) - освобождает место пробного запроса"""
+        with self._lock:
+            if self._state == "half_open" and self._probes:
+                self._probes -= 1
+
+    def stats(self) -> dict[str, Any]:
+        """
+        Returns:
+            state: closed - запросы идут, open - запросы отклоняются, half_open - идут пробные запросы
+            failures: неудач подряд
+            opened: сколько раз предохранитель размыкался
+            rejected: сколько запросов отклонено без обращения к хосту
+            retries: сколько раз запросы к хосту повторялись
+            retries_exhausted: сколько запросов завершились ошибкой после всех повторов
+        """
+        with self._lock:
+            self._update_state()
+            return {
+                "state": self._state,
+                "failures": self.failures,
+                "opened": self.opened,
+                "rejected": self.rejected,
+                "retries": self.retries,
+                "retries_exhausted": self.retries_exhausted,
+            }
+
+
+_breakers: dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_circuit_breaker(platonus_url: str, **kwargs) -> CircuitBreaker:
+    """Возвращает общий для всего процесса предохранитель хоста. Аргументы CircuitBreaker учитываются при создании"""
+    with _breakers_lock:
+        breaker = _breakers.get(platonus_url)
+        if breaker is None:
+            breaker = _breakers[platonus_url] = CircuitBreaker(**{"host": platonus_url, **kwargs})
+        return breaker
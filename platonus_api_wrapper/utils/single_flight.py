@@ -0,0 +1,170 @@
+import copy
+import json
+import threading
+from typing import Any, Awaitable, Callable, Hashable, Mapping, Optional
+
+
+def request_key(
+    method: str,
+    url: str,
+    data: Any,
+    params: Optional[Mapping],
+    headers: Mapping[str, str],
+    cookies: Optional[Mapping[str, str]] = None,
+) -> Optional[Hashable]:
+    """Ключ одинаковых запросов: метод, адрес, тело, заголовки и куки (токен, язык и сессия сервлета -
+    это и есть область аккаунта)
+
+    Возвращает None, если тело нельзя однозначно сериализовать - такой запрос не объединяется с другими.
+    """
+    try:
+        payload = None if data is None else json.dumps(data, sort_keys=True, default=str)
+    except (TypeError, ValueError):
+        return None
+
+    return (
+        method,
+        url,
+        payload,
+        tuple(sorted((str(name), str(value)) for name, value in (params or {}).items())),
+        tuple(sorted(headers.items())),
+        tuple(sorted((cookies or {}).items())),
+    )
+
+
+def coalescable(method: str, idempotent: Optional[bool] = None) -> bool:
+    """Можно ли объединять запрос с одинаковыми: только GET и запросы, явно помеченные идемпотентными"""
+    return method == "GET" if idempotent is None else idempotent
+
+
+def _fresh_error(error: BaseException) -> BaseException:
+    """Копия исключения для ожидающего вызова: общий объект исключения накапливал бы трассировки всех вызовов"""
+    try:
+        return copy.copy(error)
+    except Exception:
+        return error
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "waiters")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+class _BaseSingleFlight:
+    def __init__(self):
+        self._calls: dict[Hashable, Any] = {}
+        self.executed = 0
+        self.shared = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns:
+            in_flight: сколько запросов выполняется сейчас
+            executed: сколько запросов действительно отправлено
+            shared: сколько вызовов получили результат чужого запроса
+        """
+        return {"in_flight": len(self._calls), "executed": self.executed, "shared": self.shared}
+
+
+class SingleFlight(_BaseSingleFlight):
+    """
+    Объединяет одинаковые одновременные вызовы из разных потоков: выполняется только первый,
+    остальные ждут и получают его результат или копию его исключения.
+
+    Если результат изменяемый, передайте copy_result: тогда каждый вызов получит собственную копию результата,
+    а общий результат никто не изменит
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def do(self, key: Hashable, func: Callable[[], Any], copy_result: Optional[Callable[[Any], Any]] = None) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                call.waiters += 1
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise _fresh_error(call.error) from call.error
+            return call.result if copy_result is None else copy_result(call.result)
+
+        try:
+            call.result = func()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+
+        # Ожидающие копируют call.result, поэтому первый вызов тоже получает копию, а не общий объект
+        if call.waiters and copy_result is not None:
+            return copy_result(call.result)
+        return call.result
+
+
+class AsyncSingleFlight(_BaseSingleFlight):
+    """Асинхронный аналог SingleFlight для задач asyncio одного event loop"""
+
+    def __init__(self):
+        super().__init__()
+        # Сколько вызовов ждут каждый выполняющийся запрос
+        self._waiters: dict[Hashable, int] = {}
+
+    async def do(
+        self, key: Hashable, func: Callable[[], Awaitable[Any]], copy_result: Optional[Callable[[Any], Any]] = None
+    ) -> Any:
+        import asyncio
+
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+            self._waiters[key] = self._waiters.get(key, 0) + 1
+            try:
+                result = await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # Отменили первый вызов, а не нас - выполняем запрос сами
+                if future.cancelled():
+                    return await self.do(key, func, copy_result)
+                raise
+            except Exception as error:
+                raise _fresh_error(error) from error
+            return result if copy_result is None else copy_result(result)
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.executed += 1
+
+        try:
+            result = await func()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as error:
+            future.set_exception(error)
+            # Ошибку уже получил вызывающий код, ожидающих вызовов может и не быть
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            # Ожидающие копируют result, поэтому первый вызов тоже получает копию, а не общий объект
+            if self._waiters.get(key) and copy_result is not None:
+                return copy_result(result)
+            return result
+        finally:
+            del self._calls[key]
+            self._waiters.pop(key, None)
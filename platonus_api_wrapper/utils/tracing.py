@@ -0,0 +1,280 @@
+import inspect
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Iterable, Literal, Optional
+
+logger = logging.getLogger("platonus_api_wrapper")
+
+HookEvent = Literal["before_request", "after_response", "on_retry", "on_relogin", "on_cache_hit"]
+HOOK_EVENTS: tuple[HookEvent, ...] = ("before_request", "after_response", "on_retry", "on_relogin", "on_cache_hit")
+
+
+class Hooks:
+    """
+    Обработчики событий жизненного цикла запроса. Обработчик получает данные события именованными аргументами:
+
+        before_request(method, url, endpoint, headers) - перед запросом (один раз, без учета повторов)
+        after_response(method, url, endpoint, status_code, elapsed, size) - получен ответ хоста, elapsed в секундах
+        on_retry(method, url, endpoint, attempt, delay, status_code, error) - запрос будет повторен через delay секунд
+        on_relogin(outcome) - переавторизация: success, failure, backoff или joined, см. Metrics.count_relogin
+        on_cache_hit(name, key) - результат метода взят из кэша timed_lru_cache
+
+        @hooks.on("after_response")
+        def log_slow(method, endpoint, elapsed, **_):
+            ...
+
+    Ошибка в обработчике записывается в лог и не прерывает запрос.
+    Обработчики общие для всего процесса, без обработчиков события не формируются
+    """
+
+    def __init__(self):
+        # Кортежи заменяются целиком, поэтому emit читает их без блокировки
+        self._callbacks: dict[str, tuple[Callable[..., Any], ...]] = {event: () for event in HOOK_EVENTS}
+        self._lock = threading.Lock()
+        self.active = False
+
+    def add(self, event: HookEvent, callback: Callable[..., Any]) -> Callable[..., Any]:
+        if event not in self._callbacks:
+            raise ValueError(f"Unknown hook event {event!r}, expected one of {HOOK_EVENTS}")
+        with self._lock:
+            self._callbacks[event] += (callback,)
+            self.active = True
+        return callback
+
+    def on(self, event: HookEvent) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+        """Декоратор для add"""
+        return lambda callback: self.add(event, callback)
+
+    def remove(self, event: HookEvent, callback: Callable[..., Any]):
+        with self._lock:
+            self._callbacks[event] = tuple(cb for cb in self._callbacks[event] if cb is not callback)
+            self.active = any(self._callbacks.values())
+
+    def clear(self):
+        with self._lock:
+            self._callbacks = {event: () for event in HOOK_EVENTS}
+            self.active = False
+
+    def emit(self, event: HookEvent, **payload: Any):
+        for callback in self._callbacks[event]:
+            try:
+                callback(**payload)
+            except Exception:
+                logger.exception(f"Hook {event} {callback!r} failed")
+
+
+class Span:
+    """
+    Отрезок времени одного этапа: вызов метода API, запрос, попытка, соединение, ожидание первого байта,
+    чтение тела, декодирование JSON, конвертация в модель. Вложенные этапы ссылаются на родителя через parent_id,
+    все этапы одного вызова имеют общий trace_id. Время - time.time() в секундах
+    """
+
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "end", "attributes")
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: dict[str, Any], start: Optional[float] = None):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start = time.time() if start is None else start
+        self.end: Optional[float] = None
+        self.attributes = attributes
+
+    @property
+    def duration(self) -> Optional[float]:
+        return None if self.end is None else self.end - self.start
+
+    def set(self, **attributes: Any):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "end": self.end,
+            "duration": self.duration,
+            "attributes": dict(self.attributes),
+        }
+
+    def __repr__(self):
+        duration = "running" if self.end is None else f"{self.duration * 1e3:.1f} ms"
+        return f"<Span {self.name} {duration}>"
+
+
+# Текущий этап: дочерние этапы создаются внутри него. Потоки fanout наследуют его, см. iter_completed
+_current_span: ContextVar[Optional[Span]] = ContextVar("platonus_current_span", default=None)
+
+_CURRENT = object()
+
+_NOOP = nullcontext()
+
+
+class _SpanContext:
+    __slots__ = ("_tracer", "_span", "_token")
+
+    def __init__(self, tracer: "Tracer", span: Span):
+        self._tracer = tracer
+        self._span = span
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self._span.attributes.setdefault("error", exc_type.__name__)
+        self._span.end = time.time()
+        self._tracer.export(self._span)
+
+
+class Tracer:
+    """
+    Трассировка вызовов: этапы (Span) вкладываются друг в друга, так что составной вызов, например
+    student_journal_history, выглядит одним деревом со всеми своими запросами. Завершенные этапы
+    передаются экспортерам - функциям, принимающим Span, например SpanCollector.
+
+    По умолчанию трассировка выключена: tracer.span возвращает пустой контекстный менеджер
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self._exporters: tuple[Callable[[Span], Any], ...] = ()
+
+    def enable(self, *exporters: Callable[[Span], Any]):
+        """Включает трассировку и добавляет экспортеры"""
+        for exporter in exporters:
+            self.add_exporter(exporter)
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def add_exporter(self, exporter: Callable[[Span], Any]):
+        self._exporters += (exporter,)
+
+    def remove_exporter(self, exporter: Callable[[Span], Any]):
+        self._exporters = tuple(e for e in self._exporters if e is not exporter)
+
+    @staticmethod
+    def current_span() -> Optional[Span]:
+        return _current_span.get()
+
+    def span(self, name: str, parent: Any = _CURRENT, **attributes: Any):
+        """
+        Контекстный менеджер этапа: with tracer.span("journal") as span: ...
+        Args:
+            parent: родительский этап, по умолчанию текущий. None - начать новую трассу
+        """
+        if not self.enabled:
+            return _NOOP
+        if parent is _CURRENT:
+            parent = _current_span.get()
+        return _SpanContext(self, Span(name, parent, attributes))
+
+    def record(self, name: str, start: float, end: float, parent: Any = _CURRENT, **attributes: Any) -> Optional[Span]:
+        """Записывает уже завершившийся этап, время которого известно из другого источника (например httpcore)"""
+        if not self.enabled:
+            return None
+        if parent is _CURRENT:
+            parent = _current_span.get()
+        span = Span(name, parent, attributes, start)
+        span.end = end
+        self.export(span)
+        return span
+
+    def export(self, span: Span):
+        for exporter in self._exporters:
+            try:
+                exporter(span)
+            except Exception:
+                logger.exception(f"Span exporter {exporter!r} failed")
+
+
+class SpanCollector:
+    """
+    Экспортер, который хранит последние maxsize этапов в памяти и собирает их в деревья трасс
+
+        collector = SpanCollector()
+        tracer.enable(collector)
+        platonus.study_room.student_journal_history()
+        print(collector.format(collector.trace_ids()[-1]))
+    """
+
+    def __init__(self, maxsize: int = 10000):
+        self.spans: deque[Span] = deque(maxlen=maxsize)
+
+    def __call__(self, span: Span):
+        self.spans.append(span)
+
+    def clear(self):
+        self.spans.clear()
+
+    def trace_ids(self) -> list[str]:
+        """Трассы в порядке начала"""
+        starts: dict[str, float] = {}
+        for span in list(self.spans):
+            starts[span.trace_id] = min(span.start, starts.get(span.trace_id, span.start))
+        return sorted(starts, key=starts.get)
+
+    def trace(self, trace_id: str) -> list[dict[str, Any]]:
+        """Этапы трассы деревом: корневые этапы со вложенными children, в порядке начала"""
+        spans = sorted((span for span in list(self.spans) if span.trace_id == trace_id), key=lambda span: span.start)
+        nodes = {span.span_id: {**span.to_dict(), "children": []} for span in spans}
+        roots = []
+        for node in nodes.values():
+            parent = nodes.get(node["parent_id"])
+            (parent["children"] if parent is not None else roots).append(node)
+        return roots
+
+    def format(self, trace_id: str) -> str:
+        """Трасса в виде текстового дерева с длительностями этапов"""
+        lines: list[str] = []
+
+        def walk(nodes: Iterable[dict[str, Any]], depth: int):
+            for node in nodes:
+                attributes = " ".join(f"{key}={value}" for key, value in node["attributes"].items())
+                lines.append(f"{'  ' * depth}{node['name']} {node['duration'] * 1e3:.1f} ms {attributes}".rstrip())
+                walk(node["children"], depth + 1)
+
+        walk(self.trace(trace_id), 0)
+        return "\n".join(lines)
+
+
+def traced(method: Callable) -> Callable:
+    """Оборачивает метод API в этап трассировки с именем метода, например StudyRoom.student_journal_history"""
+    name = method.__qualname__
+
+    if inspect.iscoroutinefunction(method):
+        @wraps(method)
+        async def async_traced(*args, **kwargs):
+            if not tracer.enabled:
+                return await method(*args, **kwargs)
+            with tracer.span(name):
+                return await method(*args, **kwargs)
+
+        return async_traced
+
+    @wraps(method)
+    def traced_method(*args, **kwargs):
+        if not tracer.enabled:
+            return method(*args, **kwargs)
+        with tracer.span(name):
+            return method(*args, **kwargs)
+
+    return traced_method
+
+
+# Обработчики и трассировка общие для всего процесса, как и метрики
+hooks = Hooks()
+tracer = Tracer()
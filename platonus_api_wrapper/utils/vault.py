@@ -0,0 +1,435 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Iterable, Iterator, Mapping, NamedTuple, Optional, Union
+
+from .json_backend import get_json_loads
+from .request import HEADER
+
+if TYPE_CHECKING:
+    import requests
+
+# Заголовок файла: сигнатура, версия формата, количество записей, размер индекса,
+# смещение и длина сведений о хостах, смещение индекса
+_HEADER = struct.Struct("<4sHxxIIQQQ")
+_MAGIC = b"PLSV"
+_FORMAT_VERSION = 1
+
+# Ячейка индекса: хэш аккаунта, смещение и длина записи. Пустая ячейка - нулевой хэш
+_SLOT = struct.Struct("<QQI")
+
+# Аккаунт по умолчанию для export_session/import_session с одной сессией в файле
+DEFAULT_ACCOUNT = ""
+
+# Сохраненные авторизационные данные: сами данные либо функция, получающая их по ссылке credentials_ref
+Credentials = Union[Mapping[str, Any], Callable[[Optional[str]], Optional[Mapping[str, Any]]], None]
+
+
+class SessionRecord(NamedTuple):
+    """
+    Сохраненная сессия одного аккаунта
+    Args:
+        platonus_url: адрес Платонуса
+        token: авторизационный токен
+        cookies: куки аккаунта - (имя, значение, домен, путь)
+        credentials_ref: ссылка на авторизационные данные во внешнем хранилище (сами данные в хранилище не попадают)
+        lifetime: наблюдения за временем жизни сессии, см. SessionLifetime.snapshot
+        saved_at: когда сессия сохранена (time.time)
+    """
+
+    platonus_url: str
+    token: Optional[str]
+    cookies: tuple[tuple[str, str, str, str], ...]
+    credentials_ref: Optional[str]
+    lifetime: dict[str, Any]
+    saved_at: float
+
+
+def _account_hash(account: str) -> int:
+    digest = int.from_bytes(hashlib.blake2b(account.encode(), digest_size=8).digest(), "little")
+    # Нулевой хэш занят пустыми ячейками
+    return digest or 1
+
+
+def _table_size(count: int) -> int:
+    # Индекс заполнен не больше чем наполовину, чтобы цепочки проб оставались короткими
+    size = 8
+    while size < count * 2:
+        size *= 2
+    return size
+
+
+def capture_session(client, credentials_ref: Optional[str] = None) -> SessionRecord:
+    """Снимает состояние сессии клиента (PlatonusAPI или AsyncPlatonusAPI)"""
+    cookie_jar = getattr(client.session.cookies, "jar", client.session.cookies)
+    return SessionRecord(
+        platonus_url=client.host_info.platonus_url,
+        token=client.session.headers.get("token"),
+        cookies=tuple((cookie.name, cookie.value, cookie.domain, cookie.path) for cookie in cookie_jar),
+        credentials_ref=credentials_ref,
+        lifetime=client._session_lifetime.snapshot(),
+        saved_at=time.time(),
+    )
+
+
+def restore_session(client, record: SessionRecord, credentials: Credentials = None):
+    """
+    Восстанавливает сессию клиента из записи.
+
+    Без авторизационных данных клиент работает с сохраненным токеном, но не сможет переавторизоваться,
+    когда сессия истечет.
+    """
+    if callable(credentials):
+        credentials = credentials(record.credentials_ref)
+
+    client.session.header = {"token": record.token}
+    for name, value, domain, path in record.cookies:
+        client.session.cookies.set(name, value, domain=domain, path=path)
+    client._session_lifetime.restore(record.lifetime)
+    client._auth_credentials = dict(credentials or {})
+
+
+def to_requests_session(client) -> "requests.Session":
+    """
+    Сессия клиента в виде requests.Session с заголовками (токен, язык) и куками аккаунта, как ее отдавал session_data.
+    Клиенты одного транспорта делят соединения, поэтому это копия состояния аккаунта, а не сессия, через которую
+    клиент отправляет запросы
+    """
+    import requests
+
+    session = requests.Session()
+    session.headers.update({**HEADER, **client.session.headers})
+    cookie_jar = getattr(client.session.cookies, "jar", client.session.cookies)
+    for cookie in cookie_jar:
+        session.cookies.set(cookie.name, cookie.value, domain=cookie.domain, path=cookie.path)
+    return session
+
+
+def from_requests_session(client, session: "requests.Session"):
+    """Переносит в клиента токен и куки из requests.Session, полученной через to_requests_session"""
+    client.session.header = {"token": session.headers.get("token")}
+    for cookie in session.cookies:
+        client.session.cookies.set(cookie.name, cookie.value, domain=cookie.domain, path=cookie.path)
+
+
+class SessionVault:
+    """
+    Компактное хранилище сессий множества аккаунтов в одном файле, замена pickle файлов export_session.
+
+    В файле хранятся только токен, куки, ссылка на авторизационные данные и наблюдения за временем жизни сессии,
+    а сведения о Платонусе (версия, билд, тип авторизации) - один раз на хост. Записи - компактные JSON массивы,
+    поиск по аккаунту идет через хэш индекс в файле, за O(1), без чтения остальных записей.
+
+    Файл открывается через mmap только для чтения, так что его могут одновременно читать многие процессы,
+    деля страницы в кэше ОС. Изменения (put, capture, remove) копятся в памяти и записываются в save():
+    новый файл пишется целиком и атомарно подменяет старый, читатели видят его после reload().
+    Записывать файл должен один процесс.
+
+        with SessionVault("sessions.plsv") as vault:
+            vault.capture_many(clients)
+            vault.save()
+
+        with SessionVault("sessions.plsv") as vault:
+            vault.restore("student-42", platonus_session, credentials=secret_store.get)
+    Args:
+        path: путь к файлу хранилища, если его нет - он будет создан при save()
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+        self._lock = threading.RLock()
+        self._loads = get_json_loads("auto")
+
+        self._file = None
+        self._mm: Optional[mmap.mmap] = None
+        self._count = 0
+        self._table_size = 0
+        self._table_offset = 0
+        self._file_hosts: list[tuple[str, Optional[dict[str, Any]]]] = []
+
+        # Изменения, еще не записанные в файл
+        self._pending: dict[str, SessionRecord] = {}
+        self._removed: set[str] = set()
+        self._hosts: dict[str, Optional[dict[str, Any]]] = {}
+
+        self.reload()
+
+    def reload(self):
+        """Заново открывает файл, например после того как его сохранил другой процесс"""
+        with self._lock:
+            self._close_file()
+            if not os.path.exists(self.path):
+                return
+
+            self._file = open(self.path, "rb")
+            try:
+                self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                magic, version, count, table_size, hosts_offset, hosts_length, table_offset = _HEADER.unpack_from(self._mm)
+            except (ValueError, struct.error):
+                self._close_file()
+                raise ValueError(f"{self.path} is not a session vault")
+
+            if magic != _MAGIC:
+                self._close_file()
+                raise ValueError(f"{self.path} is not a session vault")
+            if version != _FORMAT_VERSION:
+                self._close_file()
+                raise ValueError(f"Unsupported session vault version {version}, expected {_FORMAT_VERSION}")
+
+            self._count = count
+            self._table_size = table_size
+            self._table_offset = table_offset
+            self._file_hosts = [tuple(host) for host in self._loads(self._mm[hosts_offset:hosts_offset + hosts_length])]
+
+    def _close_file(self):
+        if self._mm is not None:
+            self._mm.close()
+        if self._file is not None:
+            self._file.close()
+        self._file = self._mm = None
+        self._count = self._table_size = self._table_offset = 0
+        self._file_hosts = []
+
+    def _decode(self, offset: int, length: int) -> tuple[str, SessionRecord]:
+        account, host, token, cookies, credentials_ref, lifetime, saved_at = self._loads(self._mm[offset:offset + length])
+        record = SessionRecord(
+            self._file_hosts[host][0],
+            token,
+            tuple(tuple(cookie) for cookie in cookies),
+            credentials_ref,
+            lifetime,
+            saved_at,
+        )
+        return account, record
+
+    def _lookup(self, account: str) -> Optional[SessionRecord]:
+        if self._mm is None:
+            return None
+
+        account_hash = _account_hash(account)
+        mask = self._table_size - 1
+        slot = account_hash & mask
+        # Линейное пробирование: идем по ячейкам до пустой
+        for _ in range(self._table_size):
+            slot_hash, offset, length = _SLOT.unpack_from(self._mm, self._table_offset + slot * _SLOT.size)
+            if slot_hash == 0:
+                return None
+            if slot_hash == account_hash:
+                stored_account, record = self._decode(offset, length)
+                if stored_account == account:
+                    return record
+            slot = (slot + 1) & mask
+        return None
+
+    def _iter_file(self) -> Iterator[tuple[str, SessionRecord]]:
+        if self._mm is None:
+            return
+        for slot in range(self._table_size):
+            slot_hash, offset, length = _SLOT.unpack_from(self._mm, self._table_offset + slot * _SLOT.size)
+            if slot_hash:
+                yield self._decode(offset, length)
+
+    def get(self, account: str) -> Optional[SessionRecord]:
+        """Возвращает сохраненную сессию аккаунта, либо None"""
+        with self._lock:
+            if account in self._removed:
+                return None
+            record = self._pending.get(account)
+            if record is not None:
+                return record
+            return self._lookup(account)
+
+    def __contains__(self, account: str) -> bool:
+        return self.get(account) is not None
+
+    def get_many(self, accounts: Iterable[str]) -> dict[str, SessionRecord]:
+        """Возвращает сохраненные сессии нескольких аккаунтов, аккаунты без сессии пропускаются"""
+        records = {}
+        with self._lock:
+            for account in accounts:
+                record = self.get(account)
+                if record is not None:
+                    records[account] = record
+        return records
+
+    def items(self) -> list[tuple[str, SessionRecord]]:
+        """Все сессии хранилища с учетом еще не сохраненных изменений"""
+        with self._lock:
+            items = [
+                (account, record)
+                for account, record in self._iter_file()
+                if account not in self._pending and account not in self._removed
+            ]
+            items.extend(self._pending.items())
+            return items
+
+    def __iter__(self) -> Iterator[str]:
+        return (account for account, _ in self.items())
+
+    def __len__(self) -> int:
+        with self._lock:
+            added = sum(1 for account in self._pending if self._lookup(account) is None)
+            removed = sum(1 for account in self._removed if self._lookup(account) is not None)
+            return self._count + added - removed
+
+    def put(self, account: str, record: SessionRecord):
+        with self._lock:
+            self._removed.discard(account)
+            self._pending[account] = record
+
+    def put_many(self, records: Mapping[str, SessionRecord]):
+        with self._lock:
+            for account, record in records.items():
+                self.put(account, record)
+
+    def remove(self, account: str):
+        with self._lock:
+            self._pending.pop(account, None)
+            self._removed.add(account)
+
+    def host_metadata(self, platonus_url: str) -> Optional[dict[str, Any]]:
+        """Сохраненные сведения о Платонусе, см. HostInfo.snapshot"""
+        with self._lock:
+            if platonus_url in self._hosts:
+                return self._hosts[platonus_url]
+            return dict(self._file_hosts).get(platonus_url)
+
+    def capture(self, account: str, client, credentials_ref: Optional[str] = None) -> SessionRecord:
+        """Сохраняет сессию клиента и сведения о его Платонусе"""
+        record = capture_session(client, credentials_ref)
+        with self._lock:
+            self.put(account, record)
+            if client.host_info.version is not None:
+                self._hosts[record.platonus_url] = client.host_info.snapshot()
+        return record
+
+    def capture_many(self, clients: Mapping[str, Any], credentials_refs: Optional[Mapping[str, str]] = None):
+        """Сохраняет сессии нескольких клиентов: {аккаунт: клиент}"""
+        credentials_refs = credentials_refs or {}
+        for account, client in clients.items():
+            self.capture(account, client, credentials_refs.get(account))
+
+    def restore(self, account: str, client, credentials: Credentials = None) -> bool:
+        """
+        Восстанавливает сессию аккаунта в клиенте, а также сведения о Платонусе, если у клиента их еще нет
+        Args:
+            credentials: авторизационные данные для переавторизации, либо функция, получающая их по credentials_ref
+        Returns:
+            False, если сессии аккаунта в хранилище нет
+        """
+        record = self.get(account)
+        if record is None:
+            return False
+
+        if record.platonus_url != client.host_info.platonus_url:
+            raise ValueError(
+                f"Session of {account!r} belongs to {record.platonus_url}, not to {client.host_info.platonus_url}"
+            )
+
+        host_metadata = self.host_metadata(record.platonus_url)
+        if host_metadata is not None:
+            client.host_info.restore(host_metadata)
+
+        restore_session(client, record, credentials)
+        return True
+
+    def restore_many(self, clients: Mapping[str, Any], credentials: Credentials = None) -> list[str]:
+        """Восстанавливает сессии нескольких клиентов: {аккаунт: клиент}. Возвращает восстановленные аккаунты"""
+        return [account for account, client in clients.items() if self.restore(account, client, credentials)]
+
+    def save(self):
+        """Записывает хранилище с изменениями в новый файл и атомарно подменяет им старый"""
+        with self._lock:
+            records = dict(self.items())
+
+            hosts = dict(self._file_hosts)
+            hosts.update(self._hosts)
+            host_urls = sorted({record.platonus_url for record in records.values()})
+            host_index = {url: index for index, url in enumerate(host_urls)}
+            hosts_blob = json.dumps(
+                [[url, hosts.get(url)] for url in host_urls], ensure_ascii=False, separators=(",", ":")
+            ).encode()
+
+            table_size = _table_size(len(records))
+            table = bytearray(table_size * _SLOT.size)
+            mask = table_size - 1
+
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(b"\0" * _HEADER.size)
+                hosts_offset = f.tell()
+                f.write(hosts_blob)
+
+                for account, record in records.items():
+                    blob = json.dumps(
+                        [
+                            account,
+                            host_index[record.platonus_url],
+                            record.token,
+                            record.cookies,
+                            record.credentials_ref,
+                            record.lifetime,
+                            record.saved_at,
+                        ],
+                        ensure_ascii=False,
+                        separators=(",", ":"),
+                    ).encode()
+                    offset = f.tell()
+                    f.write(blob)
+
+                    account_hash = _account_hash(account)
+                    slot = account_hash & mask
+                    while _SLOT.unpack_from(table, slot * _SLOT.size)[0]:
+                        slot = (slot + 1) & mask
+                    _SLOT.pack_into(table, slot * _SLOT.size, account_hash, offset, len(blob))
+
+                table_offset = f.tell()
+                f.write(table)
+
+                f.seek(0)
+                f.write(
+                    _HEADER.pack(
+                        _MAGIC, _FORMAT_VERSION, len(records), table_size, hosts_offset, len(hosts_blob), table_offset
+                    )
+                )
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Старое отображение закрываем до подмены: на Windows открытый файл нельзя заменить
+            self._close_file()
+            os.replace(tmp_path, self.path)
+
+            self._pending.clear()
+            self._removed.clear()
+            self._hosts.clear()
+            self.reload()
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns:
+            accounts: сколько аккаунтов в файле
+            pending: сколько изменений еще не сохранено
+            file_size: размер файла в байтах
+        """
+        with self._lock:
+            return {
+                "accounts": self._count,
+                "pending": len(self._pending) + len(self._removed),
+                "file_size": len(self._mm) if self._mm is not None else 0,
+            }
+
+    def close(self):
+        """Закрывает файл. Несохраненные изменения теряются"""
+        with self._lock:
+            self._close_file()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
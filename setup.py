@@ -1,4 +1,4 @@
-from setuptools import setup
+from setuptools import find_packages, setup
 from os.path import join, dirname
 import sys
 
@@ -13,5 +13,6 @@ setup(
     url='https://github.com/ZhymabekRoman/platonus-api-wrapper',
     setup_requires=['wheel'],
     install_requires=['requests'],
-    packages=['platonus_api_wrapper'],
+    extras_require={'async': ['httpx'], 'fast_json': ['orjson']},
+    packages=find_packages(include=['platonus_api_wrapper*']),
 )
@@ -0,0 +1,58 @@
+"""Общие фикстуры: тесты идут против локального Платонуса из benchmarks/platonus_stub.py, без сети"""
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+
+from platonus_stub import PlatonusStub, start  # noqa: E402
+
+from platonus_api_wrapper.utils.metrics import metrics  # noqa: E402
+from platonus_api_wrapper.utils.rate_limit import get_rate_limiter  # noqa: E402
+from platonus_api_wrapper.utils.tracing import hooks, tracer  # noqa: E402
+from platonus_api_wrapper.validators import URLNormalizer  # noqa: E402
+
+
+@pytest.fixture
+def make_stub():
+    """Запускает PlatonusStub с заданными аргументами. Returns: (stub, url)"""
+    started = []
+
+    def factory(**kwargs):
+        stub, url = start(PlatonusStub(**kwargs))
+        # Ограничитель общий для хоста и по умолчанию пропускает 20 запросов в секунду - тестам он только мешает
+        get_rate_limiter(URLNormalizer(url, "/"), rate=None, max_in_flight=None)
+        started.append(stub)
+        return stub, url
+
+    yield factory
+    for stub in started:
+        stub.shutdown()
+
+
+@pytest.fixture
+def stub_url(make_stub):
+    return make_stub()
+
+
+@pytest.fixture
+def stub(stub_url):
+    return stub_url[0]
+
+
+@pytest.fixture
+def url(stub_url):
+    return stub_url[1]
+
+
+@pytest.fixture(autouse=True)
+def reset_observability():
+    """Метрики, обработчики и трассировка общие для процесса: тест не должен влиять на следующие"""
+    yield
+    metrics.disable()
+    metrics.reset()
+    hooks.clear()
+    tracer.disable()
+    for exporter in tracer._exporters:
+        tracer.remove_exporter(exporter)
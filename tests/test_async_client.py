@@ -0,0 +1,55 @@
+import asyncio
+
+from platonus_api_wrapper import AsyncPlatonusAPI
+
+
+def test_context_manager(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            return await platonus.profile.profile_info(), await platonus.server_time()
+
+    profile, server_time = asyncio.run(main())
+    assert profile.lastName
+    assert 0 <= server_time.hour < 24
+
+
+def test_without_context_manager(stub, url):
+    async def main():
+        platonus = AsyncPlatonusAPI(url, "ru")
+        try:
+            await platonus.login(login="student1", password="secret")
+            return await platonus.study_years_list(), await platonus.profile.person_fio()
+        finally:
+            await platonus.close()
+
+    years, fio = asyncio.run(main())
+    assert [year.year for year in years] == list(stub.years)
+    assert fio
+
+
+def test_imported_session_before_discovery(stub, url, tmp_path):
+    session_file = str(tmp_path / "sessions.plsv")
+
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            platonus.export_session(session_file)
+
+        platonus = AsyncPlatonusAPI(url, "ru")
+        try:
+            assert platonus.import_session(session_file)
+            # Сведения о хосте забыты: версию (нужна для адреса ФИО) клиент должен запросить сам
+            platonus.host_info.invalidate()
+            return (
+                await platonus.profile.profile_info(),
+                await platonus.study_years_list(),
+                await platonus.profile.person_fio(),
+            )
+        finally:
+            await platonus.close()
+
+    profile, years, fio = asyncio.run(main())
+    assert profile.fio == fio
+    assert len(years) == len(stub.years)
+    assert stub.stats()["requests"]["version"] == 2
@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI
+from platonus_api_wrapper.base.has_module import MODULES, capability_report
+from platonus_api_wrapper.base.has_module_license import LICENSE_MODULES
+
+
+def login(url, account):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login=account, password="secret")
+    return platonus
+
+
+def test_capabilities(stub, url):
+    platonus = login(url, "student1")
+    capabilities = platonus.capabilities(modules=["custom_module"])
+
+    assert set(capabilities["modules"]) == {*MODULES.values(), "custom_module"}
+    assert set(capabilities["licenses"]) == set(LICENSE_MODULES.values())
+    assert all(capabilities["modules"].values()) and all(capabilities["licenses"].values())
+    assert platonus.has_module.journal().hasModule is True
+
+    requests = stub.stats()["requests"]
+    assert requests["has_module"] == len(MODULES) + 1
+    assert requests["has_module_license"] == len(LICENSE_MODULES)
+
+
+def test_capability_report_splits_sections():
+    calls = {("modules", "journal"): None, ("modules", "messages"): None, ("licenses", "profile"): None}
+    results = {("modules", "journal"): {"hasModule": True}, ("licenses", "profile"): {"hasLicense": False}}
+    errors = {("modules", "messages"): TimeoutError()}
+    assert capability_report(calls, results, errors) == {
+        "modules": {"journal": True, "messages": None},
+        "licenses": {"profile": False},
+    }
+
+
+def test_licenses_are_shared_by_host(stub, url):
+    login(url, "student1").capabilities()
+    second = login(url, "student2")
+    second.capabilities()
+
+    requests = stub.stats()["requests"]
+    # Модули проверяются для каждого аккаунта, лицензии - один раз на Платонус
+    assert requests["has_module"] == 2 * len(MODULES)
+    assert requests["has_module_license"] == len(LICENSE_MODULES)
+    assert second.has_module_license.technical_support().hasLicense is True
+
+
+def test_license_probes_run_concurrently(make_stub):
+    stub, url = make_stub(route_latency={"has_module_license": lambda: 0.2})
+    platonus = login(url, "student1")
+
+    started = time.monotonic()
+    licenses = platonus.has_module_license.capabilities()
+    assert time.monotonic() - started < 0.35
+    assert set(licenses) == set(LICENSE_MODULES.values())
+    assert stub.stats()["requests"]["has_module_license"] == len(LICENSE_MODULES)
+
+
+def test_async_capabilities(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student3", password="secret")
+            return await platonus.capabilities()
+
+    capabilities = asyncio.run(main())
+    assert all(capabilities["modules"].values())
+    assert stub.stats()["requests"]["has_module"] == len(MODULES)
@@ -0,0 +1,103 @@
+import asyncio
+import gzip
+import time
+
+import pytest
+
+from platonus_api_wrapper import AsyncPlatonusAPI, Cassette, PlatonusAPI, exceptions
+from platonus_api_wrapper.utils.cassette import REDACTED, redact
+
+
+def record(path, url):
+    with Cassette(path, "record") as cassette:
+        platonus = PlatonusAPI(url, "ru", cassette=cassette)
+        platonus.login(login="student1", password="secret")
+        result = platonus.profile.profile_info(), platonus.study_years_list()
+    return cassette, result
+
+
+def test_redact():
+    assert redact({"login": "a", "nested": [{"Password": "b", "x": 1}], "token": None}, frozenset({"login", "password", "token"})) == {
+        "login": REDACTED,
+        "nested": [{"Password": REDACTED, "x": 1}],
+        "token": None,
+    }
+
+
+def test_unknown_mode(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "c"), "stream")
+
+
+def test_record_and_replay_without_network(make_stub, tmp_path):
+    stub, url = make_stub()
+    path = str(tmp_path / "journal.cassette")
+    cassette, (profile, years) = record(path, url)
+    assert cassette.stats()["recorded"] == len(cassette) > 0
+    stub.shutdown()
+
+    with gzip.open(path, "rb") as file:
+        content = file.read()
+    assert b"secret" not in content and b"student1" not in content
+
+    replay = Cassette(path)
+    platonus = PlatonusAPI(url, "ru", cassette=replay)
+    platonus.login(login="student1", password="secret")
+    assert platonus.profile.profile_info().personID == profile.personID
+    assert [year.year for year in platonus.study_years_list()] == [year.year for year in years]
+    assert replay.stats()["played"] > 0
+
+    with pytest.raises(exceptions.CassetteMiss):
+        platonus.profile.person_id()
+    assert replay.stats()["missed"] == 1
+
+
+def test_auto_mode_appends_new_requests(make_stub, tmp_path):
+    stub, url = make_stub()
+    path = str(tmp_path / "auto.cassette")
+    record(path, url)
+    recorded_requests = dict(stub.stats()["requests"])
+
+    with Cassette(path, "auto") as cassette:
+        platonus = PlatonusAPI(url, "ru", cassette=cassette)
+        platonus.login(login="student1", password="secret")
+        platonus.profile.profile_info()
+        # Токен в кассете скрыт, поэтому дописываются только запросы без авторизации
+        platonus.server_time()
+    # В сеть ушли только незаписанные запросы: время сервера и нужная для его адреса версия
+    new_requests = {name: count - recorded_requests.get(name, 0) for name, count in stub.stats()["requests"].items()}
+    assert {name for name, count in new_requests.items() if count} == {"server_time", "version"}
+    assert cassette.stats()["recorded"] == 2
+
+    platonus = PlatonusAPI(url, "ru", cassette=Cassette(path))
+    stub.shutdown()
+    assert platonus.server_time()
+
+
+def test_replay_latency(make_stub, tmp_path):
+    _, url = make_stub()
+    path = str(tmp_path / "latency.cassette")
+    record(path, url)
+
+    platonus = PlatonusAPI(url, "ru", cassette=Cassette(path, latency=0.05))
+    started = time.monotonic()
+    platonus.login(login="student1", password="secret")
+    assert time.monotonic() - started >= 0.05
+
+
+def test_async_record_and_replay(make_stub, tmp_path):
+    stub, url = make_stub()
+    path = str(tmp_path / "async.cassette")
+
+    async def main(cassette):
+        async with AsyncPlatonusAPI(url, "ru", cassette=cassette) as platonus:
+            await platonus.login(login="student1", password="secret")
+            return await platonus.profile.profile_info()
+
+    with Cassette(path, "record") as cassette:
+        profile = asyncio.run(main(cassette))
+    stub.shutdown()
+
+    replay = Cassette(path)
+    assert asyncio.run(main(replay)).personID == profile.personID
+    assert replay.stats()["missed"] == 0
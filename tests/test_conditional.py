@@ -0,0 +1,74 @@
+import asyncio
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI
+from platonus_api_wrapper.utils.conditional import ValidatorStore
+
+
+def test_store_is_bounded_by_bytes():
+    store = ValidatorStore(maxsize=10, max_bytes=100)
+    store.store("a", {"ETag": '"a"'}, b"x" * 60)
+    store.store("b", {"ETag": '"b"'}, b"x" * 30)
+    store.store("c", {"ETag": '"c"'}, b"x" * 30)
+
+    assert store.not_modified_content("a") is None
+    assert store.stats()["bytes"] == 60
+    store.store("huge", {"ETag": '"h"'}, b"x" * 101)
+    assert store.conditional_headers("huge") == {}
+    assert store.not_modified_content("b") == b"x" * 30
+
+
+def test_store_skips_responses_without_validators():
+    store = ValidatorStore()
+    store.store("a", {}, b"{}")
+    assert store.stats()["entries"] == 0
+
+
+def test_disabled_by_default(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    assert platonus.session.validators is None
+    platonus.study_room._student_journal(2021, 1)
+    platonus.study_room._student_journal(2021, 1)
+    assert stub.stats()["not_modified"] == 0
+
+
+def test_not_modified_body_is_reused(stub, url):
+    platonus = PlatonusAPI(url, "ru", conditional_requests=True)
+    platonus.login(login="student1", password="secret")
+    first = platonus.study_room._student_journal(2021, 1)
+    second = platonus.study_room._student_journal(2021, 1)
+
+    assert first == second
+    assert stub.stats()["not_modified"] == 1
+    assert platonus.session.validators.stats()["bytes_saved"] > 0
+
+
+def test_evicted_body_is_requested_again(stub, url):
+    platonus = PlatonusAPI(url, "ru", conditional_requests=True)
+    platonus.login(login="student1", password="secret")
+    validators = platonus.session.validators
+    first = platonus.study_room._student_journal(2021, 1)
+
+    # Валидаторы отправлены, но тело к приходу 304 уже вытеснено
+    not_modified_content = validators.not_modified_content
+    validators.not_modified_content = lambda key: validators.clear() or not_modified_content(key)
+    assert platonus.study_room._student_journal(2021, 1) == first
+
+    assert stub.stats()["not_modified"] == 1
+    assert stub.stats()["requests"]["journal"] == 3
+    assert validators.stats()["entries"] == 1
+
+
+def test_async_evicted_body_is_requested_again(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru", conditional_requests=True) as platonus:
+            await platonus.login(login="student1", password="secret")
+            validators = platonus.session.validators
+            first = await platonus.study_room._student_journal(2021, 1)
+            not_modified_content = validators.not_modified_content
+            validators.not_modified_content = lambda key: validators.clear() or not_modified_content(key)
+            return first, await platonus.study_room._student_journal(2021, 1)
+
+    first, second = asyncio.run(main())
+    assert first == second
+    assert stub.stats()["requests"]["journal"] == 3
@@ -0,0 +1,84 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from platonus_api_wrapper import PlatonusAPI
+from platonus_api_wrapper.utils.discovery import HostInfo
+
+VERSION = {"VERSION": "5.3", "BUILD_NUMBER": "100"}
+
+
+def test_saved_between_runs(tmp_path):
+    path = str(tmp_path / "discovery.json")
+    HostInfo("https://a.kz/", path=path).get_version(lambda: VERSION)
+
+    restored = HostInfo("https://a.kz/", path=path)
+    assert restored.get_version(lambda: 1 / 0) == VERSION
+    assert restored.get("auth_type", lambda: 1) == 1
+    assert HostInfo("https://a.kz/", path=path).values == {"auth_type": 1}
+
+
+def test_concurrent_saves_keep_every_host(tmp_path):
+    path = str(tmp_path / "discovery.json")
+    hosts = [HostInfo(f"https://college{i}.kz/", path=path) for i in range(16)]
+
+    def discover(host_info):
+        host_info.get_version(lambda: VERSION)
+        host_info.get("auth_type", lambda: 1)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(discover, hosts))
+
+    with open(path, encoding="utf-8") as f:
+        assert set(json.load(f)) == {host_info.platonus_url for host_info in hosts}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["discovery.json", "discovery.json.lock"]
+
+
+def test_fetch_does_not_block_readers():
+    host_info = HostInfo("https://a.kz/")
+    fetching, release = threading.Event(), threading.Event()
+
+    def slow_fetch():
+        fetching.set()
+        release.wait(5)
+        return VERSION
+
+    with ThreadPoolExecutor(2) as executor:
+        fetched = executor.submit(host_info.get_version, slow_fetch)
+        assert fetching.wait(5)
+        # Пока версия запрашивается, сведения можно читать и сохранять
+        assert executor.submit(host_info.snapshot).result(timeout=1)["version"] is None
+        release.set()
+        assert fetched.result(timeout=5) == VERSION
+
+
+def test_client_discovery_path(stub, url, tmp_path):
+    path = str(tmp_path / "discovery.json")
+    platonus = PlatonusAPI(url, "ru", discovery_path=path)
+    platonus.rest_api_information()
+
+    with open(path, encoding="utf-8") as f:
+        (entry,) = json.load(f).values()
+    assert entry["version"]["VERSION"] == stub.version
+
+
+class InvalidatedAfterWrite(HostInfo):
+    """Сведения сбрасываются сразу после записи значения, как при смене билда в другом потоке"""
+
+    def _set_value(self, name, value):
+        super()._set_value(name, value)
+        self.invalidate()
+
+
+def test_get_survives_concurrent_invalidate():
+    host_info = InvalidatedAfterWrite("http://platonus.example.kz/")
+    assert host_info.get("auth_type", lambda: {"value": "1"}) == {"value": "1"}
+
+    async def main():
+        async def fetch():
+            return {"value": "2"}
+
+        return await host_info.aget("auth_type", fetch)
+
+    assert asyncio.run(main()) == {"value": "2"}
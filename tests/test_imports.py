@@ -0,0 +1,62 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import platonus_api_wrapper
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ("requests", "httpx", "asyncio", "platonus_api_wrapper.base")
+
+
+def loaded_after(code):
+    """Выполняет код в чистом интерпретаторе и возвращает, какие из тяжелых модулей он загрузил"""
+    script = f"import sys\n{code}\nimport json\nprint(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    output = subprocess.run(
+        [sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return set(json.loads(output.splitlines()[-1]))
+
+
+def test_package_import_loads_nothing():
+    assert loaded_after("import platonus_api_wrapper") == set()
+
+
+def test_sync_client_does_not_load_async_stack():
+    loaded = loaded_after("from platonus_api_wrapper import PlatonusAPI")
+    assert loaded.isdisjoint({"httpx", "asyncio"})
+    # requests импортируется при создании первого клиента
+    assert "requests" in loaded_after("from platonus_api_wrapper import PlatonusAPI\nPlatonusAPI('https://a.kz', 'ru')")
+
+
+def test_async_client_does_not_load_requests():
+    assert "requests" not in loaded_after("from platonus_api_wrapper import AsyncPlatonusAPI")
+
+
+@pytest.mark.parametrize("name", platonus_api_wrapper.__all__)
+def test_public_names_resolve(name):
+    assert getattr(platonus_api_wrapper, name) is not None
+    assert name in dir(platonus_api_wrapper)
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError):
+        platonus_api_wrapper.missing
+
+
+@pytest.mark.parametrize("url", ["https://platonus.example.kz", "http://127.0.0.1:8080/platonus", "https://колледж.қаз"])
+def test_url_validator_accepts(url):
+    from platonus_api_wrapper.validators import URLValidator
+
+    URLValidator(url)
+
+
+@pytest.mark.parametrize("url", ["platonus.example.kz", "ftp://example.kz", "https://exa mple.kz"])
+def test_url_validator_rejects(url):
+    from platonus_api_wrapper import exceptions
+    from platonus_api_wrapper.validators import URLValidator
+
+    with pytest.raises(exceptions.InvalidURL):
+        URLValidator(url)
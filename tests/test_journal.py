@@ -0,0 +1,102 @@
+import asyncio
+import time
+
+import pytest
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI
+from platonus_api_wrapper.base.study_room.methods import _year_term_pairs
+from platonus_api_wrapper.models import Model
+from platonus_api_wrapper.utils import exceptions
+
+
+def test_student_journal_history(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    history = platonus.study_room.student_journal_history()
+
+    assert history.complete
+    assert list(history.terms) == [(year, term) for year in stub.years for term in (1, 2)]
+    assert all(len(journal) == stub.subjects for _, journal in history)
+    subject_id = history[(2021, 1)][0].subjectID
+    assert [(year, term) for year, term, _ in history.subjects[subject_id]] == list(history.terms)
+    assert stub.stats()["requests"]["journal"] == len(history)
+
+
+def test_student_journal_history_keeps_partial_results(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    history = platonus.study_room.student_journal_history(years=[2021, "unknown"], terms=[1])
+
+    assert list(history.terms) == [(2021, 1)]
+    assert list(history.errors) == [("unknown", 1)]
+    assert not history.complete
+
+
+def test_async_student_journal_history(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            return await platonus.study_room.student_journal_history(concurrency=2)
+
+    history = asyncio.run(main())
+    assert history.complete
+    assert len(history) == len(stub.years) * 2
+
+
+def test_iter_journal_records(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    outcomes = list(platonus.study_room.iter_journal_records(2021, 1))
+
+    assert len(outcomes) == stub.subjects
+    assert all(error is None and len(records.records) == 20 for _, records, error in outcomes)
+
+
+def test_iter_journal_records_overall_timeout(make_stub):
+    stub, url = make_stub(route_latency={"journal_records": lambda: 0.3})
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    journal = platonus.study_room.student_journal(2021, 1)
+
+    started = time.monotonic()
+    outcomes = list(platonus.study_room.iter_journal_records(2021, 1, journal, concurrency=2, timeout=0.5))
+    elapsed = time.monotonic() - started
+
+    # Срок общий: первые два предмета успевают, остальные получают TimedOut, без повторов
+    assert elapsed < 1.0
+    errors = [error for _, _, error in outcomes if error is not None]
+    assert len(outcomes) - len(errors) == 2
+    assert all(isinstance(error, exceptions.TimedOut) for error in errors)
+    assert stub.stats()["requests"]["journal_records"] <= 4
+
+
+def test_async_iter_journal_records_overall_timeout(make_stub):
+    _, url = make_stub(route_latency={"journal_records": lambda: 0.3})
+
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            journal = await platonus.study_room.student_journal(2021, 1)
+            started = time.monotonic()
+            outcomes = [
+                outcome
+                async for outcome in platonus.study_room.iter_journal_records(2021, 1, journal, concurrency=2, timeout=0.5)
+            ]
+            return outcomes, time.monotonic() - started
+
+    outcomes, elapsed = asyncio.run(main())
+    assert elapsed < 1.0
+    errors = [error for _, _, error in outcomes if error is not None]
+    assert len(outcomes) - len(errors) == 2
+    assert all(isinstance(error, exceptions.TimedOut) for error in errors)
+
+
+def test_year_term_pairs_use_list_fields():
+    years = [Model({"year": 2021, "name": "2021-2022"}), 2022]
+    terms = [Model({"number": 1, "name": "1 семестр"}), "2"]
+    assert _year_term_pairs(years, terms) == [(2021, 1), (2021, "2"), (2022, 1), (2022, "2")]
+
+    with pytest.raises(ValueError):
+        _year_term_pairs([Model({"studyYear": 2021})], [1])
+    with pytest.raises(ValueError):
+        _year_term_pairs([2021], [Model({"term": 1})])
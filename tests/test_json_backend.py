@@ -0,0 +1,51 @@
+import json
+import sys
+
+import pytest
+
+from platonus_api_wrapper import PlatonusAPI
+from platonus_api_wrapper.utils.json_backend import get_json_loads
+
+PAYLOAD = json.dumps({"fio": "Иванов Иван", "marks": [1, 2.5, None]}, ensure_ascii=False).encode()
+
+
+@pytest.mark.parametrize("backend", ["auto", "stdlib", "orjson"])
+def test_backends_decode_bytes(backend):
+    if backend == "orjson":
+        pytest.importorskip("orjson")
+    assert get_json_loads(backend)(PAYLOAD) == json.loads(PAYLOAD)
+
+
+def test_auto_prefers_orjson():
+    orjson = pytest.importorskip("orjson")
+    assert get_json_loads("auto") is orjson.loads
+
+
+def test_auto_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setitem(sys.modules, "orjson", None)
+    monkeypatch.setitem(sys.modules, "ujson", None)
+    assert get_json_loads("auto") is get_json_loads("stdlib")
+
+
+def test_missing_backend_raises_import_error(monkeypatch):
+    monkeypatch.setitem(sys.modules, "ujson", None)
+    with pytest.raises(ImportError):
+        get_json_loads("ujson")
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        get_json_loads("simplejson")
+
+
+def test_client_uses_custom_backend(stub, url):
+    calls = []
+
+    def loads(data):
+        calls.append(data)
+        return json.loads(data)
+
+    platonus = PlatonusAPI(url, "ru", json_backend=loads)
+    platonus.login(login="student1", password="secret")
+    assert platonus.profile.profile_info().personID
+    assert calls and all(isinstance(data, bytes) for data in calls)
@@ -0,0 +1,78 @@
+import time
+
+import pytest
+
+from platonus_api_wrapper import KeepAliveScheduler, PlatonusAPI
+from platonus_api_wrapper.utils.keepalive import SessionLifetime
+
+
+def test_lifetime_is_measured_from_last_keep_alive():
+    lifetime = SessionLifetime(default=10)
+    lifetime.started()
+    time.sleep(0.2)
+    lifetime.touched()
+    time.sleep(0.05)
+    lifetime.expired()
+
+    (observed,) = lifetime.observed
+    assert 0.05 <= observed < 0.2
+    assert lifetime.estimate == observed
+    assert lifetime.due_at(0.8, 0) is None
+
+
+def test_touch_without_session_does_nothing():
+    lifetime = SessionLifetime()
+    lifetime.touched()
+    assert lifetime.active_at is None
+
+
+def test_snapshot_roundtrip():
+    lifetime = SessionLifetime()
+    lifetime.started()
+    lifetime.observed.append(120.0)
+
+    restored = SessionLifetime()
+    restored.restore(lifetime.snapshot())
+    assert list(restored.observed) == [120.0]
+    assert restored.active_at == pytest.approx(lifetime.active_at, abs=0.05)
+
+    # Снимки предыдущих версий хранили момент логина
+    legacy = SessionLifetime()
+    legacy.restore({"observed": [], "logged_in_at": time.time() - 5})
+    assert time.monotonic() - legacy.active_at == pytest.approx(5, abs=0.05)
+
+
+def test_ping_mode_extends_session(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    platonus._session_lifetime.default = 0.2
+    logged_in_at = platonus._session_lifetime.active_at
+
+    scheduler = KeepAliveScheduler(mode="ping", safety=0.5, jitter=0)
+    scheduler.add(platonus)
+    scheduler.start()
+    try:
+        time.sleep(0.45)
+    finally:
+        scheduler.stop()
+
+    assert scheduler.stats()["pinged"] >= 3
+    assert platonus._session_lifetime.active_at > logged_in_at
+    assert stub.stats()["logins"] == 1
+
+
+def test_ping_failure_records_lifetime_since_last_ping(make_stub):
+    stub, url = make_stub()
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    scheduler = KeepAliveScheduler(mode="ping")
+
+    time.sleep(0.2)
+    scheduler._keep_alive(platonus)
+    stub.expire_all()
+    scheduler._keep_alive(platonus)
+
+    (observed,) = platonus._session_lifetime.observed
+    assert observed < 0.2
+    assert scheduler.stats()["refreshed"] == 1
+    assert stub.stats()["logins"] == 2
@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from platonus_api_wrapper import PlatonusAPI
+from platonus_api_wrapper.utils.lru_cacher import TTLCache, canonical_key, timed_lru_cache
+from platonus_api_wrapper.utils.memory_cacher import MemoryCacherMixin
+
+
+class Counter(MemoryCacherMixin):
+    def __init__(self, namespace=None):
+        super().__init__(namespace)
+        self.calls = 0
+
+    @timed_lru_cache(0.2)
+    def value(self, key):
+        self.calls += 1
+        return key
+
+    @timed_lru_cache(60)
+    async def avalue(self, key):
+        self.calls += 1
+        return key
+
+
+def test_entry_expires_after_its_own_lifetime():
+    cache = TTLCache(0.1)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.15)
+    assert cache.get("a", None) is None
+    assert cache.cache_info()["expired"] == 1
+
+
+def test_maxsize_evicts_least_recently_used():
+    cache = TTLCache(60, maxsize=2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b", None) is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+
+
+def test_canonical_key_merges_equal_arguments():
+    assert canonical_key("20") == canonical_key(20)
+    assert canonical_key(["1", {"b": "2"}]) == canonical_key((1, {"b": 2}))
+    assert canonical_key("-3") == -3
+
+
+def test_canonical_key_keeps_leading_zeros():
+    assert canonical_key("007") != canonical_key("7")
+    assert canonical_key("01") == "01"
+    assert canonical_key("-0") == "-0"
+
+    counter = Counter()
+    assert (counter.value("007"), counter.value("7")) == ("007", "7")
+    assert counter.calls == 2
+
+
+def test_cache_is_per_instance_and_expires():
+    first, second = Counter(), Counter()
+    assert first.value("20") == first.value(20) == "20"
+    assert first.calls == 1
+
+    second.value(20)
+    assert second.calls == 1
+
+    time.sleep(0.25)
+    first.value(20)
+    assert first.calls == 2
+
+
+def test_namespace_shares_cache_between_instances():
+    first, second = Counter("student1"), Counter("student1")
+    first.value(1)
+    second.value(1)
+    assert (first.calls, second.calls) == (1, 0)
+
+
+def test_coroutine_result_is_cached():
+    counter = Counter()
+
+    async def main():
+        return [await counter.avalue(1), await counter.avalue(1)]
+
+    assert asyncio.run(main()) == [1, 1]
+    assert counter.calls == 1
+
+
+def test_client_method_cache(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    platonus.profile.profile_info()
+    platonus.profile.profile_info()
+    assert stub.stats()["requests"]["profile_info"] == 1
+    info = platonus.cache_info()
+    assert any(stats["hits"] == 1 for name, stats in info.items() if name.endswith("profile_info"))
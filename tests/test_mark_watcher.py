@@ -0,0 +1,71 @@
+import asyncio
+import datetime
+
+from platonus_api_wrapper import AsyncMarkWatcher, AsyncPlatonusAPI, MarkWatcher, PlatonusAPI
+from platonus_api_wrapper.base.mark_watcher import MarkRemoved, NewMark, current_study_term
+
+TASKS_QUERY = {"recipientStatus": "2", "startDate": "01-09-2022", "endDate": "31-12-2022"}
+
+
+def test_current_study_term():
+    assert current_study_term(datetime.date(2022, 10, 1)) == (2022, 1)
+    assert current_study_term(datetime.date(2023, 1, 15)) == (2022, 1)
+    assert current_study_term(datetime.date(2023, 3, 1)) == (2022, 2)
+
+
+def test_new_mark_and_unchanged_journal(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    watcher = MarkWatcher(platonus, 2022, 1)
+
+    assert watcher.poll() == []
+    assert watcher.poll() == []
+    # Оценки по датам не менялись - журнал загружен только первым опросом
+    assert stub.stats()["requests"]["journal"] == 1
+    assert stub.stats()["requests"]["marks_by_date"] == 2
+
+    stub.add_mark(2022, 1, 1000, 95, "20.10.2022")
+    (event,) = watcher.poll()
+    assert isinstance(event, NewMark)
+    assert (event.subject_id, event.key, event.mark) == (1000, "20.10.2022#0", 95)
+    assert stub.stats()["requests"]["journal"] == 2
+
+
+def test_removed_subject(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    watcher = MarkWatcher(platonus, 2021, 2)
+    watcher.poll()
+
+    stub.subjects -= 1
+    events = watcher.poll()
+    assert len(events) == 15
+    assert all(isinstance(event, MarkRemoved) and event.subject_id == 1000 + stub.subjects for event in events)
+    assert str(1000 + stub.subjects) not in watcher.snapshot["subjects"]
+
+
+def test_snapshot_restores_state(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    watcher = MarkWatcher(platonus, 2020, 1, tasks_query=TASKS_QUERY)
+    watcher.poll()
+
+    restored = MarkWatcher(platonus, 2020, 1, tasks_query=TASKS_QUERY, snapshot=watcher.snapshot)
+    assert restored.poll() == []
+    assert stub.stats()["requests"]["journal"] == 1
+    # Задания читаются только до первого известного
+    assert stub.stats()["requests"]["student_tasks"] == 12 + 1
+
+
+def test_async_watcher(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            watcher = AsyncMarkWatcher(platonus, 2022, 2)
+            first = await watcher.poll()
+            stub.add_mark(2022, 2, 1001, 70, "21.10.2022")
+            return first, await watcher.poll()
+
+    first, second = asyncio.run(main())
+    assert first == []
+    assert [(event.subject_id, event.mark) for event in second] == [(1001, 70)]
@@ -0,0 +1,127 @@
+import asyncio
+import time
+
+import pytest
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI, exceptions, metrics
+from platonus_api_wrapper.utils.metrics import Histogram, endpoint_name
+from platonus_api_wrapper.utils.retry import CircuitBreaker, RetryPolicy
+from platonus_api_wrapper.validators import URLNormalizer
+
+
+def test_endpoint_name():
+    assert endpoint_name("rest/assignments/studentTasks/-1/20?x=1") == "rest/assignments/studentTasks/:id/:id"
+    platonus = PlatonusAPI("http://platonus.example.kz", "ru")
+    assert endpoint_name(platonus.api.login) == "api.login"
+    assert endpoint_name(platonus.study_room_api.student_journal(2021, 1)) == "study_room.student_journal"
+
+
+def test_histogram_quantiles():
+    histogram = Histogram((0.1, 0.5, 1.0))
+    for value in (0.05, 0.05, 0.3, 2.0):
+        histogram.observe(value)
+    snapshot = histogram.snapshot()
+    assert snapshot["count"] == 4
+    assert list(snapshot["buckets"].values()) == [2, 3, 3, 4]
+    assert snapshot["p50"] == 0.1
+    assert snapshot["p99"] is None
+
+
+def test_disabled_by_default(url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    assert metrics.snapshot()["endpoints"] == {}
+
+
+def test_client_requests_are_recorded(url):
+    metrics.enable()
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    platonus.profile.profile_info()
+    platonus.profile.profile_info()
+
+    snapshot = metrics.snapshot()
+    login = snapshot["endpoints"]["api.login"]["POST"]
+    assert login["statuses"] == {200: 1}
+    assert login["latency"]["count"] == 1
+    assert login["bytes"] > 0
+    assert snapshot["endpoints"]["profile.profile_info"]["GET"]["latency"]["count"] == 1
+    assert snapshot["cache"]["Profile.profile_info"] == {"hit": 1, "miss": 1, "expired": 0}
+
+    text = metrics.prometheus()
+    assert 'platonus_responses_total{endpoint="api.login",method="POST",status="200"} 1' in text
+    assert 'platonus_cache_events_total{method="Profile.profile_info",event="hit"} 1' in text
+
+
+def test_errors_are_recorded(make_stub):
+    stub, url = make_stub()
+    metrics.enable()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+    platonus = PlatonusAPI(url, "ru", retry_policy=RetryPolicy(retries=0), circuit_breaker=breaker)
+    platonus.login(login="student1", password="secret")
+
+    stub.errors = {"503": 1.0}
+    with pytest.raises(exceptions.ServerError):
+        platonus.profile.person_id()
+    with pytest.raises(exceptions.CircuitOpen):
+        platonus.profile.person_id()
+
+    person_id = metrics.snapshot()["endpoints"]["profile.person_id"]["GET"]
+    assert person_id["statuses"] == {503: 1}
+    assert person_id["errors"] == {"CircuitOpen": 1}
+    assert person_id["latency"]["count"] == 2
+
+
+def test_async_client_is_recorded(url):
+    metrics.enable()
+
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            await platonus.study_years_list()
+
+    asyncio.run(main())
+    endpoints = metrics.snapshot()["endpoints"]
+    assert endpoints["api.login"]["POST"]["statuses"] == {200: 1}
+    assert endpoints["api.study_years_list"]["GET"]["latency"]["count"] == 1
+
+
+def test_retries_and_circuit_breaker_are_recorded(make_stub):
+    stub, url = make_stub()
+    metrics.enable()
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=0.1, host="platonus")
+    platonus = PlatonusAPI(url, "ru", retry_policy=RetryPolicy(retries=2, base_delay=0.01), circuit_breaker=breaker)
+    platonus.login(login="student1", password="secret")
+
+    stub.errors = {"503": 1.0}
+    with pytest.raises(exceptions.ServerError):
+        platonus.profile.person_id()
+    with pytest.raises(exceptions.CircuitOpen):
+        platonus.profile.person_id()
+
+    snapshot = metrics.snapshot()
+    assert snapshot["retries"] == {"platonus": {"retried": 2, "exhausted": 1}}
+    assert snapshot["circuit_breakers"]["platonus"] == {
+        "state": "open", "opened": 1, "half_open": 0, "closed": 0, "rejected": 1
+    }
+    text = metrics.prometheus()
+    assert 'platonus_circuit_breaker_state{host="platonus",state="open"} 1' in text
+    assert 'platonus_circuit_breaker_state{host="platonus",state="closed"} 0' in text
+    assert 'platonus_retries_total{host="platonus",outcome="exhausted"} 1' in text
+
+    stub.errors = {}
+    time.sleep(0.15)
+    platonus.profile.person_id()
+    breakers = metrics.snapshot()["circuit_breakers"]
+    assert breakers["platonus"]["state"] == "closed"
+    assert (breakers["platonus"]["half_open"], breakers["platonus"]["closed"]) == (1, 1)
+
+
+def test_host_breaker_is_named_by_url(make_stub):
+    stub, url = make_stub()
+    metrics.enable()
+    platonus = PlatonusAPI(url, "ru", retry_policy=RetryPolicy(retries=1, base_delay=0.01))
+    stub.errors = {"503": 1.0}
+    with pytest.raises(exceptions.ServerError):
+        platonus.session.get("rest/api/version")
+    assert list(metrics.snapshot()["retries"]) == [URLNormalizer(url, "/")]
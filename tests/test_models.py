@@ -0,0 +1,50 @@
+import sys
+
+import pytest
+
+from platonus_api_wrapper import PlatonusAPI
+from platonus_api_wrapper.models import JournalMark, JournalSubject, Model, ModelList, convert
+
+
+def test_model_has_no_instance_dict():
+    model = Model({"a": 1})
+    assert not hasattr(model, "__dict__")
+    assert sys.getsizeof(model) < sys.getsizeof({"a": 1})
+
+
+def test_nested_fields_are_converted_once():
+    data = {"subjectName": "Физика", "marks": [{"date": "01.09.2022", "mark": 90}], "teacher": {"fio": "Петров"}}
+    subject = JournalSubject(data)
+
+    assert isinstance(subject.marks, ModelList)
+    assert subject.marks is subject.marks
+    assert isinstance(subject.marks[0], JournalMark)
+    assert subject.marks[0].mark == 90
+    assert type(subject.teacher) is Model and subject.teacher.fio == "Петров"
+    assert subject["subjectName"] == "Физика" and "marks" in subject
+    assert subject.to_dict() is data
+
+
+def test_missing_field():
+    model = Model({"a": 1})
+    with pytest.raises(AttributeError):
+        model.b
+    assert model.get("b", 2) == 2
+
+
+def test_convert():
+    items = [{"a": 1}, {"a": 2}]
+    models = convert(items)
+    assert isinstance(models, ModelList)
+    assert models == items
+    assert [model.a for model in models[1:]] == [2]
+    assert models.to_list() is items
+    assert convert(5) == 5
+
+
+def test_client_returns_models(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    years = platonus.study_years_list()
+    assert isinstance(years, ModelList)
+    assert [year.year for year in years] == list(stub.years)
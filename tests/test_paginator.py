@@ -0,0 +1,97 @@
+import asyncio
+import threading
+import time
+from urllib.parse import parse_qs
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI
+from platonus_api_wrapper.const import MessageStatus
+from platonus_api_wrapper.utils.paginator import iter_pages
+
+TASKS_QUERY = {"recipientStatus": "2", "startDate": "01-09-2022", "endDate": "31-12-2022"}
+
+
+def test_iter_pages_keeps_order_and_bounds_prefetch():
+    in_flight = max_in_flight = 0
+    lock = threading.Lock()
+
+    def fetch(part):
+        nonlocal in_flight, max_in_flight
+        with lock:
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+        time.sleep(0.01 * (part % 3))
+        with lock:
+            in_flight -= 1
+        return list(range(part * 10, min(95, (part + 1) * 10)))
+
+    pages = list(iter_pages(fetch, lambda page: len(page) < 10, concurrency=3))
+    assert [item for page in pages for item in page] == list(range(95))
+    assert max_in_flight <= 3
+
+
+def test_iter_student_tasks(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    tasks = list(platonus.iter_student_tasks(**TASKS_QUERY))
+    assert len(tasks) == stub.tasks
+    assert len({task.ID for task in tasks}) == stub.tasks
+    # 230 заданий по 20 на странице - 12 страниц, лишних запросов нет
+    assert stub.stats()["requests"]["student_tasks"] == 12
+
+
+def test_async_iter_student_tasks(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            return [task async for task in platonus.iter_student_tasks(**TASKS_QUERY, countInPart=50, prefetch=2)]
+
+    tasks = asyncio.run(main())
+    assert len({task.ID for task in tasks}) == stub.tasks
+
+
+def test_iter_messages(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    messages = list(platonus.ui.iter_messages(countInPart=5, concurrency=4))
+    assert len(messages) == stub.messages
+    ids = [message.ID for message in messages]
+    assert ids == sorted(ids, reverse=True)
+
+
+def test_iter_messages_stops_at_known_id(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    known = {500000 - 12}
+    messages = list(platonus.ui.iter_messages(countInPart=5, concurrency=4, known_ids=known))
+    assert len(messages) == 12
+    # Дальше страницы с известным сообщением загружено не больше concurrency страниц
+    assert stub.stats()["requests"]["messages_by_params"] <= 3 + 4
+
+
+def test_async_iter_messages(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            return [message async for message in platonus.ui.iter_messages(countInPart=10)]
+
+    assert len(asyncio.run(main())) == stub.messages
+
+
+def test_async_messages_send_status_value(stub, url):
+    queries = []
+
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+
+            async def remember(request):
+                queries.append(parse_qs(request.url.query.decode()))
+
+            platonus.session.session.event_hooks["request"].append(remember)
+            await platonus.ui.get_messages_by_params(status=MessageStatus.VIEWED)
+            return [message async for message in platonus.ui.iter_messages(countInPart=20)]
+
+    assert len(asyncio.run(main())) == stub.messages
+    statuses = [query["status"] for query in queries]
+    assert statuses[0] == ["2"]
+    assert statuses[1:] and all(status == ["1"] for status in statuses[1:])
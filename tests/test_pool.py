@@ -0,0 +1,62 @@
+import asyncio
+import gc
+from concurrent.futures import ThreadPoolExecutor
+
+from platonus_api_wrapper import AsyncPlatonusClientPool, PlatonusClientPool
+
+
+def test_same_account_returns_live_handle(url):
+    pool = PlatonusClientPool(url, "ru")
+    first = pool.client("student1")
+    assert pool.client("student1") is first
+    assert pool.client("student2") is not first
+    assert pool.client() is not pool.client()
+
+    del first
+    gc.collect()
+    assert pool.get("student1") is None
+    assert pool.client("student1") is pool.get("student1")
+
+
+def test_concurrent_calls_create_one_handle(url):
+    pool = PlatonusClientPool(url, "ru")
+    with ThreadPoolExecutor(8) as executor:
+        clients = list(executor.map(lambda _: pool.client("student1"), range(32)))
+    assert len({id(client) for client in clients}) == 1
+
+
+def test_clients_share_transport_and_host_info(stub, url):
+    pool = PlatonusClientPool(url, "ru", pool_maxsize=2)
+    clients = [pool.client(f"student{i}") for i in range(5)]
+    for i, client in enumerate(clients):
+        client.login(login=f"student{i}", password="secret")
+        assert client.profile.profile_info().personID
+
+    assert len({id(client.session.transport) for client in clients}) == 1
+    # Версия Платонуса запрашивается не больше одного раза на хост
+    assert stub.stats()["requests"].get("version", 0) <= 1
+
+    stats = pool.stats()
+    assert stats["handles"] == 5
+    assert stats["memory_per_handle"] > 0
+    (sockets,) = stats["sockets"].values()
+    assert sockets["open"] <= 2
+    # У каждого аккаунта свой токен
+    assert len({client.session.headers["token"] for client in clients}) == 5
+
+
+def test_async_pool(stub, url):
+    async def main():
+        pool = AsyncPlatonusClientPool(url, "ru", max_connections=4)
+        try:
+            clients = [await pool.client(f"student{i}") for i in range(10)]
+            assert await pool.client("student0") is clients[0]
+            await asyncio.gather(*(client.login(login=f"student{i}", password="x") for i, client in enumerate(clients)))
+            profiles = await asyncio.gather(*(client.profile.profile_info() for client in clients))
+            return profiles, pool.stats()
+        finally:
+            await pool.close()
+
+    profiles, stats = asyncio.run(main())
+    assert len({profile.personID for profile in profiles}) == 10
+    assert stats["handles"] == 10
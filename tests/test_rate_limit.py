@@ -0,0 +1,105 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from platonus_api_wrapper import PlatonusAPI
+from platonus_api_wrapper.utils.rate_limit import RateLimiter, get_rate_limiter
+from platonus_api_wrapper.validators import URLNormalizer
+
+
+def test_burst_then_rate():
+    limiter = RateLimiter(rate=20, burst=5, max_in_flight=None)
+    started = time.monotonic()
+    for _ in range(5):
+        with limiter.acquire():
+            pass
+    assert time.monotonic() - started < 0.05
+
+    # Ведро пусто: следующие 5 запросов идут не чаще 20 в секунду
+    for _ in range(5):
+        with limiter.acquire():
+            pass
+    assert time.monotonic() - started >= 0.2
+
+    stats = limiter.stats()
+    assert stats["requests"] == 10
+    assert stats["waited"] >= 4
+    assert stats["queued"] == stats["in_flight"] == 0
+
+
+def test_max_in_flight():
+    limiter = RateLimiter(rate=None, max_in_flight=3)
+    lock = threading.Lock()
+    running = peak = 0
+
+    def work(_):
+        nonlocal running, peak
+        with limiter.acquire():
+            with lock:
+                running += 1
+                peak = max(peak, running)
+            time.sleep(0.02)
+            with lock:
+                running -= 1
+
+    with ThreadPoolExecutor(10) as executor:
+        list(executor.map(work, range(30)))
+
+    assert peak == 3
+    stats = limiter.stats()
+    assert stats["requests"] == 30
+    assert stats["in_flight"] == 0
+    assert stats["waited"] > 0
+    assert stats["wait_time_max"] >= 0.01
+
+
+def test_file_bucket_is_shared(tmp_path):
+    path = str(tmp_path / "bucket")
+    first = RateLimiter(rate=10, burst=2, max_in_flight=None, path=path)
+    second = RateLimiter(rate=10, burst=2, max_in_flight=None, path=path)
+    started = time.monotonic()
+    for limiter in (first, second, first):
+        with limiter.acquire():
+            pass
+    # Третий запрос ждет токен, хотя каждый ограничитель сделал не больше двух
+    assert time.monotonic() - started >= 0.08
+    first.bucket.close()
+    second.bucket.close()
+
+
+def test_async_acquire_and_cancel():
+    limiter = RateLimiter(rate=None, max_in_flight=2)
+
+    async def work():
+        async with limiter.aacquire():
+            await asyncio.sleep(0.02)
+
+    async def main():
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        async with limiter.aacquire():
+            async with limiter.aacquire():
+                waiter = asyncio.ensure_future(work())
+                await asyncio.sleep(0.01)
+                assert limiter.stats()["queued"] == 1
+                waiter.cancel()
+                await asyncio.gather(waiter, return_exceptions=True)
+
+    started = time.monotonic()
+    asyncio.run(main())
+    # 6 задач по 2 одновременно - три волны
+    assert time.monotonic() - started >= 0.06
+    assert limiter.stats()["in_flight"] == limiter.stats()["queued"] == 0
+
+
+def test_client_uses_host_limiter(url):
+    limiter = get_rate_limiter(URLNormalizer(url, "/"))
+    platonus = PlatonusAPI(url, "ru")
+    assert platonus.session.rate_limiter is limiter
+
+    own = RateLimiter(rate=None, max_in_flight=1)
+    platonus = PlatonusAPI(url, "ru", rate_limiter=own)
+    platonus.login(login="student1", password="secret")
+    platonus.profile.person_id()
+    assert own.stats()["requests"] >= 2
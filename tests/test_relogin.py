@@ -0,0 +1,88 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI, exceptions, metrics
+
+
+def test_concurrent_calls_share_one_relogin(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    stub.expire_all()
+    metrics.enable()
+
+    barrier = threading.Barrier(8)
+
+    def call(_):
+        barrier.wait()
+        return platonus.study_room._student_journal(2021, 1)
+
+    with ThreadPoolExecutor(8) as executor:
+        journals = list(executor.map(call, range(8)))
+
+    assert all(len(journal) == stub.subjects for journal in journals)
+    assert stub.stats()["logins"] == 2
+    relogins = metrics.snapshot()["relogins"]
+    assert relogins["success"] == 1
+    assert relogins.get("joined", 0) == 7
+
+
+def test_failed_relogin_backs_off_with_new_error(stub, url):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    platonus._auth_credentials["password"] = "wrong"
+    stub.expire_all()
+
+    with pytest.raises(exceptions.NotCorrectLoginCredentials) as first:
+        platonus.study_room._student_journal(2021, 1)
+
+    with pytest.raises(exceptions.LoginSessionExpired) as second:
+        platonus.study_room._student_journal(2021, 1)
+    assert second.value.__cause__ is first.value
+    assert second.value is not first.value
+    # Во время задержки вход не отправляется
+    assert stub.stats()["requests"]["login"] == 2
+
+
+def test_async_concurrent_calls_share_one_relogin(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            stub.expire_all()
+            return await asyncio.gather(*(platonus.study_room._student_journal(2021, term) for term in (1, 2, 1, 2)))
+
+    journals = asyncio.run(main())
+    assert len(journals) == 4
+    assert stub.stats()["logins"] == 2
+
+
+def test_imported_session_without_credentials_does_not_relogin(stub, url):
+    source = PlatonusAPI(url, "ru")
+    source.login(login="student1", password="secret")
+    platonus = PlatonusAPI(url, "ru")
+    platonus.import_session_record(source.export_session_record())
+    assert platonus.user_is_authed
+    assert platonus.study_room._student_journal(2021, 1)
+
+    logins = stub.stats()["requests"]["login"]
+    stub.expire_all()
+    with pytest.raises(exceptions.LoginSessionExpired, match="не сохранены"):
+        platonus.study_room._student_journal(2021, 1)
+    assert stub.stats()["requests"]["login"] == logins
+
+
+def test_async_imported_session_without_credentials_does_not_relogin(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as source:
+            await source.login(login="student1", password="secret")
+            record = source.export_session_record()
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            platonus.import_session_record(record)
+            stub.expire_all()
+            with pytest.raises(exceptions.LoginSessionExpired, match="не сохранены"):
+                await platonus.study_room._student_journal(2021, 1)
+
+    asyncio.run(main())
+    assert stub.stats()["requests"]["login"] == 1
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from platonus_api_wrapper import PlatonusAPI
+from platonus_api_wrapper.utils.request import Response
+
+
+def raw_response(content: bytes, status_code: int = 200) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers = CaseInsensitiveDict({"Content-Type": "application/json"})
+    response.url = "http://platonus.example.kz/rest/api/version"
+    return response
+
+
+@pytest.fixture
+def no_charset_detection(monkeypatch):
+    def detect(self):
+        raise AssertionError("apparent_encoding must not be computed")
+
+    monkeypatch.setattr(requests.Response, "apparent_encoding", property(detect))
+
+
+def test_body_is_decoded_without_charset_detection(no_charset_detection):
+    payload = {"subjectName": "Математика", "marks": [90, 85]}
+    response = Response(raw_response(json.dumps(payload, ensure_ascii=False).encode()))
+
+    assert response.json() == payload
+    assert response.as_object().subjectName == "Математика"
+    assert "Математика" in response.text
+
+
+def test_attributes_are_read_from_the_wrapped_response():
+    raw = raw_response(b"{}", 201)
+    response = Response(raw)
+    assert response.status_code == 201
+    assert response.headers is raw.headers
+    assert response.url == raw.url
+    assert response.ok
+    with pytest.raises(AttributeError):
+        response._missing
+
+
+def test_session_returns_lazy_response(url, no_charset_detection):
+    platonus = PlatonusAPI(url, "ru")
+    response = platonus.session.get("rest/api/version")
+    assert isinstance(response, Response)
+    assert response.json()["VERSION"] == "5.3"
@@ -0,0 +1,83 @@
+import time
+
+import pytest
+
+from platonus_api_wrapper import PlatonusAPI, exceptions
+from platonus_api_wrapper.utils.retry import CircuitBreaker, RetryPolicy
+
+FAST_RETRIES = RetryPolicy(retries=2, base_delay=0.01)
+
+
+def test_retry_policy():
+    policy = RetryPolicy(retries=2, base_delay=1, max_delay=5)
+    assert policy.is_retryable("GET")
+    assert not policy.is_retryable("POST")
+    assert policy.is_retryable("POST", idempotent=True)
+    assert not RetryPolicy(retries=0).is_retryable("GET")
+
+    assert policy.delay(0, {"Retry-After": "3"}) == 3
+    assert policy.delay(0, {"Retry-After": "60"}) == 5
+    assert all(0 <= policy.delay(3) <= 5 for _ in range(100))
+
+
+def test_get_is_retried_until_success(make_stub):
+    stub, url = make_stub()
+    platonus = PlatonusAPI(url, "ru", retry_policy=FAST_RETRIES, circuit_breaker=CircuitBreaker(None))
+    platonus.login(login="student1", password="secret")
+
+    stub.errors = {"503": 1.0}
+    with pytest.raises(exceptions.ServerError):
+        platonus.profile.person_id()
+    assert stub.stats()["injected"]["503"] == 3
+    assert platonus.session.circuit_breaker.retries_exhausted == 1
+
+    stub.errors = {}
+    assert platonus.profile.person_id()
+
+
+def test_post_is_not_retried(make_stub):
+    stub, url = make_stub()
+    platonus = PlatonusAPI(url, "ru", retry_policy=FAST_RETRIES, circuit_breaker=CircuitBreaker(None))
+    platonus.login(login="student1", password="secret")
+
+    stub.errors = {"503": 1.0}
+    with pytest.raises(exceptions.ServerError):
+        platonus.session.post(platonus.api.student_tasks, {"partNumber": "0"})
+    assert stub.stats()["injected"]["503"] == 1
+
+
+def test_circuit_breaker_opens_and_recovers(make_stub):
+    stub, url = make_stub()
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=0.2)
+    platonus = PlatonusAPI(url, "ru", retry_policy=RetryPolicy(retries=0), circuit_breaker=breaker)
+    platonus.login(login="student1", password="secret")
+
+    stub.errors = {"503": 1.0}
+    for _ in range(2):
+        with pytest.raises(exceptions.ServerError):
+            platonus.profile.person_id()
+    assert breaker.state == "open"
+
+    # Разомкнутый предохранитель не пропускает запросы к хосту
+    with pytest.raises(exceptions.CircuitOpen):
+        platonus.profile.person_id()
+    assert stub.stats()["injected"]["503"] == 2
+    assert breaker.rejected == 1
+
+    stub.errors = {}
+    time.sleep(0.25)
+    assert breaker.state == "half_open"
+    assert platonus.profile.person_id()
+    assert breaker.state == "closed"
+
+
+def test_failed_probe_opens_again():
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+    breaker.record_failure()
+    time.sleep(0.06)
+    breaker.before_request()
+    with pytest.raises(exceptions.CircuitOpen):
+        breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert breaker.opened == 2
@@ -0,0 +1,147 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI, PlatonusClientPool
+from platonus_api_wrapper.utils.single_flight import AsyncSingleFlight, SingleFlight, coalescable
+
+SLOW = {"profile_info": lambda: 0.2, "student_tasks": lambda: 0.2}
+
+
+def run_together(count, func):
+    barrier = threading.Barrier(count)
+
+    def call(_):
+        barrier.wait()
+        return func()
+
+    with ThreadPoolExecutor(count) as executor:
+        return list(executor.map(call, range(count)))
+
+
+def test_coalescable():
+    assert coalescable("GET")
+    assert not coalescable("POST")
+    assert coalescable("POST", idempotent=True)
+    assert not coalescable("GET", idempotent=False)
+
+
+def test_every_caller_gets_own_copy():
+    flight = SingleFlight()
+
+    def slow():
+        time.sleep(0.1)
+        return {"status": 200}
+
+    results = run_together(4, lambda: flight.do("key", slow, dict))
+    assert all(result == {"status": 200} for result in results)
+    assert len({id(result) for result in results}) == 4
+    assert flight.stats()["executed"] == 1
+
+
+def test_every_caller_gets_own_exception():
+    flight = SingleFlight()
+
+    def failing():
+        time.sleep(0.1)
+        raise ValueError("boom")
+
+    def call():
+        try:
+            flight.do("key", failing)
+        except ValueError as error:
+            return error
+
+    errors = run_together(4, call)
+    assert all(error.args == ("boom",) for error in errors)
+    assert len({id(error) for error in errors}) == 4
+    assert flight.stats()["executed"] == 1
+
+
+def test_async_every_caller_gets_own_exception():
+    async def main():
+        flight = AsyncSingleFlight()
+
+        async def failing():
+            await asyncio.sleep(0.05)
+            raise ValueError("boom")
+
+        return flight, await asyncio.gather(*(flight.do("key", failing) for _ in range(3)), return_exceptions=True)
+
+    flight, errors = asyncio.run(main())
+    assert all(isinstance(error, ValueError) for error in errors)
+    assert len({id(error) for error in errors}) == 3
+    assert flight.stats()["executed"] == 1
+
+
+def test_identical_gets_are_coalesced_into_separate_responses(make_stub):
+    stub, url = make_stub(route_latency=SLOW)
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+
+    responses = run_together(4, lambda: platonus.session.get(platonus.profile_api.profile_info))
+    assert stub.stats()["requests"]["profile_info"] == 1
+    assert len({id(response._response) for response in responses}) == 4
+    assert len({id(response.headers) for response in responses}) == 4
+    assert len({response.json()["personID"] for response in responses}) == 1
+
+
+def test_identical_posts_are_not_coalesced(make_stub):
+    stub, url = make_stub(route_latency=SLOW)
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    payload = {"partNumber": "0", "countInPart": "20"}
+
+    run_together(3, lambda: platonus.session.post(platonus.api.student_tasks, payload))
+    assert stub.stats()["requests"]["student_tasks"] == 3
+
+    run_together(3, lambda: platonus.session.post(platonus.api.student_tasks, payload, idempotent=True))
+    assert stub.stats()["requests"]["student_tasks"] == 4
+
+
+def test_async_identical_posts_are_not_coalesced(make_stub):
+    stub, url = make_stub(route_latency=SLOW)
+
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            payload = {"partNumber": "0", "countInPart": "20"}
+            await asyncio.gather(*(platonus.session.post(platonus.api.student_tasks, payload) for _ in range(3)))
+            responses = await asyncio.gather(
+                *(platonus.session.get(platonus.profile_api.profile_info) for _ in range(3))
+            )
+            return responses
+
+    responses = asyncio.run(main())
+    assert stub.stats()["requests"]["student_tasks"] == 3
+    assert stub.stats()["requests"]["profile_info"] == 1
+    assert len({id(response.headers) for response in responses}) == 3
+
+
+def test_handles_do_not_share_servlet_session(make_stub):
+    stub, url = make_stub(route_latency={"version": lambda: 0.2})
+    pool = PlatonusClientPool(url, "ru")
+    clients = [pool.client(), pool.client()]
+
+    def get_version_together():
+        barrier = threading.Barrier(len(clients))
+
+        def call(client):
+            barrier.wait()
+            return client.session.get("rest/api/version")
+
+        with ThreadPoolExecutor(len(clients)) as executor:
+            return list(executor.map(call, clients))
+
+    get_version_together()
+    assert stub.stats()["requests"]["version"] == 1
+    # Куку сессии сервлета получает только клиент, отправивший запрос
+    sessions = [client.session.cookies.get("JSESSIONID") for client in clients]
+    assert sum(session is not None for session in sessions) == 1
+
+    # Клиенты с разными куками не объединяются
+    get_version_together()
+    assert stub.stats()["requests"]["version"] == 3
+    first, second = (client.session.cookies.get("JSESSIONID") for client in clients)
+    assert None not in (first, second) and first != second
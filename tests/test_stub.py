@@ -0,0 +1,107 @@
+import json
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from platonus_stub import parse_latency
+
+
+def call(url, path, method="GET", payload=None, token=None, headers=None):
+    request = urllib.request.Request(
+        url + path,
+        data=None if payload is None else json.dumps(payload).encode(),
+        method=method,
+        headers={**({"token": token} if token else {}), **(headers or {})},
+    )
+    try:
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return response.status, response.headers, response.read()
+    except urllib.error.HTTPError as error:
+        return error.code, error.headers, error.read()
+
+
+def login(url, login="student1", password="secret"):
+    status, _, body = call(url, "rest/api/login", "POST", {"login": login, "password": password})
+    assert status == 200
+    return json.loads(body)
+
+
+def test_login_and_authorized_request(url):
+    response = login(url)
+    assert response["login_status"] == "success"
+
+    status, _, body = call(url, "rest/mobile/personInfo/ru", token=response["auth_token"])
+    assert status == 200
+    assert json.loads(body)["personID"] == response["personID"]
+
+    assert call(url, "rest/mobile/personInfo/ru")[0] == 401
+
+
+def test_wrong_password_is_invalid(url):
+    assert login(url, password="wrong")["login_status"] == "invalid"
+
+
+def test_token_ttl(make_stub):
+    _, url = make_stub(token_ttl=0.2)
+    token = login(url)["auth_token"]
+    assert call(url, "rest/api/person/personID", token=token)[0] == 200
+    time.sleep(0.3)
+    assert call(url, "rest/api/person/personID", token=token)[0] == 401
+
+
+def test_expire_all_ends_every_session(stub, url):
+    tokens = [login(url, f"student{i}")["auth_token"] for i in range(3)]
+    assert json.loads(call(url, "_stub/expire", "POST")[2]) == {"expired": 3}
+    assert all(call(url, "rest/api/person/isAdmin", token=token)[0] == 401 for token in tokens)
+    assert stub.stats()["expired"] == 3
+
+
+def test_tasks_pagination(make_stub):
+    _, url = make_stub(tasks=45)
+    token = login(url)["auth_token"]
+    pages = [
+        json.loads(call(url, "rest/assignments/studentTasks/-1/1", "POST", {"partNumber": part, "countInPart": 20}, token)[2])
+        for part in range(3)
+    ]
+    assert [len(page["tasks"]) for page in pages] == [20, 20, 5]
+    assert {page["totalCount"] for page in pages} == {45}
+    assert len({task["ID"] for page in pages for task in page["tasks"]}) == 45
+
+
+def test_injected_errors(make_stub):
+    stub, url = make_stub(errors={"503": 1.0})
+    assert call(url, "rest/api/version")[0] == 503
+    assert stub.stats()["injected"] == {"503": 1}
+
+
+def test_injected_401_ends_session(make_stub):
+    stub, url = make_stub()
+    token = login(url)["auth_token"]
+    stub.errors = {"401": 1.0}
+    assert call(url, "rest/api/person/isAdmin", token=token)[0] == 401
+    stub.errors = {}
+    assert call(url, "rest/api/person/isAdmin", token=token)[0] == 401
+
+
+def test_etag_not_modified(url):
+    token = login(url)["auth_token"]
+    status, headers, _ = call(url, "rest/mobile/personInfo/ru", token=token)
+    assert status == 200
+    status, _, body = call(url, "rest/mobile/personInfo/ru", token=token, headers={"If-None-Match": headers["ETag"]})
+    assert (status, body) == (304, b"")
+
+
+@pytest.mark.parametrize(
+    "spec, low, high",
+    [("0.05", 0.05, 0.05), ("uniform:0.01:0.02", 0.01, 0.02), ("lognormal:0.05:0.1", 0.0, 1.0), ("exp:0.05", 0.0, 10.0)],
+)
+def test_parse_latency(spec, low, high):
+    latency = parse_latency(spec)
+    assert all(low <= latency() <= high for _ in range(100))
+
+
+def test_parse_latency_rejects_unknown():
+    with pytest.raises(ValueError):
+        parse_latency("gauss:1:2")
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+
+import pytest
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI, exceptions, hooks, tracer
+from platonus_api_wrapper.utils.retry import CircuitBreaker, RetryPolicy
+from platonus_api_wrapper.utils.tracing import SpanCollector
+
+
+def record_events():
+    events = []
+    for event in ("before_request", "after_response", "on_retry", "on_relogin", "on_cache_hit"):
+        hooks.add(event, lambda event=event, **payload: events.append((event, payload)))
+    return events
+
+
+def test_disabled_tracer_is_noop():
+    with tracer.span("noop") as span:
+        assert span is None
+    assert not hooks.active
+
+
+def test_unknown_hook_event():
+    with pytest.raises(ValueError):
+        hooks.add("on_everything", print)
+
+
+def test_composite_call_is_one_trace(make_stub):
+    _, url = make_stub(years=(2021,), terms=1, subjects=2)
+    collector = SpanCollector()
+    tracer.enable(collector)
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+
+    collector.clear()
+    platonus.study_room.student_journal_history()
+    (trace_id,) = collector.trace_ids()
+    (root,) = collector.trace(trace_id)
+    assert root["name"] == "StudyRoom.student_journal_history"
+
+    children = [child["name"] for child in root["children"]]
+    assert "StudyRoom.student_journal" in children
+    journal = next(child for child in root["children"] if child["name"] == "StudyRoom.student_journal")
+    (request,) = journal["children"]
+    assert request["name"] == "GET study_room.student_journal"
+    assert request["attributes"]["status_code"] == 200
+    assert {span["name"] for span in request["children"]} >= {"attempt", "as_object"}
+    assert "GET study_room.student_journal" in collector.format(trace_id)
+
+
+def test_request_and_cache_hooks(stub, url):
+    events = record_events()
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login="student1", password="secret")
+    platonus.profile.profile_info()
+    platonus.profile.profile_info()
+
+    names = [event for event, _ in events]
+    assert names.count("before_request") == names.count("after_response") > 0
+    assert stub.stats()["requests"]["profile_info"] == 1
+    response = [payload for event, payload in events if event == "after_response"][-1]
+    assert (response["endpoint"], response["status_code"]) == ("profile.profile_info", 200)
+    assert response["size"] > 0
+    assert events[-1] == ("on_cache_hit", {"name": "Profile.profile_info", "key": ()})
+
+
+def test_retry_and_relogin_hooks(make_stub):
+    stub, url = make_stub()
+    events = record_events()
+    platonus = PlatonusAPI(url, "ru", retry_policy=RetryPolicy(retries=2, base_delay=0.01), circuit_breaker=CircuitBreaker(None))
+    platonus.login(login="student1", password="secret")
+
+    stub.errors = {"503": 1.0}
+    with pytest.raises(exceptions.ServerError):
+        platonus.profile.person_id()
+    retries = [payload for event, payload in events if event == "on_retry"]
+    assert [retry["attempt"] for retry in retries] == [1, 2]
+    assert {retry["status_code"] for retry in retries} == {503}
+
+    stub.errors = {}
+    stub.expire_all()
+    platonus.profile.person_id()
+    assert ("on_relogin", {"outcome": "success"}) in events
+
+
+def test_failing_hook_does_not_break_request(url, caplog):
+    hooks.add("after_response", lambda **_: 1 / 0)
+    platonus = PlatonusAPI(url, "ru")
+    with caplog.at_level(logging.ERROR, "platonus_api_wrapper"):
+        platonus.login(login="student1", password="secret")
+    assert platonus.profile.person_id()
+    assert "Hook after_response" in caplog.text
+
+
+def test_async_trace(url):
+    collector = SpanCollector()
+    tracer.enable(collector)
+
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            collector.clear()
+            await platonus.study_years_list()
+
+    asyncio.run(main())
+    (trace_id,) = collector.trace_ids()
+    (root,) = collector.trace(trace_id)
+    assert root["name"].endswith("study_years_list")
+    assert root["children"][0]["name"] == "GET api.study_years_list"
@@ -0,0 +1,90 @@
+import asyncio
+import pickle
+
+import requests
+
+from platonus_api_wrapper import AsyncPlatonusAPI, PlatonusAPI, SessionVault
+from platonus_api_wrapper.utils.vault import SessionRecord
+
+
+def login(url, account):
+    platonus = PlatonusAPI(url, "ru")
+    platonus.login(login=account, password="secret")
+    return platonus
+
+
+def test_export_import_session(stub, url, tmp_path):
+    session_file = str(tmp_path / "sessions.plsv")
+    platonus = login(url, "student1")
+    person_id = platonus.profile.profile_info().personID
+    platonus.export_session(session_file)
+
+    restored = PlatonusAPI(url, "ru")
+    assert restored.import_session(session_file, credentials={"login": "student1", "password": "secret"})
+    assert restored.user_is_authed
+    assert restored.profile.profile_info().personID == person_id
+    assert not PlatonusAPI(url, "ru").import_session(session_file, account="nobody")
+
+    with open(session_file, "rb") as f:
+        assert b"secret" not in f.read()
+
+
+def test_many_accounts_in_one_file(stub, url, tmp_path):
+    path = str(tmp_path / "sessions.plsv")
+    clients = {f"student{i}": login(url, f"student{i}") for i in range(20)}
+    with SessionVault(path) as vault:
+        vault.capture_many(clients, {account: f"ref:{account}" for account in clients})
+        vault.save()
+
+    with SessionVault(path) as vault:
+        assert len(vault.items()) == 20
+        record = vault.get("student7")
+        assert record.token == clients["student7"].session.headers["token"]
+        assert record.credentials_ref == "ref:student7"
+        assert vault.get("missing") is None
+
+
+def test_session_data_is_requests_session(stub, url):
+    platonus = login(url, "student1")
+    data = platonus.session_data
+    assert isinstance(data["session"], requests.Session)
+    assert data["session"].headers["token"] == platonus.session.headers["token"]
+    assert data["auth_credentials"]["login"] == "student1"
+
+    # Как и раньше, session_data можно сохранить через pickle и передать другому клиенту
+    restored = PlatonusAPI(url, "ru")
+    restored.session_data = pickle.loads(pickle.dumps(data))
+    assert restored.session.headers["token"] == platonus.session.headers["token"]
+    assert restored.profile.person_id()
+
+
+def test_session_record(stub, url):
+    platonus = login(url, "student1")
+    record = platonus.export_session_record(credentials_ref="vault:student1")
+    assert isinstance(record, SessionRecord)
+    assert record.credentials_ref == "vault:student1"
+
+    restored = PlatonusAPI(url, "ru")
+    restored.import_session_record(record, lambda ref: {"login": ref.split(":")[1], "password": "secret"})
+    stub.expire_all()
+    # Сессия истекла - клиент переавторизуется по данным из credentials
+    assert restored.profile.person_id()
+    assert stub.stats()["logins"] == 2
+
+
+def test_async_session_data(stub, url):
+    async def main():
+        async with AsyncPlatonusAPI(url, "ru") as platonus:
+            await platonus.login(login="student1", password="secret")
+            data, record = platonus.session_data, platonus.export_session_record()
+
+        async with AsyncPlatonusAPI(url, "ru") as restored:
+            restored.session_data = data
+            from_data = await restored.profile.person_id()
+        async with AsyncPlatonusAPI(url, "ru") as restored:
+            restored.import_session_record(record)
+            return data, from_data, await restored.profile.person_id()
+
+    data, from_data, from_record = asyncio.run(main())
+    assert isinstance(data["session"], requests.Session)
+    assert from_data and from_record